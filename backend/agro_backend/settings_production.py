@@ -7,6 +7,8 @@ from pathlib import Path
 from decouple import config
 from datetime import timedelta
 
+from apps.core.structured_logging import parse_log_levels
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,6 +37,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'apps.core',
     'apps.authentication',
     'apps.production',
     'apps.quality_data',
@@ -43,12 +46,14 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'apps.core.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,17 +79,52 @@ TEMPLATES = [
 WSGI_APPLICATION = 'agro_backend.wsgi.application'
 
 # Database - PostgreSQL para producción
+# Pool de conexiones PostgreSQL por proceso (DB_POOL_MAX_SIZE=0 usa conexiones
+# persistentes con health checks en lugar del pool)
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_OPTIONS = {
+    'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+    'MAX_SIZE': DB_POOL_MAX_SIZE,
+    'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    'MAX_IDLE': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    'HEALTH_CHECK_INTERVAL': float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30')),
+}
+# Segundos entre publicaciones de las estadísticas del pool en cache (manage.py db_pool_stats)
+DB_POOL_STATS_INTERVAL = int(os.getenv('DB_POOL_STATS_INTERVAL', '10'))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'apps.core.db.backends.postgresql_pool' if DB_POOL_MAX_SIZE else 'django.db.backends.postgresql',
         'NAME': os.getenv('POSTGRES_DB', 'agro_db'),
         'USER': os.getenv('POSTGRES_USER', 'agro_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'agro_password_secure_2024'),
         'HOST': os.getenv('POSTGRES_HOST', 'db'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # Con pool, Django devuelve la conexión al terminar cada petición
+        'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': DB_POOL_OPTIONS,
     }
 }
 
+# Réplica de lectura opcional: mismas credenciales que la principal salvo lo indicado
+if os.getenv('POSTGRES_REPLICA_HOST') or os.getenv('POSTGRES_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('POSTGRES_REPLICA_DB', DATABASES['default']['NAME']),
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Lecturas de calidad y producción en peticiones GET se envían a la réplica (si existe);
+# tras una escritura, el usuario lee de la principal durante DATABASE_REPLICA_PIN_SECONDS
+# (la fijación se guarda en la cache: con varios workers requiere Redis, check core.E003)
+DATABASE_ROUTERS = ['apps.core.db.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_ALIAS = os.getenv('DATABASE_REPLICA_ALIAS', 'replica')
+DATABASE_REPLICA_APPS = ['quality_data', 'production']
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', '5'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,6 +156,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hilos para decodificar imágenes subidas y generar sus miniaturas
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', '2'))
+
+# Importación masiva de usuarios y empresas: procesos del comando import_accounts para calcular
+# hashes de contraseñas (0 = núcleos disponibles; la API los calcula en el propio worker)
+# y tamaño de los lotes de validación/inserción
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', '0'))
+ACCOUNT_IMPORT_BATCH_SIZE = int(os.getenv('ACCOUNT_IMPORT_BATCH_SIZE', '500'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -140,7 +189,12 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
@@ -164,8 +218,67 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.serializers.ClaimsTokenRefreshSerializer',
 }
 
+# Modo de autorización por claims: el token incluye empresa, rol y versión de autorización,
+# y los endpoints de lectura autorizan sin consultar la base de datos
+JWT_CLAIMS_AUTH = os.getenv('JWT_CLAIMS_AUTH', 'False').lower() == 'true'
+JWT_AUTHZ_VERSION_CACHE_TIMEOUT = int(os.getenv('JWT_AUTHZ_VERSION_CACHE_TIMEOUT', '300'))
+
+# Segundos que se mantienen en cache las estadísticas por empresa (se invalidan al escribir)
+COMPANY_STATS_CACHE_TIMEOUT = int(os.getenv('COMPANY_STATS_CACHE_TIMEOUT', '300'))
+
+# Segundos que se mantienen en cache las estadísticas del dashboard de producción (se invalidan al escribir)
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_STATS_CACHE_TIMEOUT', '300'))
+
+# Presupuesto de consultas SQL por respuesta de lectura en vistas con OptimizedQuerysetMixin;
+# si se excede se lanza un AssertionError (sólo con QUERY_BUDGET_CHECKS, activo en DEBUG)
+QUERY_BUDGET_CHECKS = os.getenv('QUERY_BUDGET_CHECKS', str(DEBUG)).lower() == 'true'
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '10'))
+
+# Meses futuros para los que se mantienen creadas las particiones de datos de calidad (PostgreSQL)
+QUALITY_DATA_PARTITION_MONTHS_AHEAD = int(os.getenv('QUALITY_DATA_PARTITION_MONTHS_AHEAD', '3'))
+
+# Directorio donde archive_quality_data guarda los archivos históricos de datos de calidad
+QUALITY_DATA_ARCHIVE_DIR = os.getenv('QUALITY_DATA_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+
+# Servir las variantes async de sincronización, dashboard y estadísticas de calidad
+# (recomendado al desplegar con agro_backend.asgi y workers uvicorn)
+QUALITY_DATA_ASYNC_VIEWS = os.getenv('QUALITY_DATA_ASYNC_VIEWS', 'False').lower() == 'true'
+
+# Reintentos de la API externa (errores de conexión, timeouts, 429 y 5xx): backoff exponencial
+# con jitter desde BACKOFF_BASE hasta BACKOFF_MAX segundos; un Retry-After mayor no se espera.
+# Tras CIRCUIT_FAILURES fallos seguidos se deja de llamar a la API durante CIRCUIT_RESET segundos
+# (el estado del circuito está en la cache: sólo es común a los workers con Redis)
+EXTERNAL_QUALITY_API_MAX_RETRIES = int(os.getenv('EXTERNAL_QUALITY_API_MAX_RETRIES', '3'))
+EXTERNAL_QUALITY_API_BACKOFF_BASE = float(os.getenv('EXTERNAL_QUALITY_API_BACKOFF_BASE', '0.5'))
+EXTERNAL_QUALITY_API_BACKOFF_MAX = float(os.getenv('EXTERNAL_QUALITY_API_BACKOFF_MAX', '30'))
+EXTERNAL_QUALITY_API_CIRCUIT_FAILURES = int(os.getenv('EXTERNAL_QUALITY_API_CIRCUIT_FAILURES', '5'))
+EXTERNAL_QUALITY_API_CIRCUIT_RESET = int(os.getenv('EXTERNAL_QUALITY_API_CIRCUIT_RESET', '60'))
+
+# Métricas de Prometheus en /metrics (RequestMetricsMiddleware). Con varios workers definir
+# PROMETHEUS_MULTIPROC_DIR para sumarlas. Se exige METRICS_AUTH_TOKEN como Bearer; sin él
+# /metrics sólo responde en DEBUG
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN', '')
+
+# Cache - Redis compartido entre workers si REDIS_URL está definido, memoria local por defecto.
+# Con varios workers las invalidaciones y revocaciones necesitan Redis (checks core.E00x)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'apps.core.cache.InstrumentedRedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'apps.core.cache.InstrumentedLocMemCache',
+        }
+    }
+
 # CORS settings para producción
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'https://your-domain.com,https://www.your-domain.com').split(',')
 
@@ -182,7 +295,11 @@ SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
 X_FRAME_OPTIONS = 'DENY'
 
-# Configuración de logging
+# Configuración de logging: JSON por línea a consola y archivo, escrito desde un hilo
+# propio (QueueListenerHandler) para no bloquear las peticiones. LOG_LEVEL fija el nivel
+# general y LOG_LEVELS el de cada módulo, p. ej. "apps.quality_data.services=DEBUG"
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -195,30 +312,40 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'apps.core.structured_logging.JSONFormatter',
+        },
     },
     'handlers': {
         'file': {
-            'level': 'INFO',
             'class': 'logging.FileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
-            'formatter': 'verbose',
+            'formatter': 'json',
         },
         'console': {
-            'level': 'INFO',
             'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'formatter': 'json',
+        },
+        # Debe ordenarse después de los handlers a los que entrega los registros
+        'queue': {
+            '()': 'apps.core.structured_logging.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
-        'level': 'INFO',
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
+        'apps': {
+            'level': LOG_LEVEL,
+        },
+        **parse_log_levels(os.getenv('LOG_LEVELS', '')),
     },
 }
 
@@ -6,11 +6,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from apps.core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.authentication.urls')),
     path('api/', include('apps.production.urls')),
     path('api/', include('apps.quality_data.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -19,7 +19,7 @@ class CompanyAdmin(admin.ModelAdmin):
         }),
         ('Logo', {
             'fields': ('logo',),
-            'description': 'Sube el logo en formato Base64. Puedes usar herramientas online para convertir imágenes a Base64.'
+            'description': 'Sube el logo como archivo de imagen.'
         }),
         ('Información Adicional', {
             'fields': ('descripcion', 'activo')
@@ -36,10 +36,11 @@ class CompanyAdmin(admin.ModelAdmin):
         return format_html('<span style="color: {};">{}</span>', 
                           'green' if count > 0 else 'red', count)
     users_count.short_description = 'Usuarios'
+    users_count.admin_order_field = 'users_count'
 
     def get_queryset(self, request):
-        """Optimizar consultas con select_related y prefetch_related"""
-        return super().get_queryset(request).prefetch_related('users')
+        """Optimizar consultas anotando el conteo de usuarios"""
+        return super().get_queryset(request).with_user_counts()
 
 
 @admin.register(Role)
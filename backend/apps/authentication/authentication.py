@@ -0,0 +1,38 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .tokens import ClaimsUser, claims_auth_enabled, get_authz_version
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Autenticación JWT que, en modo claims, resuelve al usuario desde el token.
+
+    Sólo aplica a métodos de lectura y a tokens que incluyen ``authz_version``;
+    la revocación se verifica contra la versión de autorización en cache, por lo
+    que una petición GET autenticada no requiere consultas a la base de datos.
+    Para escrituras o tokens sin claims se usa la autenticación estándar.
+    """
+
+    def authenticate(self, request):
+        if not claims_auth_enabled() or request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if 'authz_version' not in validated_token:
+            return self.get_user(validated_token), validated_token
+
+        user = ClaimsUser(validated_token)
+        if get_authz_version(user.id) != validated_token['authz_version']:
+            raise AuthenticationFailed('El token ha sido revocado.', code='token_revoked')
+
+        return user, validated_token
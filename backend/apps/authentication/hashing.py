@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from django.contrib.auth.hashers import make_password
+
+# Funciones de los procesos del pool de hashing de AccountImportService. Este módulo
+# no importa modelos: los procesos "spawn" lo cargan antes de configurar Django
+
+
+def init_hashing_worker():
+    # Con el método de inicio "spawn" el proceso hijo no hereda la configuración de Django
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords: List[Optional[str]]) -> List[str]:
+    """Hashes de las contraseñas; las vacías quedan como contraseña inutilizable"""
+    return [make_password(password) for password in passwords]
@@ -0,0 +1,274 @@
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+# Extensión de archivo según el formato detectado por Pillow
+IMAGE_FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+PROFILE_IMAGES_FOLDER = 'profiles'
+COMPANY_LOGOS_FOLDER = 'logos'
+
+# Derivados generados para cada imagen: tamaños (px del lado mayor) y formatos
+IMAGE_DERIVATIVE_SIZES = (32, 64, 256)
+IMAGE_DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'png': ('PNG', {'optimize': True}),
+}
+
+MAX_IMAGE_UPLOAD_SIZE = 5 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Nombres generados por este módulo: <carpeta>/<aa>/<sha256>[_<tamaño>].<ext>
+CONTENT_ADDRESSED_NAME_RE = re.compile(
+    r'^(?P<folder>%s|%s)/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:_(?P<size>%s))?\.(?P<ext>jpg|png|gif|webp)$' % (
+        PROFILE_IMAGES_FOLDER,
+        COMPANY_LOGOS_FOLDER,
+        '|'.join(str(size) for size in IMAGE_DERIVATIVE_SIZES),
+    )
+)
+
+_image_executor = None
+
+
+class ProcessedImage(NamedTuple):
+    """Imagen validada con sus derivados ya codificados"""
+    content: bytes
+    extension: str
+    derivatives: Dict[Tuple[int, str], bytes]
+
+    def __repr__(self) -> str:
+        # Evitar volcar los bytes de la imagen en logs
+        return (
+            f"ProcessedImage(extension={self.extension!r}, bytes={len(self.content)}, "
+            f"derivatives={len(self.derivatives)})"
+        )
+
+
+def _get_image_executor() -> ThreadPoolExecutor:
+    """Pool de hilos compartido para decodificar y redimensionar imágenes"""
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2),
+            thread_name_prefix='image-processing',
+        )
+    return _image_executor
+
+
+def detect_image_extension(content: bytes, default: str = 'png') -> str:
+    """Detecta la extensión de una imagen a partir de su contenido"""
+    try:
+        with Image.open(BytesIO(content)) as image:
+            return IMAGE_FORMAT_EXTENSIONS.get(image.format, default)
+    except Exception:
+        return default
+
+
+def content_hashed_name(content: bytes, folder: str, extension: str) -> str:
+    """Genera un nombre de archivo a partir del hash SHA-256 del contenido"""
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{folder}/{digest[:2]}/{digest}.{extension}"
+
+
+def derivative_name(name: str, size: int, extension: str) -> str:
+    """Nombre del derivado de una imagen para un tamaño y formato"""
+    return f"{os.path.splitext(name)[0]}_{size}.{extension}"
+
+
+def is_content_addressed(name: str) -> bool:
+    """Indica si el nombre corresponde a una imagen (o derivado) generada por este módulo"""
+    return bool(name and CONTENT_ADDRESSED_NAME_RE.match(name))
+
+
+def render_derivatives(content: bytes) -> ProcessedImage:
+    """
+    Valida una imagen y genera sus derivados redimensionados.
+
+    Args:
+        content: Bytes de la imagen original
+
+    Returns:
+        ProcessedImage con el contenido original y los derivados codificados
+
+    Raises:
+        ValueError: Si el contenido no es una imagen válida o soportada
+    """
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image.verify()
+
+        with Image.open(BytesIO(content)) as image:
+            extension = IMAGE_FORMAT_EXTENSIONS.get(image.format)
+            if extension is None:
+                raise ValueError("Formato de imagen no soportado.")
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                raise ValueError("La imagen tiene demasiados píxeles.")
+
+            # Para JPEG, decodificar directamente a una resolución reducida
+            largest = max(IMAGE_DERIVATIVE_SIZES)
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image).convert('RGBA')
+
+            derivatives = {}
+            for size in IMAGE_DERIVATIVE_SIZES:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((size, size), Image.LANCZOS)
+                for derivative_extension, (image_format, options) in IMAGE_DERIVATIVE_FORMATS.items():
+                    buffer = BytesIO()
+                    thumbnail.save(buffer, image_format, **options)
+                    derivatives[(size, derivative_extension)] = buffer.getvalue()
+    except ValueError:
+        raise
+    except Exception:
+        raise ValueError("El archivo no es una imagen válida.")
+
+    return ProcessedImage(content, extension, derivatives)
+
+
+def process_image_upload(uploaded_file) -> ProcessedImage:
+    """
+    Decodifica un archivo subido y genera sus derivados en el pool de hilos.
+
+    Raises:
+        ValueError: Si el archivo excede el tamaño máximo o no es una imagen válida
+    """
+    if uploaded_file.size > MAX_IMAGE_UPLOAD_SIZE:
+        raise ValueError("El archivo no puede ser mayor a 5MB.")
+
+    uploaded_file.seek(0)
+    content = uploaded_file.read()
+    return _get_image_executor().submit(render_derivatives, content).result()
+
+
+def store_image(content: bytes, folder: str, storage=None) -> str:
+    """
+    Guarda una imagen en el storage con un nombre basado en su contenido.
+
+    Archivos idénticos comparten el mismo nombre, por lo que no se duplican.
+
+    Args:
+        content: Bytes de la imagen
+        folder: Carpeta destino dentro del storage
+        storage: Storage a utilizar (por defecto ``default_storage``)
+
+    Returns:
+        Nombre del archivo en el storage
+    """
+    storage = storage or default_storage
+    name = content_hashed_name(content, folder, detect_image_extension(content))
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+    return name
+
+
+def store_processed_image(processed: ProcessedImage, folder: str, storage=None) -> str:
+    """
+    Guarda la imagen original y sus derivados con nombres basados en el contenido.
+
+    Returns:
+        Nombre de la imagen original en el storage
+    """
+    storage = storage or default_storage
+    name = content_hashed_name(processed.content, folder, processed.extension)
+    if not storage.exists(name):
+        storage.save(name, ContentFile(processed.content))
+
+    for (size, extension), content in processed.derivatives.items():
+        target = derivative_name(name, size, extension)
+        if not storage.exists(target):
+            storage.save(target, ContentFile(content))
+
+    return name
+
+
+def generate_missing_derivatives(name: str, storage=None) -> bool:
+    """
+    Genera los derivados de una imagen ya almacenada si aún no existen.
+
+    Returns:
+        True si se generaron derivados, False si no fue necesario o posible
+    """
+    storage = storage or default_storage
+    if not is_content_addressed(name) or not storage.exists(name):
+        return False
+
+    missing = [
+        (size, extension)
+        for size in IMAGE_DERIVATIVE_SIZES
+        for extension in IMAGE_DERIVATIVE_FORMATS
+        if not storage.exists(derivative_name(name, size, extension))
+    ]
+    if not missing:
+        return False
+
+    with storage.open(name, 'rb') as image_file:
+        try:
+            processed = render_derivatives(image_file.read())
+        except ValueError:
+            return False
+
+    for size, extension in missing:
+        storage.save(
+            derivative_name(name, size, extension),
+            ContentFile(processed.derivatives[(size, extension)])
+        )
+    return True
+
+
+def _absolute(url: str, request=None) -> str:
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def build_image_url(image_field, request=None) -> Optional[str]:
+    """
+    Retorna la URL (absoluta si hay request) de un campo de imagen.
+
+    Las imágenes con nombre basado en contenido se sirven desde el endpoint con
+    cache de larga duración; el resto desde la URL del storage.
+    """
+    if not image_field:
+        return None
+    if is_content_addressed(image_field.name):
+        url = reverse('authentication:image', kwargs={'name': image_field.name})
+    else:
+        url = image_field.url
+    return _absolute(url, request)
+
+
+def build_derivative_urls(image_field, request=None) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Retorna las URLs de los derivados de una imagen agrupadas por tamaño y formato.
+
+    Ejemplo: ``{'64': {'webp': '...', 'png': '...'}}``
+    """
+    if not image_field or not is_content_addressed(image_field.name):
+        return None
+
+    return {
+        str(size): {
+            extension: _absolute(
+                reverse('authentication:image', kwargs={
+                    'name': derivative_name(image_field.name, size, extension)
+                }),
+                request
+            )
+            for extension in IMAGE_DERIVATIVE_FORMATS
+        }
+        for size in IMAGE_DERIVATIVE_SIZES
+    }
@@ -0,0 +1,97 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.authentication.services import ACCOUNT_IMPORT_ENTITIES, AccountImportService
+
+
+class Command(BaseCommand):
+    help = 'Importa masivamente roles, empresas y usuarios desde un archivo CSV o JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            type=str,
+            help='Ruta del archivo CSV o JSON a importar'
+        )
+        parser.add_argument(
+            '--entity',
+            choices=ACCOUNT_IMPORT_ENTITIES,
+            help='Entidad contenida en el archivo (obligatoria para CSV y listas JSON)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sólo validar las filas, sin insertar registros'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Tamaño de los lotes de validación e inserción'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Procesos para calcular los hashes de contraseñas (por defecto PASSWORD_HASHING_WORKERS; 0 = núcleos disponibles)'
+        )
+        parser.add_argument(
+            '--report',
+            type=str,
+            help='Ruta donde guardar el reporte completo en JSON'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as import_file:
+                data = AccountImportService.parse_file(import_file, options.get('entity'))
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        service = AccountImportService(
+            batch_size=options.get('batch_size'),
+            hashing_workers=(
+                options['workers'] if options['workers'] is not None
+                else getattr(settings, 'PASSWORD_HASHING_WORKERS', 0)
+            ),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🚀 Importando {', '.join(f'{len(data[name])} {name}' for name in ACCOUNT_IMPORT_ENTITIES)}"
+                f"{' (dry run)' if options['dry_run'] else ''}..."
+            )
+        )
+        start = time.perf_counter()
+        report = service.run(data, dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        for error in report['errors']:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️  {error['entity']} fila {error['row']}: {error['errors']}")
+            )
+
+        if options.get('report'):
+            with open(options['report'], 'w', encoding='utf-8') as report_file:
+                json.dump(report, report_file, ensure_ascii=False, indent=2)
+
+        if report.get('error'):
+            raise CommandError(report['error'])
+
+        # Resumen final
+        self.stdout.write("\n" + "=" * 50)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"📊 RESUMEN DE IMPORTACIÓN ({elapsed:.2f}s):\n"
+                + "\n".join(
+                    f"  {name}: {report['valid'][name]}/{report['total'][name]} válidos, "
+                    f"{report['created'][name]} creados"
+                    for name in ACCOUNT_IMPORT_ENTITIES
+                )
+                + f"\n  Filas con errores: {len(report['errors'])}"
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='authz_version',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa al cambiar empresa, rol o estado para revocar tokens con claims', verbose_name='Versión de autorización'),
+        ),
+    ]
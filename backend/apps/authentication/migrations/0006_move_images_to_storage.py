@@ -0,0 +1,134 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:00
+
+import base64
+import binascii
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from PIL import Image
+
+# Copia de apps.authentication.images al crear esta migración: los cambios posteriores
+# de ese módulo no deben alterar una migración ya aplicada
+PROFILE_IMAGES_FOLDER = 'profiles'
+COMPANY_LOGOS_FOLDER = 'logos'
+
+IMAGE_FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+
+def detect_image_extension(content, default='png'):
+    try:
+        with Image.open(BytesIO(content)) as image:
+            return IMAGE_FORMAT_EXTENSIONS.get(image.format, default)
+    except Exception:
+        return default
+
+
+def store_image(content, folder):
+    """Guarda la imagen con un nombre basado en el hash SHA-256 de su contenido"""
+    digest = hashlib.sha256(content).hexdigest()
+    name = f"{folder}/{digest[:2]}/{digest}.{detect_image_extension(content)}"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+def _decode_base64(value):
+    """Decodifica un valor Base64, aceptando también data URLs"""
+    if value.startswith('data:') and ',' in value:
+        value = value.split(',', 1)[1]
+    try:
+        return base64.b64decode(value)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def base64_to_storage(apps, schema_editor):
+    """Mueve las imágenes Base64 existentes al storage de archivos"""
+    Company = apps.get_model('authentication', 'Company')
+    User = apps.get_model('authentication', 'User')
+
+    for model, legacy_field, field, folder in (
+        (User, 'profile_image_base64', 'profile_image', PROFILE_IMAGES_FOLDER),
+        (Company, 'logo_base64', 'logo', COMPANY_LOGOS_FOLDER),
+    ):
+        queryset = (
+            model.objects.exclude(**{f'{legacy_field}__isnull': True})
+            .exclude(**{legacy_field: ''})
+            .only('id', legacy_field)
+        )
+        for instance in queryset.iterator(chunk_size=100):
+            content = _decode_base64(getattr(instance, legacy_field))
+            if not content:
+                continue
+            name = store_image(content, folder)
+            model.objects.filter(pk=instance.pk).update(**{field: name})
+
+
+def storage_to_base64(apps, schema_editor):
+    """Restaura las imágenes como Base64 en la base de datos"""
+    Company = apps.get_model('authentication', 'Company')
+    User = apps.get_model('authentication', 'User')
+
+    for model, legacy_field, field in (
+        (User, 'profile_image_base64', 'profile_image'),
+        (Company, 'logo_base64', 'logo'),
+    ):
+        queryset = (
+            model.objects.exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''})
+            .only('id', field)
+        )
+        for instance in queryset.iterator(chunk_size=100):
+            name = getattr(instance, field).name
+            if not default_storage.exists(name):
+                continue
+            with default_storage.open(name, 'rb') as image_file:
+                encoded = base64.b64encode(image_file.read()).decode('utf-8')
+            model.objects.filter(pk=instance.pk).update(**{legacy_field: encoded})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_user_authz_version'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='user',
+            old_name='profile_image',
+            new_name='profile_image_base64',
+        ),
+        migrations.RenameField(
+            model_name='company',
+            old_name='logo',
+            new_name='logo_base64',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_image',
+            field=models.ImageField(blank=True, help_text='Imagen de perfil almacenada en el storage de archivos', max_length=255, null=True, upload_to='profiles/'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='logo',
+            field=models.ImageField(blank=True, max_length=255, null=True, upload_to='logos/', verbose_name='Logo'),
+        ),
+        migrations.RunPython(base64_to_storage, storage_to_base64),
+        migrations.RemoveField(
+            model_name='user',
+            name='profile_image_base64',
+        ),
+        migrations.RemoveField(
+            model_name='company',
+            name='logo_base64',
+        ),
+    ]
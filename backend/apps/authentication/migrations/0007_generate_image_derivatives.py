@@ -0,0 +1,95 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:00
+
+import os
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations
+from PIL import Image, ImageOps
+
+# Copia de apps.authentication.images al crear esta migración: los cambios posteriores
+# de ese módulo no deben alterar una migración ya aplicada
+IMAGE_DERIVATIVE_SIZES = (32, 64, 256)
+IMAGE_DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'png': ('PNG', {'optimize': True}),
+}
+MAX_IMAGE_PIXELS = 40_000_000
+
+CONTENT_ADDRESSED_NAME_RE = re.compile(
+    r'^(?:profiles|logos)/[0-9a-f]{2}/[0-9a-f]{64}\.(?:jpg|png|gif|webp)$'
+)
+
+
+def derivative_name(name, size, extension):
+    return f"{os.path.splitext(name)[0]}_{size}.{extension}"
+
+
+def render_derivative(image, size, image_format, options):
+    thumbnail = image.copy()
+    thumbnail.thumbnail((size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    thumbnail.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_missing_derivatives(name):
+    """Genera los derivados que falten de una imagen con nombre basado en contenido"""
+    if not CONTENT_ADDRESSED_NAME_RE.match(name) or not default_storage.exists(name):
+        return
+    missing = [
+        (size, extension)
+        for size in IMAGE_DERIVATIVE_SIZES
+        for extension in IMAGE_DERIVATIVE_FORMATS
+        if not default_storage.exists(derivative_name(name, size, extension))
+    ]
+    if not missing:
+        return
+
+    with default_storage.open(name, 'rb') as image_file:
+        content = image_file.read()
+    try:
+        with Image.open(BytesIO(content)) as image:
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                return
+            image.draft('RGB', (max(IMAGE_DERIVATIVE_SIZES), max(IMAGE_DERIVATIVE_SIZES)))
+            image = ImageOps.exif_transpose(image).convert('RGBA')
+            derivatives = {
+                (size, extension): render_derivative(image, size, *IMAGE_DERIVATIVE_FORMATS[extension])
+                for size, extension in missing
+            }
+    except Exception:
+        # Imagen inválida: se omite, igual que al subirla
+        return
+
+    for (size, extension), derivative in derivatives.items():
+        default_storage.save(derivative_name(name, size, extension), ContentFile(derivative))
+
+
+def generate_derivatives(apps, schema_editor):
+    """Genera las miniaturas de las imágenes migradas desde Base64"""
+    Company = apps.get_model('authentication', 'Company')
+    User = apps.get_model('authentication', 'User')
+
+    for model, field in ((User, 'profile_image'), (Company, 'logo')):
+        names = (
+            model.objects.exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''})
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        for name in names.iterator(chunk_size=100):
+            generate_missing_derivatives(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_move_images_to_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(generate_derivatives, migrations.RunPython.noop),
+    ]
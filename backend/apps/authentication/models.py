@@ -1,9 +1,21 @@
-import base64
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
-from django.core.files.base import ContentFile
+import re
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Q
 from django.core.exceptions import ValidationError
-import os
+
+
+class CompanyQuerySet(models.QuerySet):
+    """QuerySet de empresas con anotaciones de conteo de usuarios"""
+
+    def with_user_counts(self):
+        """Anota los conteos de usuarios (total, activos, clientes, staff) en una sola consulta agrupada"""
+        return self.annotate(
+            users_count=Count('users'),
+            active_users_count=Count('users', filter=Q(users__is_active=True)),
+            client_users_count=Count('users', filter=Q(users__is_client=True)),
+            staff_users_count=Count('users', filter=Q(users__is_staff=True)),
+        )
 
 
 class Company(models.Model):
@@ -53,7 +65,7 @@ class Company(models.Model):
 
     name = models.CharField(max_length=200, verbose_name="Nombre de la Empresa")
     domain = models.CharField(max_length=100, unique=True, verbose_name="Dominio")
-    logo = models.TextField(blank=True, null=True, verbose_name="Logo (Base64)")
+    logo = models.ImageField(upload_to='logos/', max_length=255, blank=True, null=True, verbose_name="Logo")
     rubro = models.CharField(max_length=50, choices=RUBRO_CHOICES, verbose_name="Rubro")
     pais = models.CharField(max_length=2, choices=PAIS_CHOICES, verbose_name="País")
     direccion = models.TextField(blank=True, verbose_name="Dirección")
@@ -65,6 +77,8 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
 
+    objects = CompanyQuerySet.as_manager()
+
     class Meta:
         db_table = 'auth_company'
         verbose_name = 'Empresa'
@@ -92,7 +106,7 @@ class Company(models.Model):
     def logo_url(self):
         """Retorna la URL del logo para el frontend"""
         if self.logo:
-            return f"data:image/png;base64,{self.logo}"
+            return self.logo.url
         return None
 
     @property
@@ -107,11 +121,79 @@ class Company(models.Model):
 
     def get_users_count(self):
         """Retorna el número de usuarios asociados a esta empresa"""
+        # Usar la anotación de with_user_counts() si está disponible
+        if hasattr(self, 'users_count'):
+            return self.users_count
         return self.users.count()
 
 
+def base_username_for_email(email):
+    """Retorna el username base derivado del email"""
+    return email.split('@')[0]
+
+
+def pick_free_username(base_username, taken):
+    """
+    Retorna el primer username libre para la base dada: ``base``, ``base1``, ``base2``...
+
+    Args:
+        base_username: Username base
+        taken: Conjunto de usernames ocupados que comienzan con la base
+    """
+    if base_username not in taken:
+        return base_username
+
+    # Sólo interesan los sufijos numéricos de la misma base
+    pattern = re.compile(r'^%s(\d+)$' % re.escape(base_username))
+    used = {int(match.group(1)) for match in map(pattern.match, taken) if match}
+    counter = 1
+    while counter in used:
+        counter += 1
+    return f"{base_username}{counter}"
+
+
 class UserManager(BaseUserManager):
     """Manager personalizado para el modelo User"""
+
+    def taken_usernames(self, base_usernames, exclude_id=None):
+        """
+        Obtiene en una sola consulta los usernames que comienzan con alguna de las bases
+        
+        Args:
+            base_usernames: Bases a consultar
+            exclude_id: ID de usuario a excluir (el propio usuario al guardar)
+        """
+        condition = Q()
+        for base_username in set(base_usernames):
+            condition |= Q(username__startswith=base_username)
+        if not condition:
+            return set()
+
+        queryset = self.model.objects.filter(condition)
+        if exclude_id is not None:
+            queryset = queryset.exclude(id=exclude_id)
+        return set(queryset.values_list('username', flat=True))
+
+    def generate_username(self, email, exclude_id=None):
+        """Genera un username libre a partir del email con una sola consulta"""
+        base_username = base_username_for_email(email)
+        return pick_free_username(base_username, self.taken_usernames([base_username], exclude_id))
+
+    def assign_usernames(self, users, chunk_size=200):
+        """
+        Asigna usernames libres a usuarios sin guardar, para creación masiva.
+        
+        Consulta las bases en lotes y resuelve las colisiones en memoria, incluidas
+        las que se producen entre los propios usuarios del lote.
+        """
+        pending = [user for user in users if not user.username]
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            taken = self.taken_usernames(base_username_for_email(user.email) for user in chunk)
+            for user in chunk:
+                user.username = pick_free_username(base_username_for_email(user.email), taken)
+                taken.add(user.username)
+        return users
     
     def create_user(self, email, password=None, **extra_fields):
         """Crear usuario normal"""
@@ -120,19 +202,7 @@ class UserManager(BaseUserManager):
         
         email = self.normalize_email(email)
         
-        # Generar username automáticamente si no se proporciona
-        if 'username' not in extra_fields or not extra_fields['username']:
-            base_username = email.split('@')[0]
-            username = base_username
-            counter = 1
-            
-            # Verificar que el username sea único
-            while self.model.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            
-            extra_fields['username'] = username
-        
+        # Si no se proporciona username, User.save() lo genera automáticamente
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
@@ -214,7 +284,18 @@ class User(AbstractUser):
     is_client = models.BooleanField(default=True)
     cargo = models.CharField(max_length=100, blank=True, verbose_name="Cargo")
     departamento = models.CharField(max_length=100, blank=True, verbose_name="Departamento")
-    profile_image = models.TextField(blank=True, null=True, help_text="Imagen de perfil en Base64")
+    profile_image = models.ImageField(
+        upload_to='profiles/',
+        max_length=255,
+        blank=True,
+        null=True,
+        help_text="Imagen de perfil almacenada en el storage de archivos"
+    )
+    authz_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Versión de autorización",
+        help_text="Se incrementa al cambiar empresa, rol o estado para revocar tokens con claims"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -244,7 +325,7 @@ class User(AbstractUser):
     def profile_image_url(self):
         """Retorna la URL de la imagen de perfil para el frontend"""
         if self.profile_image:
-            return f"data:image/png;base64,{self.profile_image}"
+            return self.profile_image.url
         return None
 
     @property
@@ -268,19 +349,36 @@ class User(AbstractUser):
         """Verifica si el usuario puede gestionar usuarios"""
         return self.is_admin() or self.has_role('manager')
 
+    USERNAME_GENERATION_ATTEMPTS = 3
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """
+        Un save() sin update_fields no reescribe authz_version: sólo se modifica con
+        bump_authz_version (UPDATE con F()), y una instancia cargada antes de una
+        revocación reescribiría su valor anterior y volvería a validar los tokens revocados.
+        Si el UPDATE no afecta filas, el INSERT posterior de Django sí lo incluye.
+        """
+        if update_fields is None:
+            values = [value for value in values if value[0].attname != 'authz_version']
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
     def save(self, *args, **kwargs):
         """Override save para generar username automáticamente si no existe"""
-        if not self.username:
-            # Generar username basado en el email
-            base_username = self.email.split('@')[0]
-            username = base_username
-            counter = 1
-            
-            # Verificar que el username sea único
-            while User.objects.filter(username=username).exclude(id=self.id).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            
-            self.username = username
-        
-        super().save(*args, **kwargs)
+        if self.username:
+            return super().save(*args, **kwargs)
+
+        # El username generado se guarda aunque se indiquen otros update_fields
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'username'}
+
+        # Generar username basado en el email; si otro proceso toma el mismo
+        # username entre la consulta y el INSERT, reintentar con uno nuevo
+        for attempt in range(self.USERNAME_GENERATION_ATTEMPTS):
+            self.username = User.objects.generate_username(self.email, exclude_id=self.id)
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                username_taken = User.objects.filter(username=self.username).exclude(id=self.id).exists()
+                if not username_taken or attempt == self.USERNAME_GENERATION_ATTEMPTS - 1:
+                    raise
@@ -1,7 +1,15 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from .images import (
+    COMPANY_LOGOS_FOLDER, PROFILE_IMAGES_FOLDER, build_derivative_urls, build_image_url,
+    process_image_upload, store_processed_image
+)
 from .models import User, Company, Role
+from .tokens import add_authz_claims, claims_auth_enabled
 
 
 class CompanySerializer(serializers.ModelSerializer):
@@ -9,17 +17,35 @@ class CompanySerializer(serializers.ModelSerializer):
     pais_display = serializers.CharField(read_only=True)
     rubro_display = serializers.CharField(read_only=True)
     users_count = serializers.IntegerField(read_only=True)
-    logo_url = serializers.CharField(read_only=True)
+    active_users_count = serializers.IntegerField(read_only=True)
+    client_users_count = serializers.IntegerField(read_only=True)
+    staff_users_count = serializers.IntegerField(read_only=True)
+    logo_url = serializers.SerializerMethodField()
+    logo_thumbnails = serializers.SerializerMethodField()
     logo_file = serializers.FileField(write_only=True, required=False, help_text="Archivo de imagen para el logo")
 
     class Meta:
         model = Company
+        # Columnas y relaciones que leen los campos calculados (optimizador de querysets)
+        source_fields = ('logo', 'pais', 'rubro')
         fields = [
-            'id', 'name', 'domain', 'logo', 'logo_url', 'logo_file', 'rubro', 'rubro_display',
+            'id', 'name', 'domain', 'logo', 'logo_url', 'logo_thumbnails', 'logo_file', 'rubro', 'rubro_display',
             'pais', 'pais_display', 'direccion', 'telefono', 'email_contacto',
-            'website', 'descripcion', 'activo', 'created_at', 'updated_at', 'users_count'
+            'website', 'descripcion', 'activo', 'created_at', 'updated_at', 'users_count',
+            'active_users_count', 'client_users_count', 'staff_users_count'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'users_count']
+        read_only_fields = [
+            'id', 'logo', 'created_at', 'updated_at', 'users_count',
+            'active_users_count', 'client_users_count', 'staff_users_count'
+        ]
+
+    def get_logo_url(self, obj):
+        """Retorna la URL absoluta del logo"""
+        return build_image_url(obj.logo, self.context.get('request'))
+
+    def get_logo_thumbnails(self, obj):
+        """Retorna las URLs de las miniaturas del logo por tamaño y formato"""
+        return build_derivative_urls(obj.logo, self.context.get('request'))
 
     def validate_logo_file(self, value):
         """Validar archivo de imagen"""
@@ -32,34 +58,32 @@ class CompanySerializer(serializers.ModelSerializer):
             # Verificar tamaño (máximo 5MB)
             if value.size > 5 * 1024 * 1024:
                 raise serializers.ValidationError("El archivo no puede ser mayor a 5MB.")
+
+            # Decodificar y generar miniaturas en el pool de hilos
+            try:
+                return process_image_upload(value)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
         
         return value
 
     def create(self, validated_data):
-        """Crear empresa con conversión de imagen a Base64"""
+        """Crear empresa guardando el logo en el storage de archivos"""
         logo_file = validated_data.pop('logo_file', None)
         
         if logo_file:
-            # Convertir imagen a Base64
-            import base64
-            logo_file.seek(0)
-            logo_data = logo_file.read()
-            logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-            validated_data['logo'] = logo_base64
+            # Guardar imagen y miniaturas con nombres basados en su contenido
+            validated_data['logo'] = store_processed_image(logo_file, COMPANY_LOGOS_FOLDER)
         
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        """Actualizar empresa con conversión de imagen a Base64"""
+        """Actualizar empresa guardando el logo en el storage de archivos"""
         logo_file = validated_data.pop('logo_file', None)
         
         if logo_file:
-            # Convertir imagen a Base64
-            import base64
-            logo_file.seek(0)
-            logo_data = logo_file.read()
-            logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-            validated_data['logo'] = logo_base64
+            # Guardar imagen y miniaturas con nombres basados en su contenido
+            validated_data['logo'] = store_processed_image(logo_file, COMPANY_LOGOS_FOLDER)
         
         return super().update(instance, validated_data)
 
@@ -77,30 +101,23 @@ class CompanySerializer(serializers.ModelSerializer):
         
         return value
 
-    def validate_logo(self, value):
-        """Validación para el logo en Base64"""
-        if value:
-            try:
-                # Verificar que sea un string válido de Base64
-                import base64
-                base64.b64decode(value)
-            except Exception:
-                raise serializers.ValidationError("El logo debe estar en formato Base64 válido.")
-        
-        return value
-
 
 class CompanyListSerializer(serializers.ModelSerializer):
     """Serializer simplificado para listar empresas"""
     pais_display = serializers.CharField(read_only=True)
     rubro_display = serializers.CharField(read_only=True)
     users_count = serializers.IntegerField(read_only=True)
+    active_users_count = serializers.IntegerField(read_only=True)
+    client_users_count = serializers.IntegerField(read_only=True)
+    staff_users_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Company
+        source_fields = ('pais', 'rubro')
         fields = [
             'id', 'name', 'domain', 'rubro', 'rubro_display',
-            'pais', 'pais_display', 'activo', 'users_count'
+            'pais', 'pais_display', 'activo', 'users_count',
+            'active_users_count', 'client_users_count', 'staff_users_count'
         ]
 
 
@@ -109,6 +126,7 @@ class RoleSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Role
+        source_fields = ('name',)
         fields = [
             'id', 'name', 'display_name', 'description', 'permissions', 'is_active',
             'created_at', 'updated_at'
@@ -125,7 +143,8 @@ class UserSerializer(serializers.ModelSerializer):
     role_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     role_name = serializers.CharField(read_only=True)
     full_name = serializers.CharField(read_only=True)
-    profile_image_url = serializers.CharField(read_only=True)
+    profile_image_url = serializers.SerializerMethodField()
+    profile_image_thumbnails = serializers.SerializerMethodField()
     is_admin = serializers.BooleanField(read_only=True)
     can_edit_company = serializers.BooleanField(read_only=True)
     can_manage_users = serializers.BooleanField(read_only=True)
@@ -133,12 +152,15 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        source_fields = (
+            'first_name', 'last_name', 'company__name', 'role__name', 'is_superuser', 'profile_image',
+        )
         fields = [
             'id', 'email', 'username', 'first_name', 'last_name', 'full_name',
             'company', 'company_id', 'company_name', 'role', 'role_id', 'role_name',
             'phone', 'cargo', 'departamento', 'is_client', 'is_active', 'is_staff', 'is_superuser',
             'is_admin', 'can_edit_company', 'can_manage_users',
-            'profile_image_url', 'profile_image_file',
+            'profile_image_url', 'profile_image_thumbnails', 'profile_image_file',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
@@ -175,9 +197,23 @@ class UserSerializer(serializers.ModelSerializer):
             # Verificar tamaño (máximo 5MB)
             if value.size > 5 * 1024 * 1024:
                 raise serializers.ValidationError("El archivo no puede ser mayor a 5MB.")
+
+            # Decodificar y generar miniaturas en el pool de hilos
+            try:
+                return process_image_upload(value)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
         
         return value
 
+    def get_profile_image_url(self, obj):
+        """Retorna la URL absoluta de la imagen de perfil"""
+        return build_image_url(obj.profile_image, self.context.get('request'))
+
+    def get_profile_image_thumbnails(self, obj):
+        """Retorna las URLs de las miniaturas de la imagen de perfil por tamaño y formato"""
+        return build_derivative_urls(obj.profile_image, self.context.get('request'))
+
     def update(self, instance, validated_data):
         """Actualizar usuario con validación de empresa y rol"""
         company_id = validated_data.pop('company_id', None)
@@ -199,12 +235,10 @@ class UserSerializer(serializers.ModelSerializer):
                 pass
 
         if profile_image_file:
-            # Convertir imagen a Base64
-            import base64
-            profile_image_file.seek(0)
-            image_data = profile_image_file.read()
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-            validated_data['profile_image'] = image_base64
+            # Guardar imagen y miniaturas con nombres basados en su contenido
+            validated_data['profile_image'] = store_processed_image(
+                profile_image_file, PROFILE_IMAGES_FOLDER
+            )
 
         return super().update(instance, validated_data)
 
@@ -217,9 +251,6 @@ class UserSerializer(serializers.ModelSerializer):
         data['can_edit_company'] = instance.can_edit_company()
         data['can_manage_users'] = instance.can_manage_users()
         
-        # Agregar la URL de la imagen de perfil
-        data['profile_image_url'] = instance.profile_image_url
-        
         return data
 
 
@@ -230,6 +261,7 @@ class UserListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        source_fields = ('first_name', 'last_name', 'company__name')
         fields = [
             'id', 'email', 'full_name', 'company_name', 'cargo', 'departamento',
             'is_client', 'is_active', 'created_at'
@@ -258,6 +290,44 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Serializer de refresh que vuelve a emitir los claims de autorización vigentes"""
+
+    def validate(self, attrs):
+        if not claims_auth_enabled():
+            return super().validate(attrs)
+
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        user = User.objects.select_related('company', 'role').filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        add_authz_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # La app token_blacklist no está instalada
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     """Serializer para el registro de usuarios"""
     password = serializers.CharField(write_only=True)
@@ -0,0 +1,475 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .hashing import hash_passwords, init_hashing_worker
+from .models import Company, Role, User
+
+COMPANY_STATS_CACHE_KEY = 'company_stats:{company_id}'
+
+
+class CompanyStatsService:
+    """
+    Servicio para obtener estadísticas de empresas con cache
+    """
+
+    @staticmethod
+    def _cache_key(company_id) -> str:
+        return COMPANY_STATS_CACHE_KEY.format(company_id=company_id)
+
+    @staticmethod
+    def get_user_stats(company_id) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene los datos de la empresa y el conteo de sus usuarios en una sola consulta
+        
+        Args:
+            company_id: ID de la empresa
+            
+        Returns:
+            Diccionario con estadísticas o None si la empresa no existe
+        """
+        key = CompanyStatsService._cache_key(company_id)
+        stats = cache.get(key)
+        if stats is not None:
+            return stats
+
+        company = (
+            Company.objects.filter(id=company_id)
+            .with_user_counts()
+            .values(
+                'id', 'name', 'domain', 'users_count', 'active_users_count',
+                'client_users_count', 'staff_users_count', 'created_at', 'updated_at'
+            )
+            .first()
+        )
+        if company is None:
+            return None
+
+        stats = {
+            'id': company['id'],
+            'name': company['name'],
+            'domain': company['domain'],
+            'total_users': company['users_count'],
+            'active_users': company['active_users_count'],
+            'client_users': company['client_users_count'],
+            'staff_users': company['staff_users_count'],
+            'created_at': company['created_at'],
+            'updated_at': company['updated_at'],
+        }
+        cache.set(key, stats, getattr(settings, 'COMPANY_STATS_CACHE_TIMEOUT', 300))
+        return stats
+
+    @staticmethod
+    def invalidate(company_ids: Iterable[Optional[int]]) -> None:
+        """Invalida las estadísticas en cache al confirmar la transacción"""
+        keys = [
+            CompanyStatsService._cache_key(company_id)
+            for company_id in set(company_ids) if company_id is not None
+        ]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# Entidades admitidas por la importación masiva, en orden de inserción
+ACCOUNT_IMPORT_ENTITIES = ('roles', 'companies', 'users')
+
+# Columnas aceptadas por entidad. En usuarios, ``company`` es el dominio de la
+# empresa y ``role`` el nombre del rol (existentes o incluidos en la importación)
+ROLE_IMPORT_FIELDS = ('name', 'description', 'permissions', 'is_active')
+COMPANY_IMPORT_FIELDS = (
+    'name', 'domain', 'rubro', 'pais', 'direccion', 'telefono',
+    'email_contacto', 'website', 'descripcion', 'activo',
+)
+USER_IMPORT_FIELDS = (
+    'email', 'first_name', 'last_name', 'password', 'company', 'role',
+    'phone', 'cargo', 'departamento', 'is_client', 'is_active',
+)
+
+# Por debajo de esta cantidad de contraseñas no compensa levantar procesos
+PARALLEL_HASHING_THRESHOLD = 16
+
+TRUE_VALUES = {'true', '1', 'si', 'sí', 'yes', 'y', 's'}
+FALSE_VALUES = {'false', '0', 'no', 'n'}
+
+
+def _parse_bool(row, field: str, default: bool) -> bool:
+    value = row.get(field)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValidationError({field: ['Valor booleano inválido.']})
+
+
+def _clean_text(value) -> str:
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+class AccountImportService:
+    """
+    Servicio para importar masivamente roles, empresas y usuarios desde CSV o JSON.
+
+    Las filas se validan en lotes (una consulta de unicidad por lote), las
+    contraseñas se hashean (en un pool de procesos si ``hashing_workers`` > 1) y las
+    filas válidas se insertan con ``bulk_create`` dentro de una única transacción.
+    Las filas inválidas no se insertan y se informan en el reporte con su número de fila.
+
+    Por defecto se hashea en el proceso actual: en un worker web no se deben crear
+    procesos hijos. El comando import_accounts usa PASSWORD_HASHING_WORKERS procesos
+    (0 = núcleos disponibles).
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, hashing_workers: int = 1):
+        self.batch_size = batch_size or getattr(settings, 'ACCOUNT_IMPORT_BATCH_SIZE', 500)
+        self.hashing_workers = hashing_workers or os.cpu_count() or 1
+
+    @staticmethod
+    def parse_file(uploaded_file, entity: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Convierte un archivo CSV o JSON en el diccionario de filas por entidad.
+
+        Un JSON puede ser un objeto con las claves ``roles``, ``companies`` y
+        ``users`` o una lista de filas de la entidad indicada. Un CSV siempre
+        corresponde a una sola entidad.
+
+        Raises:
+            ValueError: Si el archivo no se puede interpretar
+        """
+        content = uploaded_file.read()
+        if isinstance(content, bytes):
+            try:
+                content = content.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                raise ValueError('El archivo debe estar codificado en UTF-8.')
+
+        name = getattr(uploaded_file, 'name', '') or ''
+        if name.lower().endswith('.json') or content.lstrip()[:1] in ('{', '['):
+            try:
+                data = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'JSON inválido: {e}')
+        else:
+            data = list(csv.DictReader(io.StringIO(content)))
+
+        return AccountImportService.normalize_payload(data, entity)
+
+    @staticmethod
+    def normalize_payload(data, entity: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Valida la estructura de los datos a importar.
+
+        Raises:
+            ValueError: Si la estructura no es válida
+        """
+        if isinstance(data, list):
+            if entity not in ACCOUNT_IMPORT_ENTITIES:
+                raise ValueError(
+                    f"Debe indicar la entidad a importar: {', '.join(ACCOUNT_IMPORT_ENTITIES)}."
+                )
+            data = {entity: data}
+
+        if not isinstance(data, dict):
+            raise ValueError('Formato de importación no válido.')
+
+        unknown = set(data) - set(ACCOUNT_IMPORT_ENTITIES)
+        if unknown:
+            raise ValueError(f"Entidades no soportadas: {', '.join(sorted(unknown))}.")
+
+        payload = {}
+        for name in ACCOUNT_IMPORT_ENTITIES:
+            rows = data.get(name) or []
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f"'{name}' debe ser una lista de objetos.")
+            payload[name] = rows
+        return payload
+
+    def run(self, data: Dict[str, List[Dict[str, Any]]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Importa roles, empresas y usuarios.
+
+        Args:
+            data: Filas por entidad (ver ``normalize_payload``)
+            dry_run: Si es True sólo valida, sin calcular hashes ni insertar
+
+        Returns:
+            Reporte con los registros creados y los errores por fila
+        """
+        data = self.normalize_payload(data)
+        report = {
+            'success': True,
+            'dry_run': dry_run,
+            'total': {name: len(data[name]) for name in ACCOUNT_IMPORT_ENTITIES},
+            'valid': {},
+            'created': {name: 0 for name in ACCOUNT_IMPORT_ENTITIES},
+            'errors': [],
+        }
+
+        roles = self._validate_roles(data['roles'], report['errors'])
+        companies = self._validate_companies(data['companies'], report['errors'])
+        users, passwords = self._validate_users(data['users'], roles, companies, report['errors'])
+
+        report['valid'] = {'roles': len(roles), 'companies': len(companies), 'users': len(users)}
+        report['errors'].sort(key=lambda error: (ACCOUNT_IMPORT_ENTITIES.index(error['entity']), error['row']))
+        report['success'] = not report['errors']
+        if dry_run:
+            return report
+
+        # Calcular los hashes fuera de la transacción para no mantenerla abierta
+        for user, password_hash in zip(users, self._hash_passwords(passwords)):
+            user.password = password_hash
+
+        try:
+            with transaction.atomic():
+                self._bulk_create(Role, roles, 'name')
+                # bulk_create toma el ID de las empresas y roles recién insertados
+                self._bulk_create(Company, companies, 'domain')
+                User.objects.assign_usernames(users)
+                self._bulk_create(User, users, 'email')
+        except IntegrityError as e:
+            # Otro proceso insertó un registro en conflicto mientras se importaba
+            report['success'] = False
+            report['error'] = f'Conflicto al insertar los registros: {e}'
+            return report
+
+        report['created'] = {'roles': len(roles), 'companies': len(companies), 'users': len(users)}
+
+        # bulk_create no emite señales: invalidar manualmente las estadísticas
+        CompanyStatsService.invalidate(user.company_id for user in users)
+        return report
+
+    def _batches(self, rows):
+        for start in range(0, len(rows), self.batch_size):
+            yield start, rows[start:start + self.batch_size]
+
+    @staticmethod
+    def _add_error(errors, entity, row_number, error):
+        if isinstance(error, ValidationError):
+            detail = error.message_dict if hasattr(error, 'error_dict') else {'non_field_errors': error.messages}
+        else:
+            detail = error
+        errors.append({'entity': entity, 'row': row_number, 'errors': detail})
+
+    @staticmethod
+    def _unknown_columns(row, fields):
+        unknown = set(row) - set(fields)
+        if unknown:
+            return {'non_field_errors': [f"Columnas no reconocidas: {', '.join(sorted(map(str, unknown)))}."]}
+        return None
+
+    def _validate_roles(self, rows, errors) -> List[Role]:
+        valid = []
+        seen = set()
+        for start, batch in self._batches(rows):
+            candidates = []
+            for offset, row in enumerate(batch):
+                row_number = start + offset + 1
+                unknown = self._unknown_columns(row, ROLE_IMPORT_FIELDS)
+                if unknown:
+                    self._add_error(errors, 'roles', row_number, unknown)
+                    continue
+                try:
+                    permissions = row.get('permissions') or {}
+                    if isinstance(permissions, str):
+                        try:
+                            permissions = json.loads(permissions)
+                        except json.JSONDecodeError:
+                            permissions = None
+                    if not isinstance(permissions, dict):
+                        raise ValidationError({'permissions': ['Debe ser un objeto JSON.']})
+                    role = Role(
+                        name=_clean_text(row.get('name')),
+                        description=_clean_text(row.get('description')),
+                        permissions=permissions,
+                        is_active=_parse_bool(row, 'is_active', True),
+                    )
+                    # Un rol sin permisos ({}) es válido aunque el campo no admita blank
+                    role.full_clean(exclude=['permissions'], validate_unique=False)
+                except ValidationError as e:
+                    self._add_error(errors, 'roles', row_number, e)
+                    continue
+                candidates.append((row_number, role))
+
+            existing = set(
+                Role.objects.filter(name__in=[role.name for _, role in candidates])
+                .values_list('name', flat=True)
+            )
+            for row_number, role in candidates:
+                if role.name in existing or role.name in seen:
+                    self._add_error(errors, 'roles', row_number, {'name': ['Ya existe un rol con este nombre.']})
+                    continue
+                seen.add(role.name)
+                valid.append(role)
+        return valid
+
+    def _validate_companies(self, rows, errors) -> List[Company]:
+        valid = []
+        seen = set()
+        for start, batch in self._batches(rows):
+            candidates = []
+            for offset, row in enumerate(batch):
+                row_number = start + offset + 1
+                unknown = self._unknown_columns(row, COMPANY_IMPORT_FIELDS)
+                if unknown:
+                    self._add_error(errors, 'companies', row_number, unknown)
+                    continue
+                try:
+                    company = Company(
+                        activo=_parse_bool(row, 'activo', True),
+                        **{
+                            field: _clean_text(row.get(field))
+                            for field in COMPANY_IMPORT_FIELDS if field != 'activo'
+                        }
+                    )
+                    company.full_clean(exclude=['logo'], validate_unique=False)
+                except ValidationError as e:
+                    self._add_error(errors, 'companies', row_number, e)
+                    continue
+                candidates.append((row_number, company))
+
+            existing = set(
+                Company.objects.filter(domain__in=[company.domain for _, company in candidates])
+                .values_list('domain', flat=True)
+            )
+            for row_number, company in candidates:
+                if company.domain in existing or company.domain in seen:
+                    self._add_error(
+                        errors, 'companies', row_number,
+                        {'domain': ['Ya existe una empresa con este dominio.']}
+                    )
+                    continue
+                seen.add(company.domain)
+                valid.append(company)
+        return valid
+
+    def _validate_users(self, rows, new_roles, new_companies, errors):
+        valid = []
+        passwords = []
+        seen = set()
+
+        referenced_roles = {_clean_text(row.get('role')) for row in rows} - {''}
+        roles = {role.name: role for role in Role.objects.filter(name__in=referenced_roles)}
+        roles.update({role.name: role for role in new_roles})
+        new_companies = {company.domain: company for company in new_companies}
+
+        for start, batch in self._batches(rows):
+            # Una consulta por lote para las empresas referenciadas
+            referenced_domains = {_clean_text(row.get('company')) for row in batch} - {''}
+            companies = {
+                company.domain: company
+                for company in Company.objects.filter(domain__in=referenced_domains)
+            }
+            companies.update(new_companies)
+
+            candidates = []
+            for offset, row in enumerate(batch):
+                row_number = start + offset + 1
+                unknown = self._unknown_columns(row, USER_IMPORT_FIELDS)
+                if unknown:
+                    self._add_error(errors, 'users', row_number, unknown)
+                    continue
+                field_errors = {}
+                company = None
+                domain = _clean_text(row.get('company'))
+                if domain:
+                    company = companies.get(domain)
+                    if company is None:
+                        field_errors['company'] = [f"No existe una empresa con el dominio '{domain}'."]
+
+                role = None
+                role_name = _clean_text(row.get('role'))
+                if role_name:
+                    role = roles.get(role_name)
+                    if role is None:
+                        field_errors['role'] = [f"No existe el rol '{role_name}'."]
+
+                flags = {}
+                for field in ('is_client', 'is_active'):
+                    try:
+                        flags[field] = _parse_bool(row, field, True)
+                    except ValidationError as e:
+                        field_errors.update(e.message_dict)
+
+                user = User(
+                    email=User.objects.normalize_email(_clean_text(row.get('email'))),
+                    first_name=_clean_text(row.get('first_name')),
+                    last_name=_clean_text(row.get('last_name')),
+                    company=company,
+                    role=role,
+                    phone=_clean_text(row.get('phone')),
+                    cargo=_clean_text(row.get('cargo')),
+                    departamento=_clean_text(row.get('departamento')),
+                    **flags
+                )
+                try:
+                    # Las claves foráneas ya se resolvieron sin consultas adicionales
+                    user.full_clean(
+                        exclude=['username', 'password', 'company', 'role', 'profile_image'],
+                        validate_unique=False,
+                    )
+                except ValidationError as e:
+                    field_errors.update(e.message_dict)
+
+                if field_errors:
+                    self._add_error(errors, 'users', row_number, field_errors)
+                    continue
+                candidates.append((row_number, user, row.get('password') or None))
+
+            existing = set(
+                User.objects.filter(email__in=[user.email for _, user, _ in candidates])
+                .values_list('email', flat=True)
+            )
+            for row_number, user, password in candidates:
+                if user.email in existing or user.email in seen:
+                    self._add_error(errors, 'users', row_number, {'email': ['Ya existe un usuario con este email.']})
+                    continue
+                seen.add(user.email)
+                valid.append(user)
+                passwords.append(password)
+        return valid, passwords
+
+    def _hash_passwords(self, passwords: List[Optional[str]]) -> List[str]:
+        """
+        Calcula los hashes de las contraseñas, en un pool de procesos si hay varios
+        workers y suficientes contraseñas.
+
+        Las filas sin contraseña quedan con una contraseña inutilizable.
+        """
+        if self.hashing_workers <= 1 or len(passwords) < PARALLEL_HASHING_THRESHOLD:
+            return hash_passwords(passwords)
+
+        # Repartir en varios bloques por proceso para equilibrar la carga
+        chunk_size = max(1, -(-len(passwords) // (self.hashing_workers * 4)))
+        chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+        # "spawn": un fork copiaría los hilos y locks del proceso padre (logging, cache)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.hashing_workers, mp_context=context, initializer=init_hashing_worker) as executor:
+            return [password_hash for hashes in executor.map(hash_passwords, chunks) for password_hash in hashes]
+
+    def _bulk_create(self, model, objects, lookup_field):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+        # Backends sin RETURNING no asignan el ID: recuperarlo por el campo único
+        missing = [obj for obj in objects if obj.pk is None]
+        if missing:
+            ids = dict(
+                model.objects.filter(**{f'{lookup_field}__in': [getattr(obj, lookup_field) for obj in missing]})
+                .values_list(lookup_field, 'id')
+            )
+            for obj in missing:
+                obj.pk = ids[getattr(obj, lookup_field)]
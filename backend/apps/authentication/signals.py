@@ -0,0 +1,99 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Company, Role, User
+from .services import CompanyStatsService
+from .tokens import bump_authz_version, forget_authz_version
+
+# Campos del usuario que forman parte de los claims de autorización
+USER_AUTHZ_FIELDS = ('company_id', 'role_id', 'is_active', 'is_staff', 'is_superuser', 'password')
+
+
+@receiver(pre_save, sender=User)
+def detect_user_authz_change(sender, instance, raw=False, **kwargs):
+    """Marca el usuario si cambió algún campo incluido en los claims del token"""
+    instance._authz_changed = False
+    instance._previous_company_id = None
+    if raw or instance.pk is None:
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values(*USER_AUTHZ_FIELDS).first()
+    if previous is None:
+        return
+
+    instance._previous_company_id = previous['company_id']
+    instance._authz_changed = any(
+        previous[field] != getattr(instance, field) for field in USER_AUTHZ_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_user_tokens(sender, instance, created, raw=False, **kwargs):
+    """Revoca los tokens con claims del usuario cuando cambió su autorización"""
+    if getattr(instance, '_authz_changed', False):
+        bump_authz_version([instance.pk])
+        # Los tokens que se emitan con esta instancia deben llevar la versión nueva
+        instance.refresh_from_db(fields=['authz_version'])
+        instance._authz_changed = False
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_company_stats(sender, instance, raw=False, **kwargs):
+    """Invalida las estadísticas de la empresa actual y la anterior del usuario"""
+    CompanyStatsService.invalidate([
+        instance.company_id, getattr(instance, '_previous_company_id', None)
+    ])
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    forget_authz_version([instance.pk])
+    CompanyStatsService.invalidate([instance.company_id])
+
+
+@receiver(pre_save, sender=Company)
+def detect_company_rename(sender, instance, raw=False, **kwargs):
+    """Marca la empresa si cambió el nombre incluido en los claims"""
+    instance._authz_changed = False
+    if raw or instance.pk is None:
+        return
+
+    previous_name = Company.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    instance._authz_changed = previous_name is not None and previous_name != instance.name
+
+
+@receiver(post_save, sender=Company)
+def revoke_company_tokens(sender, instance, created, raw=False, **kwargs):
+    if getattr(instance, '_authz_changed', False):
+        bump_authz_version(instance.users.values_list('id', flat=True))
+        instance._authz_changed = False
+    CompanyStatsService.invalidate([instance.pk])
+
+
+@receiver(post_delete, sender=Company)
+def invalidate_deleted_company_stats(sender, instance, **kwargs):
+    CompanyStatsService.invalidate([instance.pk])
+
+
+@receiver(pre_save, sender=Role)
+def detect_role_rename(sender, instance, raw=False, **kwargs):
+    """Marca el rol si cambió el nombre incluido en los claims"""
+    instance._authz_changed = False
+    if raw or instance.pk is None:
+        return
+
+    previous_name = Role.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    instance._authz_changed = previous_name is not None and previous_name != instance.name
+
+
+@receiver(post_save, sender=Role)
+def revoke_role_tokens(sender, instance, created, raw=False, **kwargs):
+    if getattr(instance, '_authz_changed', False):
+        bump_authz_version(instance.user_set.values_list('id', flat=True))
+        instance._authz_changed = False
+
+
+@receiver(pre_delete, sender=Role)
+def revoke_deleted_role_tokens(sender, instance, **kwargs):
+    # Los usuarios quedan con role=NULL mediante un UPDATE que no emite señales
+    bump_authz_version(instance.user_set.values_list('id', flat=True))
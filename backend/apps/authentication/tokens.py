@@ -0,0 +1,150 @@
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Versión usada para usuarios inexistentes o inactivos: nunca coincide con un token válido
+REVOKED_AUTHZ_VERSION = -1
+
+AUTHZ_VERSION_CACHE_KEY = 'authz_version:{user_id}'
+
+
+def claims_auth_enabled() -> bool:
+    """Indica si el modo de autorización basado en claims está activo"""
+    return getattr(settings, 'JWT_CLAIMS_AUTH', False)
+
+
+def _authz_cache_key(user_id) -> str:
+    return AUTHZ_VERSION_CACHE_KEY.format(user_id=user_id)
+
+
+def get_authz_version(user_id) -> int:
+    """
+    Retorna la versión de autorización vigente de un usuario.
+
+    Se lee desde la cache; sólo ante un fallo de cache se consulta la base de datos.
+    """
+    from .models import User
+
+    key = _authz_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list('authz_version', flat=True)
+            .first()
+        )
+        if version is None:
+            version = REVOKED_AUTHZ_VERSION
+        cache.set(key, version, getattr(settings, 'JWT_AUTHZ_VERSION_CACHE_TIMEOUT', 300))
+    return version
+
+
+def bump_authz_version(user_ids: Iterable[int]) -> None:
+    """
+    Incrementa la versión de autorización de los usuarios indicados, revocando
+    los tokens con claims emitidos hasta ahora.
+    """
+    from .models import User
+
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+
+    User.objects.filter(pk__in=user_ids).update(authz_version=F('authz_version') + 1)
+    forget_authz_version(user_ids)
+
+
+def forget_authz_version(user_ids: Iterable[int]) -> None:
+    """Elimina de la cache las versiones de autorización al confirmar la transacción"""
+    keys = [_authz_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def add_authz_claims(token, user) -> None:
+    """Agrega al token los claims de empresa, rol y versión de autorización"""
+    company = user.company
+    token['company_id'] = company.id if company else None
+    token['company_name'] = company.name if company else None
+    token['role'] = user.role.name if user.role else None
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token['authz_version'] = user.authz_version
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token que incluye los claims de autorización del usuario"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        add_authz_claims(token, user)
+        return token
+
+
+def get_tokens_for_user(user) -> Dict[str, str]:
+    """Genera el par de tokens JWT para el usuario según el modo configurado"""
+    token_class = ClaimsRefreshToken if claims_auth_enabled() else RefreshToken
+    refresh = token_class.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+class TokenCompany(NamedTuple):
+    """Empresa reconstruida desde los claims del token, sin acceso a la base de datos"""
+    id: int
+    name: str
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuario construido únicamente desde los claims del token.
+
+    Expone la misma interfaz de lectura que ``User`` para empresa y rol, de modo que
+    las vistas de sólo lectura funcionan sin consultar la base de datos.
+    """
+
+    @property
+    def company_id(self) -> Optional[int]:
+        return self.token.get('company_id')
+
+    @property
+    def company(self) -> Optional[TokenCompany]:
+        if self.company_id is None:
+            return None
+        return TokenCompany(self.company_id, self.token.get('company_name'))
+
+    @property
+    def company_name(self) -> Optional[str]:
+        return self.token.get('company_name')
+
+    def has_role(self, role_name: str) -> bool:
+        return self.token.get('role') == role_name
+
+    def is_admin(self) -> bool:
+        return self.has_role('admin') or self.is_superuser
+
+    def can_edit_company(self) -> bool:
+        return self.is_admin()
+
+    def can_manage_users(self) -> bool:
+        return self.is_admin() or self.has_role('manager')
+
+    def __getattr__(self, attr: str) -> Optional[Any]:
+        # Evitar que atributos privados se resuelvan como claims inexistentes
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return super().__getattr__(attr)
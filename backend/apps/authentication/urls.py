@@ -11,6 +11,9 @@ urlpatterns = [
     path('profile/', views.user_profile, name='profile'),
     path('profile/update/', views.update_profile, name='update_profile'),
     
+    # Imágenes de perfil y logos (con miniaturas)
+    path('images/<path:name>', views.serve_image, name='image'),
+    
     # Rutas de usuarios
     path('users/', views.UserListCreateView.as_view(), name='user_list_create'),
     path('users/<int:id>/', views.UserDetailView.as_view(), name='user_detail'),
@@ -21,6 +24,9 @@ urlpatterns = [
     path('companies/<int:company_id>/users/', views.company_users, name='company_users'),
     path('companies/<int:company_id>/stats/', views.company_stats, name='company_stats'),
     
+    # Importación masiva de roles, empresas y usuarios (CSV/JSON)
+    path('import/', views.import_accounts, name='import_accounts'),
+    
     # Rutas de roles
     path('roles/', views.RoleListCreateView.as_view(), name='role_list_create'),
     path('roles/<int:id>/', views.RoleDetailView.as_view(), name='role_detail'),
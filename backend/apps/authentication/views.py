@@ -1,15 +1,28 @@
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+import logging
+import mimetypes
+import os
 from django.contrib.auth import authenticate
+from django.core.files.storage import default_storage
 from django.db.models import Q
+from django.http import FileResponse, Http404
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_GET
+from apps.quality_data.services import QualityDataService
+from apps.core.optimization import OptimizedQuerysetMixin, optimize_queryset
+from .images import is_content_addressed
 from .models import User, Company, Role
+from .services import AccountImportService, CompanyStatsService
+from .tokens import get_tokens_for_user
 from .serializers import (
     UserSerializer, UserListSerializer, LoginSerializer, RegisterSerializer,
     CompanySerializer, CompanyListSerializer, RoleSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 
 class IsAdminUser(permissions.BasePermission):
     """Permiso personalizado para verificar si el usuario es administrador"""
@@ -27,7 +40,7 @@ class IsAdminOrManager(permissions.BasePermission):
         )
 
 
-class CompanyListCreateView(generics.ListCreateAPIView):
+class CompanyListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
     """Vista para listar y crear empresas"""
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
@@ -57,14 +70,15 @@ class CompanyListCreateView(generics.ListCreateAPIView):
         if activo is not None:
             queryset = queryset.filter(activo=activo.lower() == 'true')
         
-        return queryset.select_related().prefetch_related('users')
+        # Meta.ordering no se aplica en consultas con GROUP BY
+        return queryset.with_user_counts().order_by('name')
 
     def perform_create(self, serializer):
         """Crear empresa con validaciones adicionales"""
         serializer.save()
 
 
-class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CompanyDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Vista para obtener, actualizar y eliminar una empresa específica"""
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
@@ -78,7 +92,7 @@ class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        return Company.objects.select_related().prefetch_related('users')
+        return Company.objects.with_user_counts()
 
     def perform_update(self, serializer):
         """Actualizar empresa con validaciones"""
@@ -86,15 +100,15 @@ class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy(self, instance):
         """Eliminar empresa con validaciones"""
-        # Verificar si hay usuarios asociados
-        if instance.users.exists():
+        # Verificar si hay usuarios asociados (conteo anotado en get_queryset)
+        if instance.get_users_count() > 0:
             raise permissions.PermissionDenied(
                 "No se puede eliminar una empresa que tiene usuarios asociados."
             )
         instance.delete()
 
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
     """Vista para listar y crear usuarios"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -133,7 +147,7 @@ class UserListCreateView(generics.ListCreateAPIView):
         serializer.save()
 
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Vista para obtener, actualizar y eliminar un usuario específico"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -166,18 +180,15 @@ def login_view(request):
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
-        # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
+        # Generar tokens JWT (con claims de autorización si el modo está activo)
+        tokens = get_tokens_for_user(user)
         
         # Serializar datos del usuario
-        user_serializer = UserSerializer(user)
+        user_serializer = UserSerializer(user, context={'request': request})
         
         return Response({
             'user': user_serializer.data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            'tokens': tokens
         }, status=status.HTTP_200_OK)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -187,7 +198,7 @@ def login_view(request):
 @permission_classes([permissions.IsAuthenticated])
 def user_profile(request):
     """Vista para obtener el perfil del usuario autenticado"""
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(request.user, context={'request': request})
     return Response({'user': serializer.data}, status=status.HTTP_200_OK)
 
 
@@ -195,22 +206,25 @@ def user_profile(request):
 @permission_classes([permissions.IsAuthenticated])
 def update_profile(request):
     """Vista para actualizar el perfil del usuario autenticado"""
-    print(f"Recibiendo datos: {request.data}")
-    print(f"Archivos: {request.FILES}")
+    # Sólo los nombres de los campos: los valores pueden incluir datos personales
+    logger.debug('Actualizando perfil', extra={
+        'user_id': request.user.id,
+        'fields': sorted(request.data.keys()),
+        'files': sorted(request.FILES.keys()),
+    })
     
     # Combinar datos y archivos
     data = request.data.copy()
     if request.FILES:
         data.update(request.FILES.dict())
     
-    serializer = UserSerializer(request.user, data=data, partial=True)
+    serializer = UserSerializer(request.user, data=data, partial=True, context={'request': request})
     
     if serializer.is_valid():
-        print(f"Datos válidos: {serializer.validated_data}")
         serializer.save()
         return Response({'user': serializer.data}, status=status.HTTP_200_OK)
     else:
-        print(f"Errores de validación: {serializer.errors}")
+        logger.info('Perfil inválido', extra={'user_id': request.user.id, 'errors': serializer.errors})
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -221,7 +235,7 @@ def company_users(request, company_id):
     """Vista para obtener todos los usuarios de una empresa específica"""
     try:
         company = Company.objects.get(id=company_id)
-        users = company.users.all()
+        users = optimize_queryset(company.users.all(), UserListSerializer)
         serializer = UserListSerializer(users, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Company.DoesNotExist:
@@ -231,7 +245,7 @@ def company_users(request, company_id):
         )
 
 
-class RoleListCreateView(generics.ListCreateAPIView):
+class RoleListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
     """Vista para listar y crear roles"""
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
@@ -253,7 +267,7 @@ class RoleListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class RoleDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RoleDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Vista para obtener, actualizar y eliminar un rol específico"""
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
@@ -265,25 +279,74 @@ class RoleDetailView(generics.RetrieveUpdateDestroyAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def company_stats(request, company_id):
     """Vista para obtener estadísticas de una empresa"""
-    try:
-        company = Company.objects.get(id=company_id)
-        
-        # Estadísticas básicas
-        stats = {
-            'id': company.id,
-            'name': company.name,
-            'domain': company.domain,
-            'total_users': company.get_users_count(),
-            'active_users': company.users.filter(is_active=True).count(),
-            'client_users': company.users.filter(is_client=True).count(),
-            'staff_users': company.users.filter(is_staff=True).count(),
-            'created_at': company.created_at,
-            'updated_at': company.updated_at,
-        }
-        
-        return Response(stats, status=status.HTTP_200_OK)
-    except Company.DoesNotExist:
+    # Usuarios (una consulta agregada) y datos de calidad, ambos en cache por empresa
+    stats = CompanyStatsService.get_user_stats(company_id)
+    if stats is None:
         return Response(
             {'error': 'Empresa no encontrada'}, 
             status=status.HTTP_404_NOT_FOUND
         )
+
+    stats = {
+        **stats,
+        'quality_data': QualityDataService.get_company_quality_counts(stats['name']),
+    }
+    
+    return Response(stats, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_accounts(request):
+    """
+    Vista para importar masivamente roles, empresas y usuarios.
+
+    Acepta un archivo CSV/JSON en ``file`` (con ``entity`` para CSV o listas JSON)
+    o un cuerpo JSON con las claves ``roles``, ``companies`` y ``users``.
+    Con ``dry_run=true`` sólo valida las filas.
+    """
+    options = request.data if hasattr(request.data, 'get') else {}
+    entity = request.query_params.get('entity') or options.get('entity')
+    dry_run = str(request.query_params.get('dry_run') or options.get('dry_run', '')).lower() == 'true'
+
+    try:
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file:
+            data = AccountImportService.parse_file(uploaded_file, entity)
+        else:
+            payload = request.data
+            if isinstance(payload, dict):
+                payload = {key: value for key, value in payload.items() if key not in ('entity', 'dry_run')}
+            data = AccountImportService.normalize_payload(payload, entity)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    report = AccountImportService().run(data, dry_run=dry_run)
+
+    if report.get('error'):
+        return Response(report, status=status.HTTP_409_CONFLICT)
+    if dry_run or not any(report['created'].values()):
+        return Response(report, status=status.HTTP_200_OK)
+    return Response(report, status=status.HTTP_201_CREATED)
+
+
+def _image_etag(request, name):
+    """El nombre de la imagen deriva de su contenido, por lo que sirve como ETag"""
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+@require_GET
+@cache_control(public=True, max_age=31536000, immutable=True)
+@etag(_image_etag)
+def serve_image(request, name):
+    """
+    Sirve imágenes de perfil, logos y sus miniaturas almacenadas por contenido.
+
+    Al ser inmutables se envían con cache de larga duración y ETag; no requiere
+    autenticación para poder usarse directamente en etiquetas <img>.
+    """
+    if not is_content_addressed(name) or not default_storage.exists(name):
+        raise Http404('Imagen no encontrada')
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    return FileResponse(default_storage.open(name, 'rb'), content_type=content_type)
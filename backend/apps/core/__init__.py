@@ -0,0 +1 @@
+# Utilidades compartidas entre apps
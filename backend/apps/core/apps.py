@@ -0,0 +1,23 @@
+from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Núcleo'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .db.pool import publish_pool_stats_on_request_finished
+        from .metrics import install_query_recorder
+
+        request_finished.connect(
+            publish_pool_stats_on_request_finished,
+            dispatch_uid='apps.core.publish_pool_stats',
+        )
+        connection_created.connect(
+            install_query_recorder,
+            dispatch_uid='apps.core.install_query_recorder',
+        )
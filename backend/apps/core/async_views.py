@@ -0,0 +1,83 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView cuyos handlers son corutinas, para servir bajo ASGI sin ocupar un hilo.
+
+    La negociación, autenticación, permisos y throttling de DRF pueden consultar la
+    base de datos, por lo que se ejecutan con ``sync_to_async``; el handler corre en
+    el event loop y debe usar el ORM async (o ``sync_to_async``) para acceder a datos.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            # OPTIONS y los errores 405 se resuelven con los handlers síncronos de APIView
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_api_view(http_method_names=None):
+    """
+    Equivalente de ``@api_view`` para funciones ``async def``.
+
+    Respeta los decoradores ``@authentication_classes``, ``@permission_classes``,
+    etc. aplicados debajo, igual que ``@api_view``.
+    """
+    http_method_names = ['GET'] if http_method_names is None else http_method_names
+
+    def decorator(func):
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f'{func.__name__} debe ser una función async')
+
+        WrappedAsyncAPIView = type('WrappedAsyncAPIView', (AsyncAPIView,), {'__doc__': func.__doc__})
+
+        allowed_methods = set(http_method_names) | {'options'}
+        WrappedAsyncAPIView.http_method_names = [method.lower() for method in allowed_methods]
+
+        @wraps(func)
+        async def handler(self, *args, **kwargs):
+            return await func(*args, **kwargs)
+
+        for method in http_method_names:
+            setattr(WrappedAsyncAPIView, method.lower(), handler)
+
+        WrappedAsyncAPIView.__name__ = func.__name__
+        WrappedAsyncAPIView.__qualname__ = func.__qualname__
+
+        for attr, default in (
+            ('renderer_classes', api_settings.DEFAULT_RENDERER_CLASSES),
+            ('parser_classes', api_settings.DEFAULT_PARSER_CLASSES),
+            ('authentication_classes', api_settings.DEFAULT_AUTHENTICATION_CLASSES),
+            ('throttle_classes', api_settings.DEFAULT_THROTTLE_CLASSES),
+            ('permission_classes', api_settings.DEFAULT_PERMISSION_CLASSES),
+        ):
+            setattr(WrappedAsyncAPIView, attr, getattr(func, attr, default))
+
+        return WrappedAsyncAPIView.as_view()
+
+    return decorator
@@ -0,0 +1,43 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from .metrics import record_cache_read
+
+_MISSING = object()
+
+
+def cache_is_shared(alias: str = 'default') -> bool:
+    """Indica si todos los workers ven la misma cache (LocMem es propia de cada proceso)"""
+    return not isinstance(caches[alias], LocMemCache)
+
+
+class InstrumentedCacheMixin:
+    """
+    Cuenta los aciertos y fallos de lectura de la cache para las métricas de
+    Prometheus (``agro_cache_requests_total``). Las variantes async y
+    ``get_or_set`` pasan por ``get``; las escrituras no se cuentan.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            record_cache_read(0, 1)
+            return default
+        record_cache_read(1, 0)
+        return value
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    """``RedisCache`` con métricas de aciertos y fallos"""
+
+    def get_many(self, keys, version=None):
+        # RedisCache lee todas las claves en una operación sin pasar por get
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        record_cache_read(len(values), len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """``LocMemCache`` con métricas de aciertos y fallos (get_many usa get)"""
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .cache import cache_is_shared
+from .db.routers import get_replica_alias
+
+SHARED_CACHE_HINT = 'Defina REDIS_URL (el servicio redis de docker-compose) para compartir la cache entre workers'
+
+
+def _shared_cache_problem(number: int, message: str, hint: str = SHARED_CACHE_HINT):
+    """
+    Error en producción; en DEBUG sólo advertencia, porque runserver usa un único
+    proceso y la cache local basta
+    """
+    if settings.DEBUG:
+        return Warning(message, hint=hint, id=f'core.W{number:03d}')
+    return Error(message, hint=hint, id=f'core.E{number:03d}')
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Funciones que coordinan los workers a través de la cache: con LocMem cada
+    proceso ve sólo sus propias escrituras e invalidaciones
+    """
+    if cache_is_shared():
+        return []
+
+    problems = []
+    if getattr(settings, 'JWT_CLAIMS_AUTH', False):
+        problems.append(_shared_cache_problem(
+            1,
+            'JWT_CLAIMS_AUTH requiere una cache compartida: con LocMem la revocación de tokens '
+            'sólo se aplica en el worker que hizo el cambio y los demás aceptan tokens revocados '
+            'durante JWT_AUTHZ_VERSION_CACHE_TIMEOUT segundos',
+        ))
+    cached_stats = [
+        name for name in ('DASHBOARD_STATS_CACHE_TIMEOUT', 'COMPANY_STATS_CACHE_TIMEOUT')
+        if getattr(settings, name, 300) > 0
+    ]
+    if cached_stats:
+        problems.append(_shared_cache_problem(
+            2,
+            'Las estadísticas en cache se invalidan al escribir, pero con LocMem sólo en el '
+            'worker que escribió: los demás sirven datos desactualizados hasta '
+            f"{' / '.join(cached_stats)}",
+            hint=f"{SHARED_CACHE_HINT}, o desactive esa cache con {' y '.join(f'{name}=0' for name in cached_stats)}",
+        ))
+    if get_replica_alias() is not None and getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5) > 0:
+        problems.append(_shared_cache_problem(
+            3,
+            'La fijación a la base principal tras una escritura se guarda en la cache: con '
+            'LocMem las siguientes lecturas del usuario en otros workers van a la réplica y '
+            'pueden no ver sus propios cambios',
+        ))
+    # Sólo advertencia: con LocMem el circuit breaker funciona por proceso, menos eficaz
+    problems.append(Warning(
+        'El circuit breaker de la API externa guarda su estado en la cache: con LocMem cada '
+        'proceso cuenta sus fallos y abre su propio circuito, y los demás siguen llamando a '
+        'la API caída',
+        hint=SHARED_CACHE_HINT,
+        id='core.W004',
+    ))
+    return problems
@@ -0,0 +1,71 @@
+from django.db.backends.postgresql import base
+
+from apps.core.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+# Estado de transacción IDLE (igual en psycopg2 y psycopg 3)
+TRANSACTION_STATUS_IDLE = 0
+
+
+def _check_connection(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+def _reset_connection(connection) -> None:
+    if connection.closed:
+        raise base.Database.InterfaceError('La conexión está cerrada')
+    if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Backend PostgreSQL que toma las conexiones de un pool compartido por el proceso.
+
+    Django sigue abriendo y cerrando la conexión en cada petición (``CONN_MAX_AGE = 0``),
+    pero cerrar sólo la devuelve al pool; funciona igual bajo WSGI y ASGI, donde las
+    conexiones persistentes por hilo no son adecuadas. La configuración se toma de la
+    clave ``POOL`` de la base de datos: ``MIN_SIZE``, ``MAX_SIZE``, ``TIMEOUT``,
+    ``MAX_IDLE`` y ``HEALTH_CHECK_INTERVAL``.
+    """
+
+    def get_pool(self) -> ConnectionPool:
+        def create_pool():
+            options = self.settings_dict.get('POOL', {})
+            return ConnectionPool(
+                check=_check_connection,
+                reset=_reset_connection,
+                min_size=options.get('MIN_SIZE', 0),
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 10),
+                max_idle=options.get('MAX_IDLE', 300),
+                health_check_interval=options.get('HEALTH_CHECK_INTERVAL', 30),
+            )
+        # El nombre de la base forma parte de la clave: las pruebas cambian NAME por la de test
+        return get_pool(f"{self.alias}/{self.settings_dict['NAME']}", create_pool)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        try:
+            connection = pool.acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+            )
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+        self._pool = pool
+
+        # Igual que el backend estándar: el nivel de aislamiento sale de OPTIONS
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            base.IsolationLevel.READ_COMMITTED
+            if isolation_level is None else base.IsolationLevel(isolation_level)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Una conexión cerrada dentro de un bloque atómico no se reutiliza
+                self._pool.release(self.connection, discard=self.in_atomic_block)
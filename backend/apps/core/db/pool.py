@@ -0,0 +1,267 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+POOL_STATS_CACHE_KEY = 'db_pool_stats:{process}'
+POOL_STATS_INDEX_CACHE_KEY = 'db_pool_stats:processes'
+
+
+class PoolTimeout(Exception):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera"""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe compartido por todos los hilos de un proceso.
+
+    Las conexiones se crean bajo demanda hasta ``max_size``; al agotarse, ``acquire``
+    espera hasta ``timeout`` segundos por una conexión libre. Las conexiones ociosas
+    por más de ``max_idle`` segundos se cierran (conservando ``min_size``) y las que
+    estuvieron ociosas más de ``health_check_interval`` se verifican antes de entregarse.
+
+    Args:
+        check: Verifica una conexión ociosa; si lanza una excepción se descarta
+        reset: Prepara una conexión devuelta para reutilizarla; si lanza, se descarta
+    """
+
+    def __init__(
+        self,
+        check: Optional[Callable[[Any], None]] = None,
+        reset: Optional[Callable[[Any], None]] = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        max_idle: float = 300.0,
+        health_check_interval: float = 30.0,
+    ):
+        self.check = check
+        self.reset = reset
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._counters = dict.fromkeys(
+            ('checkouts', 'created', 'discarded', 'waits', 'timeouts', 'errors'), 0
+        )
+        self._wait_seconds = 0.0
+
+    def acquire(self, connect: Callable[[], Any]):
+        """
+        Entrega una conexión del pool, creando una nueva con ``connect`` si hay cupo.
+
+        Raises:
+            PoolTimeout: Si no se liberó una conexión dentro de ``timeout`` segundos
+        """
+        deadline = time.monotonic() + self.timeout
+        wait_started = None
+        connection = idle_since = None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    # LIFO: se reutilizan las conexiones más recientes y las demás envejecen
+                    connection, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No hay conexiones disponibles en el pool ({self.max_size}) '
+                        f'tras esperar {self.timeout} s'
+                    )
+                if wait_started is None:
+                    self._counters['waits'] += 1
+                    wait_started = time.monotonic()
+                self._condition.wait(remaining)
+
+            self._in_use += 1
+            self._counters['checkouts'] += 1
+            if wait_started is not None:
+                self._wait_seconds += time.monotonic() - wait_started
+
+        if connection is not None and self.check is not None:
+            if time.monotonic() - idle_since > self.health_check_interval:
+                try:
+                    self.check(connection)
+                except Exception:
+                    self._close_quietly(connection)
+                    with self._condition:
+                        self._counters['discarded'] += 1
+                    connection = None
+
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._counters['errors'] += 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._counters['created'] += 1
+
+        return connection
+
+    def release(self, connection, discard: bool = False) -> None:
+        """Devuelve una conexión al pool, o la cierra si ``discard`` o si no se pudo reiniciar"""
+        if not discard and self.reset is not None:
+            try:
+                self.reset(connection)
+            except Exception:
+                discard = True
+
+        to_close = [connection] if discard else []
+        now = time.monotonic()
+        with self._condition:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+                self._counters['discarded'] += 1
+            else:
+                self._idle.append((connection, now))
+
+            while (
+                self._idle
+                and self._size > self.min_size
+                and now - self._idle[0][1] > self.max_idle
+            ):
+                expired, _ = self._idle.popleft()
+                self._size -= 1
+                to_close.append(expired)
+            self._condition.notify()
+
+        for expired in to_close:
+            self._close_quietly(expired)
+
+    def close_all(self) -> None:
+        """Cierra las conexiones ociosas (las que están en uso se cierran al devolverse)"""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """Gauges y contadores del pool"""
+        with self._condition:
+            return {
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self._counters,
+                'wait_seconds': round(self._wait_seconds, 6),
+            }
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_last_published = 0.0
+
+
+def get_pool(key: str, factory: Callable[[], ConnectionPool]) -> ConnectionPool:
+    """Retorna el pool de la clave indicada en este proceso, creándolo si no existe"""
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Estadísticas de los pools de este proceso (clave ``<alias>/<base de datos>``)"""
+    return {key: pool.stats() for key, pool in list(_pools.items())}
+
+
+def _forget_pools_after_fork() -> None:
+    # Las conexiones no se pueden compartir entre procesos
+    global _pools
+    _pools = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools_after_fork)
+
+
+def _process_key() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def publish_pool_stats(force: bool = False) -> None:
+    """
+    Publica en la cache las estadísticas de los pools de este proceso.
+
+    Se ejecuta al terminar cada petición, como máximo una vez cada
+    ``DB_POOL_STATS_INTERVAL`` segundos, para que ``manage.py db_pool_stats``
+    pueda agregar los pools de todos los workers.
+    """
+    global _last_published
+    interval = getattr(settings, 'DB_POOL_STATS_INTERVAL', 10)
+    if not _pools or interval <= 0:
+        return
+    now = time.monotonic()
+    if not force and now - _last_published < interval:
+        return
+    _last_published = now
+
+    process = _process_key()
+    timeout = interval * 3
+    cache.set(POOL_STATS_CACHE_KEY.format(process=process), {
+        'pid': os.getpid(),
+        'published_at': time.time(),
+        'pools': get_pool_stats(),
+    }, timeout)
+
+    processes = cache.get(POOL_STATS_INDEX_CACHE_KEY) or {}
+    if process not in processes:
+        processes[process] = time.time()
+        cache.set(POOL_STATS_INDEX_CACHE_KEY, processes, None)
+
+
+def collect_published_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Lee las estadísticas publicadas por los procesos vivos y depura los que expiraron"""
+    processes = cache.get(POOL_STATS_INDEX_CACHE_KEY) or {}
+    if not processes:
+        return {}
+
+    keys = {POOL_STATS_CACHE_KEY.format(process=process): process for process in processes}
+    published = cache.get_many(list(keys))
+    alive = {keys[key]: value for key, value in published.items()}
+    if len(alive) != len(processes):
+        cache.set(POOL_STATS_INDEX_CACHE_KEY, {
+            process: seen for process, seen in processes.items() if process in alive
+        }, None)
+    return alive
+
+
+def publish_pool_stats_on_request_finished(sender, **kwargs) -> None:
+    publish_pool_stats()
@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_PIN_CACHE_KEY = 'db_primary_pin:{user_id}'
+
+
+class ReplicaRoutingState:
+    """
+    Estado de enrutamiento de una petición HTTP.
+
+    Una petición se fija a la base principal si su método no es de lectura, si ya
+    escribió en la base o si su usuario escribió hace menos de
+    ``DATABASE_REPLICA_PIN_SECONDS`` segundos (lectura de sus propias escrituras).
+    """
+
+    __slots__ = ('request', 'use_primary', 'wrote', '_pinned_user')
+
+    def __init__(self, request):
+        self.request = request
+        self.use_primary = request.method not in SAFE_METHODS
+        self.wrote = False
+        self._pinned_user = None
+
+    def user_id(self) -> Optional[int]:
+        # DRF asigna aquí el usuario autenticado por JWT antes de ejecutar la vista
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.id
+
+    def is_pinned(self) -> bool:
+        if self.use_primary or self.wrote:
+            return True
+
+        user_id = self.user_id()
+        if user_id is None:
+            return False
+        # La consulta a la cache se hace una sola vez por usuario y petición
+        if self._pinned_user is None or self._pinned_user[0] != user_id:
+            pinned = cache.get(PRIMARY_PIN_CACHE_KEY.format(user_id=user_id)) is not None
+            self._pinned_user = (user_id, pinned)
+        return self._pinned_user[1]
+
+
+routing_state: ContextVar[Optional[ReplicaRoutingState]] = ContextVar(
+    'replica_routing_state', default=None
+)
+
+
+def get_replica_alias() -> Optional[str]:
+    """Alias de la réplica configurada en ``DATABASES``, o None si no hay réplica"""
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    if alias and alias != DEFAULT_DB_ALIAS and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def pin_user_to_primary(user_id: int) -> None:
+    """Envía a la base principal las lecturas del usuario durante la ventana configurada"""
+    timeout = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+    if timeout > 0:
+        cache.set(PRIMARY_PIN_CACHE_KEY.format(user_id=user_id), True, timeout)
+
+
+class PrimaryReplicaRouter:
+    """
+    Envía a la réplica las lecturas de las apps en ``DATABASE_REPLICA_APPS``.
+
+    Sólo se enruta a la réplica dentro de peticiones HTTP de lectura (ver
+    ``ReplicaRoutingMiddleware``); comandos, shell y tareas de sincronización leen
+    siempre de la base principal, igual que las lecturas dentro de un bloque atómico.
+    Las escrituras van siempre a la principal y las migraciones no se aplican en la réplica.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = get_replica_alias()
+        if replica is None or model._meta.app_label not in settings.DATABASE_REPLICA_APPS:
+            return None
+
+        state = routing_state.get()
+        if state is None or state.is_pinned():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == get_replica_alias():
+            return False
+        return None
@@ -0,0 +1,204 @@
+import decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import QuerySet
+from django.db.models.query import ValuesIterable
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.decimal_places is None:
+        return field.to_representation
+
+    places = field.decimal_places
+    max_length = None if field.max_digits is None else field.max_digits + 1
+
+    def convert(value):
+        # Los valores leídos de la base de datos ya vienen con la escala del campo, por lo
+        # que str() coincide con la representación de DRF; si no, se usa la ruta estándar
+        if isinstance(value, decimal.Decimal):
+            text = str(value)
+            if places and text[-places - 1:-places] == '.' and 'E' not in text:
+                if max_length is None or len(text) - (text[0] == '-') <= max_length:
+                    return text
+        return field.to_representation(value)
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not value:
+            return None
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _choice_converter(field):
+    choices = field.choice_strings_to_values
+
+    def convert(value):
+        if value == '':
+            return value
+        return choices.get(str(value), value)
+    return convert
+
+
+def _field_converter(field) -> Callable[[Any], Any]:
+    """Retorna una función equivalente a ``field.to_representation`` para valores de values()"""
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.ChoiceField):
+        return _choice_converter(field)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return _identity
+    if type(field) in (serializers.CharField, serializers.EmailField, serializers.SlugField):
+        return str
+    if type(field) is serializers.IntegerField:
+        return int
+    if type(field) is serializers.BooleanField:
+        return lambda value: value if value is True or value is False else field.to_representation(value)
+    if type(field) is serializers.ReadOnlyField:
+        return _identity
+    return field.to_representation
+
+
+class FastValuesSerializer:
+    """
+    Serializer de sólo lectura que representa filas de ``values()`` sin instanciar modelos.
+
+    Compila una vez por clase (y zona horaria) una función de proyección equivalente
+    al ``serializer_class`` indicado: los campos del modelo se leen directamente de la
+    fila y se convierten como lo haría DRF; los campos calculados (propiedades y
+    ``SerializerMethodField``) se declaran en ``computed_fields`` como funciones
+    ``(row, prepared)``, donde ``prepared`` es el resultado de ``prepare(row)``.
+    """
+    serializer_class = None
+    # Campo -> función(row, prepared) para los campos que no son columnas del modelo
+    computed_fields: Dict[str, Callable[[Dict[str, Any], Any], Any]] = {}
+    # Columnas adicionales que leen los campos calculados
+    computed_sources: Tuple[str, ...] = ()
+
+    _projections = None
+
+    def __init__(self, instance=None, many=True, context=None):
+        if not many:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} sólo admite many=True')
+        self.instance = instance
+        self.context = context or {}
+
+    @staticmethod
+    def prepare(row):
+        """Calcula una vez por fila los valores compartidos por los campos calculados"""
+        return None
+
+    @classmethod
+    def _compile(cls) -> Tuple[List[str], Callable[[Dict[str, Any]], Dict[str, Any]]]:
+        model = cls.serializer_class.Meta.model
+        value_fields = list(cls.computed_sources)
+        namespace = {'prepare': cls.prepare}
+        items = []
+
+        for index, (name, field) in enumerate(cls.serializer_class().fields.items()):
+            if field.write_only:
+                continue
+            if name in cls.computed_fields:
+                namespace[f'compute_{index}'] = cls.computed_fields[name]
+                items.append(f'{name!r}: compute_{index}(row, prepared)')
+                continue
+
+            if field.source == '*' or len(field.source_attrs) != 1:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: el campo '{name}' debe declararse en computed_fields"
+                )
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: el campo '{name}' debe declararse en computed_fields"
+                )
+            column = model_field.attname if model_field.is_relation else model_field.name
+            if column not in value_fields:
+                value_fields.append(column)
+
+            convert = _field_converter(field)
+            if convert is _identity:
+                items.append(f'{name!r}: row[{column!r}]')
+            else:
+                # Igual que Serializer.to_representation: los atributos None se representan como None
+                namespace[f'convert_{index}'] = convert
+                items.append(
+                    f'{name!r}: None if (value := row[{column!r}]) is None else convert_{index}(value)'
+                )
+
+        # La proyección se genera como una sola función con un literal de diccionario
+        # para evitar una llamada por campo
+        source = 'def project(row):\n    prepared = prepare(row)\n    return {%s}\n' % ', '.join(items)
+        exec(compile(source, f'<{cls.__name__}>', 'exec'), namespace)
+        return value_fields, namespace['project']
+
+    @classmethod
+    def get_projection(cls):
+        """Retorna las columnas y la función de proyección compiladas para la zona horaria actual"""
+        if cls.__dict__.get('_projections') is None:
+            cls._projections = {}
+        key = str(timezone.get_current_timezone())
+        if key not in cls._projections:
+            cls._projections[key] = cls._compile()
+        return cls._projections[key]
+
+    @classmethod
+    def values(cls, queryset: QuerySet) -> QuerySet:
+        """Retorna el queryset como filas ``values()`` con las columnas que necesita la proyección"""
+        value_fields, _ = cls.get_projection()
+        return queryset.values(*value_fields)
+
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        rows = self.instance
+        if isinstance(rows, QuerySet) and not issubclass(rows._iterable_class, ValuesIterable):
+            rows = self.values(rows)
+        _, project = self.get_projection()
+        return [project(row) for row in rows]
+
+
+class FastListMixin:
+    """
+    Mixin para vistas de listado que responde con un ``FastValuesSerializer``.
+
+    Mantiene el filtrado y la paginación de la vista; sólo cambia cómo se
+    obtienen y representan las filas de la respuesta.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.fast_serializer_class.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer_class(page).data)
+
+        return Response(self.fast_serializer_class(queryset).data)
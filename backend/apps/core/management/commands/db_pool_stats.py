@@ -0,0 +1,70 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.db.pool import collect_published_pool_stats, get_pool_stats
+
+# Gauges que se suman entre procesos para el total
+SUMMED_STATS = (
+    'size', 'in_use', 'idle', 'checkouts', 'created', 'discarded',
+    'waits', 'timeouts', 'errors', 'wait_seconds',
+)
+
+
+class Command(BaseCommand):
+    help = 'Muestra las estadísticas del pool de conexiones publicadas por cada worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Imprimir las estadísticas en JSON'
+        )
+        parser.add_argument(
+            '--local',
+            action='store_true',
+            help='Mostrar sólo los pools de este proceso (útil desde un shell)'
+        )
+
+    def handle(self, *args, **options):
+        if options['local']:
+            processes = {'local': {'published_at': time.time(), 'pools': get_pool_stats()}}
+        else:
+            processes = collect_published_pool_stats()
+
+        totals = {}
+        for published in processes.values():
+            for key, stats in published['pools'].items():
+                total = totals.setdefault(key, dict.fromkeys(SUMMED_STATS, 0))
+                for name in SUMMED_STATS:
+                    total[name] += stats.get(name, 0)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'processes': processes, 'totals': totals}, indent=2))
+            return
+
+        if not processes:
+            self.stdout.write(self.style.WARNING(
+                '⚠️ No hay estadísticas publicadas (¿el backend usa el pool y recibió peticiones?)'
+            ))
+            return
+
+        for process, published in sorted(processes.items()):
+            age = time.time() - published['published_at']
+            self.stdout.write(f'🖥️  {process} (hace {age:.0f} s)')
+            for key, stats in published['pools'].items():
+                self.stdout.write(f'  {key}: {self._format(stats)}')
+
+        self.stdout.write(self.style.SUCCESS(f'\n📊 Total ({len(processes)} procesos)'))
+        for key, total in totals.items():
+            self.stdout.write(f'  {key}: {self._format(total)}')
+
+    @staticmethod
+    def _format(stats):
+        return (
+            f"en uso {stats['in_use']}/{stats['size']}, ociosas {stats['idle']}, "
+            f"checkouts {stats['checkouts']}, esperas {stats['waits']} "
+            f"({stats['wait_seconds']:.3f} s), timeouts {stats['timeouts']}, "
+            f"errores {stats['errors']}, creadas {stats['created']}, descartadas {stats['discarded']}"
+        )
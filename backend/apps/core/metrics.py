@@ -0,0 +1,189 @@
+import glob
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.mmap_dict import MmapedDict
+
+# Etiqueta de las métricas registradas fuera de una petición (comandos, tareas) o sin ruta
+NO_VIEW = '-'
+
+# Con PROMETHEUS_MULTIPROC_DIR definido (varios workers de gunicorn) cada proceso escribe
+# sus valores en archivos mmap de ese directorio y /metrics los suma al exponerlos
+REQUESTS = Counter(
+    'agro_http_requests_total', 'Peticiones HTTP atendidas', ['view', 'method', 'status']
+)
+REQUEST_DURATION = Histogram(
+    'agro_http_request_duration_seconds', 'Duración de las peticiones HTTP', ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+RESPONSE_SIZE = Histogram(
+    'agro_http_response_size_bytes', 'Tamaño del cuerpo de las respuestas HTTP', ['view'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+DB_QUERIES = Histogram(
+    'agro_http_db_queries', 'Consultas SQL ejecutadas por petición', ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_DURATION = Histogram(
+    'agro_http_db_duration_seconds', 'Tiempo total en consultas SQL por petición', ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+CACHE_REQUESTS = Counter(
+    'agro_cache_requests_total', 'Lecturas de la cache por resultado', ['view', 'result']
+)
+
+
+# Las series etiquetadas se reutilizan: ``labels()`` valida y bloquea en cada llamada
+_children = {}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+class RequestMetrics:
+    """Contadores de una petición en curso; se publican al terminar la respuesta"""
+
+    __slots__ = ('started', 'queries', 'db_seconds', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def publish(self, request, response) -> None:
+        duration = time.perf_counter() - self.started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None and match.view_name else NO_VIEW
+
+        _child(REQUESTS, view, request.method, str(response.status_code)).inc()
+        _child(REQUEST_DURATION, view, request.method).observe(duration)
+        _child(DB_QUERIES, view).observe(self.queries)
+        _child(DB_DURATION, view).observe(self.db_seconds)
+
+        size = _response_size(response)
+        if size is not None:
+            _child(RESPONSE_SIZE, view).observe(size)
+        if self.cache_hits:
+            _child(CACHE_REQUESTS, view, 'hit').inc(self.cache_hits)
+        if self.cache_misses:
+            _child(CACHE_REQUESTS, view, 'miss').inc(self.cache_misses)
+
+
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    'current_request_metrics', default=None
+)
+
+
+def _response_size(response) -> Optional[int]:
+    if response.has_header('Content-Length'):
+        return int(response['Content-Length'])
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Wrapper de ejecución (``connection.execute_wrappers``) que suma las consultas y
+    su duración a la petición en curso. Fuera de una petición no mide nada.
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Receptor de ``connection_created``: instala ``record_query`` en la conexión.
+
+    Va al inicio de la lista para que los ``execute_wrapper`` temporales (que se
+    retiran con ``pop``) no lo desplacen al salir.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def record_cache_read(hits: int, misses: int) -> None:
+    metrics = current_request_metrics.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+        return
+    if hits:
+        _child(CACHE_REQUESTS, NO_VIEW, 'hit').inc(hits)
+    if misses:
+        _child(CACHE_REQUESTS, NO_VIEW, 'miss').inc(misses)
+
+
+def render_metrics() -> bytes:
+    """Métricas en formato de texto de Prometheus, sumando todos los workers si aplica"""
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    try:
+        return generate_latest(registry)
+    except FileNotFoundError:
+        # Archivo de un worker terminado que se fusionó durante la lectura
+        return generate_latest(registry)
+
+
+def merge_dead_process(pid: int, path: str = None) -> None:
+    """
+    Fusiona los archivos de métricas de un worker terminado en uno por tipo.
+
+    Los contadores e histogramas de un proceso muerto deben seguir sumando, pero con
+    ``--max-requests`` gunicorn reemplaza workers continuamente y cada uno deja sus
+    archivos: sin fusionarlos, /metrics lee cada vez más archivos. El resultado se
+    escribe con otro nombre y se reemplaza de forma atómica antes de borrar los del
+    worker. Se ejecuta en el proceso maestro, que es el único que escribe la fusión.
+    """
+    path = path or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return
+    multiprocess.mark_process_dead(pid, path)
+
+    for kind in ('counter', 'histogram'):
+        dead_files = glob.glob(os.path.join(path, f'{kind}_{pid}.db'))
+        if not dead_files:
+            continue
+        merged_path = os.path.join(path, f'{kind}_merged.db')
+        totals = {}
+        for source in [merged_path, *dead_files]:
+            if os.path.exists(source):
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+                    totals[key] = totals.get(key, 0.0) + value
+
+        temporary_path = merged_path + '.tmp'
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        merged = MmapedDict(temporary_path)
+        try:
+            for key, value in totals.items():
+                merged.write_value(key, value, 0.0)
+        finally:
+            merged.close()
+        os.replace(temporary_path, merged_path)
+        for source in dead_files:
+            os.remove(source)
+
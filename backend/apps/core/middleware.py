@@ -0,0 +1,98 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db.routers import ReplicaRoutingState, routing_state, pin_user_to_primary
+from .metrics import RequestMetrics, current_request_metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada petición para las métricas de Prometheus expuestas en ``/metrics``:
+    duración, tamaño de la respuesta, consultas SQL y su tiempo total, y aciertos y
+    fallos de cache, etiquetados con el nombre de la ruta. Debe ir primero en
+    ``MIDDLEWARE`` para incluir el tiempo de los demás middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        metrics.publish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        metrics.publish(request, response)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Registra la petición en curso para ``PrimaryReplicaRouter``.
+
+    Si la petición escribió en la base, el usuario queda fijado a la base principal
+    durante ``DATABASE_REPLICA_PIN_SECONDS`` para que sus siguientes lecturas no
+    dependan del retraso de la réplica. Funciona bajo WSGI y ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        state = ReplicaRoutingState(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        self._pin_after_write(state)
+        return response
+
+    async def __acall__(self, request):
+        state = ReplicaRoutingState(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        await sync_to_async(self._pin_after_write)(state)
+        return response
+
+    @staticmethod
+    def _pin_after_write(state: ReplicaRoutingState) -> None:
+        if state.wrote:
+            user_id = state.user_id()
+            if user_id is not None:
+                pin_user_to_primary(user_id)
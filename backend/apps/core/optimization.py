@@ -0,0 +1,208 @@
+from contextlib import ExitStack
+from typing import List, NamedTuple, Optional, Set
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class QuerysetPlan(NamedTuple):
+    """Relaciones y columnas que necesita un serializer para representar un queryset"""
+    select_related: List[str]
+    prefetch_related: List[str]
+    only: Optional[List[str]]
+
+
+class _PlanBuilder:
+    """
+    Recorre los campos de un serializer y traduce sus ``source`` a rutas del modelo.
+
+    Las relaciones simples se resuelven con ``select_related``; las múltiples (y todo
+    lo que cuelga de ellas) con ``prefetch_related``. Las columnas se acumulan por
+    ruta para ``only()``; si algún campo lee una propiedad o método que no se puede
+    resolver, esa ruta se carga completa. Los serializers pueden declarar en
+    ``Meta.source_fields`` las rutas que leen sus campos calculados.
+    """
+
+    def __init__(self, queryset):
+        self.annotations = set(queryset.query.annotations)
+        self.select: Set[str] = set()
+        self.prefetch: Set[str] = set()
+        self.columns = {'': set()}
+        self.incomplete: Set[str] = set()
+
+    @staticmethod
+    def _join(path, attr):
+        return f'{path}__{attr}' if path else attr
+
+    def visit_serializer(self, serializer, model, path='', in_prefetch=False):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+
+        self.columns.setdefault(path, set()).add(model._meta.pk.name)
+
+        hints = getattr(getattr(serializer, 'Meta', None), 'source_fields', None)
+        for hint in hints or ():
+            self.visit_source(hint.split('__'), model, path, in_prefetch)
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                if isinstance(field, serializers.BaseSerializer):
+                    self.visit_serializer(field, model, path, in_prefetch)
+                elif hints is None:
+                    self.incomplete.add(path)
+                continue
+            self.visit_source(field.source_attrs, model, path, in_prefetch, field, hints is not None)
+
+    def visit_source(self, attrs, model, path, in_prefetch, field=None, hinted=False):
+        for index, attr in enumerate(attrs):
+            is_last = index == len(attrs) - 1
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Anotación del queryset, propiedad o método del modelo
+                if not (path == '' and index == 0 and attr in self.annotations) and not hinted:
+                    self.incomplete.add(path)
+                return
+
+            if not model_field.is_relation:
+                self.columns.setdefault(path, set()).add(attr)
+                return
+
+            # Clave foránea representada sólo por su ID: basta con la columna
+            if (is_last and isinstance(field, serializers.PrimaryKeyRelatedField)
+                    and model_field.concrete and not model_field.many_to_many):
+                self.columns.setdefault(path, set()).add(attr)
+                return
+
+            relation_path = self._join(path, attr)
+            if model_field.many_to_many or model_field.one_to_many or in_prefetch:
+                self.prefetch.add(relation_path)
+                in_prefetch = True
+            else:
+                self.select.add(relation_path)
+                if model_field.concrete:
+                    self.columns.setdefault(path, set()).add(attr)
+
+            model = model_field.related_model
+            path = relation_path
+            if is_last:
+                if isinstance(field, serializers.BaseSerializer):
+                    self.visit_serializer(field, model, path, in_prefetch)
+                else:
+                    # Campo relacionado sin serializer anidado (p. ej. __str__)
+                    self.incomplete.add(path)
+                return
+
+    def build(self) -> QuerysetPlan:
+        only = None
+        if '' not in self.incomplete:
+            only = set()
+            for path, columns in self.columns.items():
+                # Sólo se restringen las columnas de la raíz y de las relaciones con JOIN;
+                # las relaciones sin columnas listadas se cargan completas
+                if path in self.incomplete or (path and path not in self.select):
+                    continue
+                only.update(self._join(path, column) for column in columns)
+            only.update(self.select)
+        return QuerysetPlan(
+            sorted(self.select),
+            sorted(self.prefetch),
+            sorted(only) if only is not None else None,
+        )
+
+
+def build_queryset_plan(queryset, serializer_class, context=None) -> QuerysetPlan:
+    """Calcula las relaciones y columnas que necesita el serializer para el queryset"""
+    builder = _PlanBuilder(queryset)
+    builder.visit_serializer(serializer_class(context=context or {}), queryset.model)
+    return builder.build()
+
+
+def optimize_queryset(queryset, serializer_class, context=None, restrict_columns=True):
+    """
+    Aplica al queryset los ``select_related``, ``prefetch_related`` y ``only()``
+    que requieren los campos del serializer.
+
+    Args:
+        queryset: QuerySet a optimizar
+        serializer_class: Clase del serializer que representará los objetos
+        context: Contexto del serializer (para serializers que dependen de él)
+        restrict_columns: Si es False no se aplica ``only()`` (p. ej. en escrituras)
+    """
+    plan = build_queryset_plan(queryset, serializer_class, context)
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if restrict_columns and plan.only is not None and not queryset.query.deferred_loading[0]:
+        queryset = queryset.only(*plan.only)
+    return queryset
+
+
+class QueryCounter:
+    """Wrapper de ejecución que cuenta las consultas SQL ejecutadas"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget_checks_enabled() -> bool:
+    """Indica si se verifica el presupuesto de consultas por respuesta"""
+    return getattr(settings, 'QUERY_BUDGET_CHECKS', settings.DEBUG)
+
+
+class OptimizedQuerysetMixin:
+    """
+    Mixin para vistas genéricas que optimiza el queryset según el serializer.
+
+    Se aplica en ``filter_queryset``, por lo que funciona aunque la vista
+    sobrescriba ``get_queryset``. En lecturas además restringe las columnas con
+    ``only()``; en escrituras sólo agrega las relaciones, para no guardar
+    instancias con campos diferidos.
+
+    Con ``QUERY_BUDGET_CHECKS`` activo (por defecto en DEBUG) lanza un
+    ``AssertionError`` si una respuesta de lectura ejecuta más consultas que
+    ``query_budget``.
+    """
+    query_budget = None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return optimize_queryset(
+            queryset,
+            self.get_serializer_class(),
+            self.get_serializer_context(),
+            restrict_columns=self.request.method in SAFE_METHODS,
+        )
+
+    def get_query_budget(self) -> int:
+        if self.query_budget is not None:
+            return self.query_budget
+        return getattr(settings, 'QUERY_BUDGET_DEFAULT', 10)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS or not query_budget_checks_enabled():
+            return super().dispatch(request, *args, **kwargs)
+
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        if counter.count > budget:
+            raise AssertionError(
+                f"{self.__class__.__name__} ejecutó {counter.count} consultas para "
+                f"{request.method} {request.path} (presupuesto: {budget})"
+            )
+        return response
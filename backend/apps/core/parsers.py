@@ -0,0 +1,38 @@
+import codecs
+import re
+from io import BytesIO
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+# orjson convierte a float los enteros que exceden 64 bits; el parser estándar los conserva
+LONG_INTEGER_RE = re.compile(rb'[0-9]{20}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parser JSON basado en orjson.
+
+    Los cuerpos que orjson rechaza (JSON inválido, surrogates sueltos) o que podrían
+    contener enteros de más de 64 bits se procesan con el parser estándar, de modo que
+    el resultado y los mensajes de error son los mismos que con ``JSONParser``.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_INTEGER_RE.search(body):
+            return super().parse(BytesIO(body), media_type, parser_context)
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
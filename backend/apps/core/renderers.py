@@ -0,0 +1,74 @@
+import datetime
+import decimal
+import re
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# Opciones equivalentes a las de JSONRenderer: datetime UTC como "Z" y claves no str
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Floats que orjson escribe distinto que float.__repr__ (el json de Python): con exponente
+# ("1e16" frente a "1e+16", "1e-7" frente a "1e-07") y menores que 1e-4 ("0.00001" frente
+# a "1e-05"). Un texto con la misma forma sólo provoca un falso positivo (salida estándar).
+# Los dos primeros patrones son un filtro rápido (los exponentes de orjson no llevan "+" ni
+# ceros a la izquierda); la expresión completa, más lenta, sólo se evalúa si alguno aparece
+SMALL_FLOAT_HINT = b'0.0000'
+EXPONENT_HINT_RE = re.compile(rb'e[-1-9]')
+NON_REPR_FLOAT_RE = re.compile(rb'(?:^|[:,\[])-?(?:0\.0000|[0-9][0-9.]*+e)')
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def orjson_default(obj):
+    """Convierte los tipos que orjson no serializa igual que el ``JSONEncoder`` de DRF"""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Los serializers ya convierten los Decimal a texto; los valores sueltos van como float
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer JSON basado en orjson con la misma salida que ``JSONRenderer``.
+
+    datetime, date, time y UUID se serializan de forma nativa; Decimal, timedelta,
+    textos diferidos y QuerySets se convierten como lo hace DRF. Si se pide salida
+    indentada o en ASCII, si orjson no puede serializar los datos (por ejemplo,
+    enteros de más de 64 bits) o si la salida contiene floats que orjson formatea
+    distinto (exponentes, valores muy pequeños), se usa el renderer estándar.
+
+    Diferencia conocida: NaN e infinitos se emiten como null, mientras que
+    ``JSONRenderer`` con ``STRICT_JSON`` los rechaza con un error.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=orjson_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if (SMALL_FLOAT_HINT in ret or EXPONENT_HINT_RE.search(ret)) and NON_REPR_FLOAT_RE.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que JSONRenderer: escapar U+2028 y U+2029 para que sea un subconjunto de JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,28 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from .metrics import render_metrics
+
+
+def metrics(request):
+    """
+    Métricas de la aplicación en formato de texto de Prometheus.
+
+    Se exige ``Authorization: Bearer <METRICS_AUTH_TOKEN>``. Sin token configurado el
+    acceso se deniega, salvo en DEBUG.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponse(status=403)
+
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
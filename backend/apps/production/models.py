@@ -1,9 +1,36 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+class ShipmentQuerySet(models.QuerySet):
+    """QuerySet de embarques con anotaciones de conteo de inspecciones"""
+
+    @staticmethod
+    def _inspections_count(**filters):
+        # Subconsulta correlacionada: no agrupa la consulta principal, por lo que el
+        # COUNT de la paginación no necesita unir la tabla de inspecciones
+        inspections = (
+            Inspection.objects.filter(shipment=OuterRef('pk'), **filters)
+            .order_by()
+            .values('shipment')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+        return Coalesce(Subquery(inspections, output_field=models.IntegerField()), 0)
+
+    def with_inspection_counts(self):
+        """Anota el número de inspecciones de cada embarque (total y por estado) en la misma consulta"""
+        status_counts = {
+            f'{status}_inspections_count': self._inspections_count(status=status)
+            for status, _ in Inspection.STATUS_CHOICES
+        }
+        return self.annotate(inspections_count=self._inspections_count(), **status_counts)
+
+
 class Product(models.Model):
     """
     Modelo para productos agrícolas
@@ -44,6 +71,8 @@ class Shipment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShipmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Embarque"
         verbose_name_plural = "Embarques"
@@ -52,6 +81,24 @@ class Shipment(models.Model):
     def __str__(self):
         return f"{self.reference} - {self.product.name}"
 
+    def get_inspections_count(self):
+        """Retorna el número de inspecciones del embarque"""
+        # Usar la anotación de with_inspection_counts() si está disponible
+        if hasattr(self, 'inspections_count'):
+            return self.inspections_count
+        return self.inspections.count()
+
+    def get_inspection_status_counts(self):
+        """Retorna el número de inspecciones del embarque por estado"""
+        statuses = [status for status, _ in Inspection.STATUS_CHOICES]
+        if all(hasattr(self, f'{status}_inspections_count') for status in statuses):
+            return {status: getattr(self, f'{status}_inspections_count') for status in statuses}
+
+        counts = dict(
+            self.inspections.order_by().values_list('status').annotate(count=Count('id'))
+        )
+        return {status: counts.get(status, 0) for status in statuses}
+
 
 class Inspection(models.Model):
     """
@@ -28,6 +28,8 @@ class InspectionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Inspection
+        # Columnas y relaciones que leen los campos calculados (optimizador de querysets)
+        source_fields = ('inspection_type', 'status')
         fields = '__all__'
 
 
@@ -39,6 +41,7 @@ class ShipmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Shipment
+        source_fields = ('transport_type', 'created_by__first_name', 'created_by__last_name')
         fields = '__all__'
         read_only_fields = ('created_by',)
 
@@ -51,9 +54,14 @@ class ShipmentListSerializer(serializers.ModelSerializer):
     """Serializer simplificado para listado de embarques"""
     product_name = serializers.CharField(source='product.name', read_only=True)
     transport_type_display = serializers.CharField(source='get_transport_type_display', read_only=True)
-    inspections_count = serializers.IntegerField(source='inspections.count', read_only=True)
+    inspections_count = serializers.IntegerField(source='get_inspections_count', read_only=True)
+    inspection_status_counts = serializers.DictField(
+        source='get_inspection_status_counts', child=serializers.IntegerField(), read_only=True
+    )
     
     class Meta:
         model = Shipment
+        source_fields = ('transport_type',)
         fields = ['id', 'reference', 'product_name', 'shipper', 'consignee', 
-                 'transport_type_display', 'location', 'date', 'inspections_count']
+                 'transport_type_display', 'location', 'date', 'inspections_count',
+                 'inspection_status_counts']
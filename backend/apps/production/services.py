@@ -0,0 +1,67 @@
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Inspection, Product, Shipment
+from .serializers import ShipmentListSerializer
+
+DASHBOARD_STATS_CACHE_KEY = 'production_dashboard_stats'
+
+
+class DashboardStatsService:
+    """
+    Servicio para obtener las estadísticas del dashboard de producción con cache
+    """
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas del dashboard con un número constante de consultas
+        
+        Los conteos de inspecciones (total, por estado y el desglose) salen de un único
+        aggregate condicional, por lo que no se consulta la tabla de inspecciones más de
+        una vez.
+        
+        Returns:
+            Diccionario con estadísticas (en cache hasta la próxima escritura)
+        """
+        stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+        if stats is not None:
+            return stats
+
+        statuses = sorted(status for status, _ in Inspection.STATUS_CHOICES)
+        inspection_counts = Inspection.objects.aggregate(
+            total=Count('id'),
+            **{status: Count('id', filter=Q(status=status)) for status in statuses},
+        )
+        # Mismo formato que un values('status').annotate(count=...): sólo estados presentes
+        status_breakdown = [
+            {'status': status, 'count': inspection_counts[status]}
+            for status in statuses if inspection_counts[status]
+        ]
+
+        recent_shipments = (
+            Shipment.objects.select_related('product')
+            .with_inspection_counts()
+            .order_by('-date')[:5]
+        )
+
+        stats = {
+            'total_shipments': Shipment.objects.count(),
+            'total_products': Product.objects.count(),
+            'total_inspections': inspection_counts['total'],
+            'pending_inspections': inspection_counts['pending'],
+            'completed_inspections': inspection_counts['completed'],
+            'recent_shipments': list(ShipmentListSerializer(recent_shipments, many=True).data),
+            'inspection_status_breakdown': status_breakdown,
+        }
+        cache.set(DASHBOARD_STATS_CACHE_KEY, stats, getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 300))
+        return stats
+
+    @staticmethod
+    def invalidate() -> None:
+        """Invalida las estadísticas en cache al confirmar la transacción"""
+        transaction.on_commit(lambda: cache.delete(DASHBOARD_STATS_CACHE_KEY))
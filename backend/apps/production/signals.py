@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Inspection, Product, Shipment
+from .services import DashboardStatsService
+
+
+@receiver(post_save, sender=Shipment)
+@receiver(post_delete, sender=Shipment)
+@receiver(post_save, sender=Inspection)
+@receiver(post_delete, sender=Inspection)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_dashboard_stats(sender, instance, **kwargs):
+    """Invalida las estadísticas del dashboard al modificar embarques, inspecciones o productos"""
+    DashboardStatsService.invalidate()
@@ -1,43 +1,63 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import Count
+from apps.authentication.authentication import ClaimsJWTAuthentication
+from apps.core.optimization import OptimizedQuerysetMixin
 from .models import Product, Shipment, Inspection, QualityReport, Sample
+from .services import DashboardStatsService
 from .serializers import (
     ProductSerializer, ShipmentSerializer, ShipmentListSerializer,
     InspectionSerializer, QualityReportSerializer, SampleSerializer
 )
 
 
+# Las relaciones que leen los serializers se cargan con OptimizedQuerysetMixin
+
 # Product Views
-class ProductListCreateView(generics.ListCreateAPIView):
+class ProductListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
 
+class ShipmentPagination(PageNumberPagination):
+    """Paginación del listado de embarques con tamaño de página configurable (máx. 100)"""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
 # Shipment Views
-class ShipmentListCreateView(generics.ListCreateAPIView):
-    queryset = Shipment.objects.select_related('product', 'created_by').prefetch_related('inspections')
+class ShipmentListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
+    queryset = Shipment.objects.all()
+    pagination_class = ShipmentPagination
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return ShipmentListSerializer
         return ShipmentSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            # Conteos de inspecciones calculados en la consulta de la página, sin cargar
+            # las inspecciones; el orden incluye el ID para paginar de forma estable
+            queryset = queryset.with_inspection_counts().order_by('-date', '-id')
+        return queryset
 
-class ShipmentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Shipment.objects.select_related('product', 'created_by').prefetch_related('inspections__quality_report', 'inspections__samples')
+
+class ShipmentDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Shipment.objects.all()
     serializer_class = ShipmentSerializer
 
 
 # Inspection Views
-class InspectionListCreateView(generics.ListCreateAPIView):
-    queryset = Inspection.objects.select_related('shipment__product').prefetch_related('quality_report', 'samples')
+class InspectionListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
+    queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
 
     def get_queryset(self):
@@ -48,25 +68,25 @@ class InspectionListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class InspectionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Inspection.objects.select_related('shipment__product').prefetch_related('quality_report', 'samples')
+class InspectionDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Inspection.objects.all()
     serializer_class = InspectionSerializer
 
 
 # Quality Report Views
-class QualityReportListCreateView(generics.ListCreateAPIView):
-    queryset = QualityReport.objects.select_related('inspection__shipment')
+class QualityReportListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
+    queryset = QualityReport.objects.all()
     serializer_class = QualityReportSerializer
 
 
-class QualityReportDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = QualityReport.objects.select_related('inspection__shipment')
+class QualityReportDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = QualityReport.objects.all()
     serializer_class = QualityReportSerializer
 
 
 # Sample Views
-class SampleListCreateView(generics.ListCreateAPIView):
-    queryset = Sample.objects.select_related('inspection__shipment')
+class SampleListCreateView(OptimizedQuerysetMixin, generics.ListCreateAPIView):
+    queryset = Sample.objects.all()
     serializer_class = SampleSerializer
 
     def get_queryset(self):
@@ -77,32 +97,16 @@ class SampleListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class SampleDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Sample.objects.select_related('inspection__shipment')
+class SampleDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Sample.objects.all()
     serializer_class = SampleSerializer
 
 
 # Dashboard Statistics
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 def dashboard_stats(request):
     """
     Estadísticas para el dashboard
     """
-    stats = {
-        'total_shipments': Shipment.objects.count(),
-        'total_products': Product.objects.count(),
-        'total_inspections': Inspection.objects.count(),
-        'pending_inspections': Inspection.objects.filter(status='pending').count(),
-        'completed_inspections': Inspection.objects.filter(status='completed').count(),
-        'recent_shipments': ShipmentListSerializer(
-            Shipment.objects.select_related('product')[:5], 
-            many=True
-        ).data,
-        'inspection_status_breakdown': list(
-            Inspection.objects.values('status')
-            .annotate(count=Count('status'))
-            .order_by('status')
-        ),
-    }
-    
-    return Response(stats)
+    return Response(DashboardStatsService.get_stats())
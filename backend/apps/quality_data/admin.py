@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import QualityData
+from .models import QualityData, QualityDataArchive, SyncRun
 
 
 @admin.register(QualityData)
@@ -81,3 +81,41 @@ class QualityDataAdmin(admin.ModelAdmin):
         if not change:  # Si es un nuevo registro
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(QualityDataArchive)
+class QualityDataArchiveAdmin(admin.ModelAdmin):
+    """
+    Manifiestos de archivos históricos (se crean con archive_quality_data)
+    """
+    list_display = [
+        'empresa', 'before', 'record_count', 'deleted_count', 'size_bytes',
+        'fecha_desde', 'fecha_hasta', 'created_at'
+    ]
+    list_filter = ['empresa', 'before']
+    search_fields = ['empresa', 'file_path', 'sha256']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    """
+    Historial de sincronizaciones con la API externa (sólo lectura)
+    """
+    list_display = [
+        'empresa', 'mode', 'success', 'records_processed', 'pages',
+        'bytes_received', 'retries', 'duration_seconds', 'started_at'
+    ]
+    list_filter = ['success', 'mode', 'empresa', 'started_at']
+    search_fields = ['empresa', 'message']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class QualityDataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.quality_data'
     verbose_name = 'Datos de Calidad'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,270 @@
+import gzip
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+import orjson
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import QualityData, QualityDataArchive
+from .partitions import QualityDataPartitionService
+from .services import QualityDataService
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = '.ndjson.gz'
+# Columnas archivadas: todas las del modelo, con las llaves foráneas como *_id
+ARCHIVE_FIELDS = [field.attname for field in QualityData._meta.concrete_fields]
+ARCHIVE_DATETIME_FIELDS = [
+    field.attname for field in QualityData._meta.concrete_fields
+    if isinstance(field, models.DateTimeField)
+]
+
+
+def _serialize_record(record: Dict[str, Any]) -> bytes:
+    # Los Decimal se guardan como texto para no perder precisión (igual que los serializers)
+    return orjson.dumps(record, default=str, option=orjson.OPT_UTC_Z) + b'\n'
+
+
+class QualityDataArchiveService:
+    """
+    Archivo en frío de los datos de calidad de temporadas anteriores.
+
+    Los registros anteriores a una fecha se escriben por lotes en un archivo NDJSON
+    comprimido con gzip por empresa, se registra su manifiesto (``QualityDataArchive``)
+    y sólo entonces se eliminan de la tabla principal, por lotes pequeños para no
+    mantener bloqueos largos. Los archivos se consultan en modo lectura con
+    ``read_records``.
+    """
+
+    @staticmethod
+    def archive_root() -> Path:
+        return Path(settings.QUALITY_DATA_ARCHIVE_DIR)
+
+    @staticmethod
+    def archive_path(archive: QualityDataArchive) -> Path:
+        return QualityDataArchiveService.archive_root() / archive.file_path
+
+    @staticmethod
+    def pending_counts(before: datetime, empresa: Optional[str] = None) -> Dict[str, int]:
+        """Registros por empresa que se archivarían con la fecha de corte indicada"""
+        queryset = QualityData.objects.filter(fecha_registro__lt=before)
+        if empresa:
+            queryset = queryset.for_empresa(empresa)
+        rows = queryset.values_list('empresa').annotate(total=Count('id')).order_by('empresa')
+        return dict(rows)
+
+    @staticmethod
+    def archive_before(
+        before: datetime,
+        empresa: Optional[str] = None,
+        batch_size: int = 5000,
+        delete: bool = True,
+        pause: float = 0.0,
+        log: Callable[[str], None] = logger.info,
+    ) -> List[QualityDataArchive]:
+        """
+        Archiva (y por defecto elimina) los registros con ``fecha_registro`` anterior a
+        ``before``, un archivo por empresa. Retorna los manifiestos creados.
+
+        Antes se completa la eliminación de los archivos anteriores que quedaron sin
+        depurar (una ejecución interrumpida o con ``delete=False``), para no volver a
+        archivar sus registros.
+        """
+        if delete:
+            unpurged = QualityDataArchive.objects.filter(purged_at__isnull=True, before__lte=before)
+            if empresa:
+                unpurged = unpurged.filter(empresa=empresa)
+            for archive in unpurged.order_by('id'):
+                QualityDataArchiveService.purge_archived(archive, batch_size, pause)
+                log(f'↩️ {archive.empresa}: {archive.deleted_count} registros de {archive.file_path} '
+                    f'eliminados de la tabla principal')
+
+        archives = []
+        for name in QualityDataArchiveService.pending_counts(before, empresa):
+            archive = QualityDataArchiveService.write_archive(name, before, batch_size, log)
+            if archive is None:
+                continue
+            log(f'📦 {name}: {archive.record_count} registros en {archive.file_path}')
+            if delete:
+                QualityDataArchiveService.purge_archived(archive, batch_size, pause)
+                log(f'🗑️ {name}: {archive.deleted_count} registros eliminados de la tabla principal')
+            archives.append(archive)
+
+        if delete and archives:
+            dropped = QualityDataPartitionService.drop_empty_partitions(before)
+            if dropped:
+                log(f"🧹 Particiones vacías eliminadas: {', '.join(dropped)}")
+        return archives
+
+    @staticmethod
+    def write_archive(
+        empresa: str,
+        before: datetime,
+        batch_size: int = 5000,
+        log: Callable[[str], None] = logger.info,
+    ) -> Optional[QualityDataArchive]:
+        """
+        Escribe en disco los registros de la empresa anteriores a ``before``, leyéndolos
+        por lotes en orden de id, y registra el manifiesto. El archivo se escribe con un
+        nombre temporal y se renombra al terminar, de modo que nunca queda uno a medias.
+
+        Igual que al eliminarlos, se omiten los registros modificados después de empezar:
+        siguen en la tabla principal y se archivarán en la siguiente ejecución.
+        """
+        started_at = timezone.now()
+        queryset = QualityData.objects.for_empresa(empresa).filter(
+            fecha_registro__lt=before, updated_at__lte=started_at
+        )
+        relative_path = Path('quality_data') / (slugify(empresa) or 'sin-empresa') / (
+            f"{before:%Y%m%d}-{started_at:%Y%m%dT%H%M%S}{ARCHIVE_SUFFIX}"
+        )
+        path = QualityDataArchiveService.archive_root() / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(path.name + '.tmp')
+
+        count = 0
+        min_id = last_id = 0
+        first_date = last_date = None
+        with gzip.open(temporary_path, 'wb') as output:
+            while True:
+                batch = list(
+                    queryset.filter(id__gt=last_id).order_by('id').values(*ARCHIVE_FIELDS)[:batch_size]
+                )
+                if not batch:
+                    break
+                output.write(b''.join(_serialize_record(record) for record in batch))
+                min_id = min_id or batch[0]['id']
+                last_id = batch[-1]['id']
+                count += len(batch)
+                dates = [record['fecha_registro'] for record in batch]
+                first_date = min([first_date, *dates] if first_date else dates)
+                last_date = max([last_date, *dates] if last_date else dates)
+                log(f'  ✍️ {empresa}: {count} registros escritos')
+
+        if count == 0:
+            temporary_path.unlink()
+            return None
+
+        # El archivo debe estar en disco antes de eliminar los registros de la base
+        with open(temporary_path, 'rb') as written:
+            os.fsync(written.fileno())
+        os.replace(temporary_path, path)
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as written:
+            for chunk in iter(lambda: written.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        return QualityDataArchive.objects.create(
+            empresa=empresa,
+            company_id=queryset.exclude(company_id=None).values_list('company_id', flat=True).first(),
+            before=before,
+            file_path=str(relative_path),
+            record_count=count,
+            size_bytes=path.stat().st_size,
+            sha256=digest.hexdigest(),
+            fecha_desde=first_date,
+            fecha_hasta=last_date,
+            min_id=min_id,
+            max_id=last_id,
+            started_at=started_at,
+        )
+
+    @staticmethod
+    def purge_archived(
+        archive: QualityDataArchive,
+        batch_size: int = 5000,
+        pause: float = 0.0,
+        using: str = DEFAULT_DB_ALIAS,
+    ) -> int:
+        """
+        Elimina de la tabla principal los registros ya archivados, en transacciones de
+        ``batch_size`` filas con una pausa opcional entre ellas para no competir con las
+        escrituras de la aplicación. Sólo se eliminan registros no modificados después
+        de empezar a escribir el archivo; los demás se archivarán en la siguiente ejecución.
+        """
+        scope = QualityData.objects.for_empresa(archive.empresa).filter(
+            fecha_registro__lt=archive.before,
+            id__lte=archive.max_id,
+            updated_at__lte=archive.started_at,
+        )
+
+        while True:
+            ids = list(scope.order_by().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic(using=using):
+                # Borrado directo: evita cargar cada registro y emitir una señal por fila;
+                # la fecha de corte acota el borrado a las particiones archivadas
+                archive.deleted_count += QualityData.objects.using(using).filter(
+                    id__in=ids, fecha_registro__lt=archive.before
+                )._raw_delete(using)
+            if pause:
+                time.sleep(pause)
+
+        archive.purged_at = timezone.now()
+        archive.save(update_fields=['deleted_count', 'purged_at'])
+        QualityDataService.invalidate_company_quality_counts(archive.empresa)
+        return archive.deleted_count
+
+    @staticmethod
+    def _iter_lines(archive: QualityDataArchive) -> Iterator[Dict[str, Any]]:
+        with gzip.open(QualityDataArchiveService.archive_path(archive), 'rb') as source:
+            for line in source:
+                yield orjson.loads(line)
+
+    @staticmethod
+    def superseded_ids(archive: QualityDataArchive) -> Set[int]:
+        """
+        Ids del archivo que se archivaron de nuevo más tarde: un registro modificado entre
+        la escritura y la eliminación queda en la tabla principal y pasa al siguiente
+        archivo de la empresa, que contiene su versión más reciente.
+        """
+        later = QualityDataArchive.objects.filter(
+            empresa=archive.empresa,
+            purged_at__isnull=False,
+            id__gt=archive.id,
+            min_id__lte=archive.max_id,
+        ).order_by('id')
+        ids = set()
+        for other in later:
+            # Los archivos están en orden de id: basta leer hasta el último id de éste
+            for record in QualityDataArchiveService._iter_lines(other):
+                if record['id'] > archive.max_id:
+                    break
+                ids.add(record['id'])
+        return ids
+
+    @staticmethod
+    def read_records(
+        archive: QualityDataArchive,
+        fecha_desde: Optional[datetime] = None,
+        fecha_hasta: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los registros de un archivo, opcionalmente acotados por fecha_registro.
+        Las fechas se retornan como datetime y se omiten los registros con una versión
+        más reciente en otro archivo.
+        """
+        superseded = QualityDataArchiveService.superseded_ids(archive)
+        for record in QualityDataArchiveService._iter_lines(archive):
+            if record['id'] in superseded:
+                continue
+            for name in ARCHIVE_DATETIME_FIELDS:
+                if record[name] is not None:
+                    record[name] = datetime.fromisoformat(record[name].replace('Z', '+00:00'))
+            fecha = record['fecha_registro']
+            if fecha_desde and fecha < fecha_desde:
+                continue
+            if fecha_hasta and fecha > fecha_hasta:
+                continue
+            yield record
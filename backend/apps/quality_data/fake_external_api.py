@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+from aiohttp import web
+
+from .synthetic import raw_quality_record
+
+logger = logging.getLogger(__name__)
+
+LOGIN_PATH = '/api/v1/auth/login'
+DATA_PATH = '/api/v1/data/calidad-producto-terminado'
+
+PAGINATION_OFFSET = 'offset'
+PAGINATION_PAGE = 'page'
+
+
+@dataclass
+class FakeExternalAPIConfig:
+    """Comportamiento del servidor simulado de la API externa de calidad"""
+    records: int = 1000
+    pagination: str = PAGINATION_OFFSET
+    # Registros por respuesta si la petición no indica límite, y máximo aceptado
+    default_limit: int = 100
+    max_limit: int = 1000
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Probabilidad de responder con error_status o 401 a una petición de datos
+    error_rate: float = 0.0
+    error_status: int = 500
+    retry_after: Optional[int] = None
+    unauthorized_rate: float = 0.0
+    token_ttl: int = 1800
+    username: str = 'admin'
+    password: str = 'admin123'
+    seed: int = 42
+    end: datetime = field(default_factory=lambda: datetime(2025, 12, 31, 23, 0))
+
+
+class FakeExternalQualityAPI:
+    """
+    Servidor aiohttp que imita la API externa de calidad (login JWT y datos de calidad
+    de producto terminado) para probar y medir la sincronización sin el servicio real.
+
+    Los registros de cada empresa se generan bajo demanda y de forma determinista a
+    partir de la semilla, la empresa y la posición, así que páginas repetidas devuelven
+    siempre los mismos datos.
+    """
+
+    def __init__(self, config: FakeExternalAPIConfig):
+        self.config = config
+        self.tokens: Dict[str, float] = {}
+        self.random = random.Random(config.seed)
+        self.stats = {
+            'logins': 0,
+            'data_requests': 0,
+            'records_served': 0,
+            'injected_errors': 0,
+            'injected_unauthorized': 0,
+            'expired_tokens': 0,
+        }
+
+    def application(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(LOGIN_PATH, self.login)
+        app.router.add_post(DATA_PATH, self.data)
+        return app
+
+    async def _simulate_latency(self) -> None:
+        delay = self.config.latency_ms + self.random.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    async def login(self, request: web.Request) -> web.Response:
+        await self._simulate_latency()
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({'detail': 'JSON inválido'}, status=400)
+        if body.get('username') != self.config.username or body.get('password') != self.config.password:
+            return web.json_response({'detail': 'Credenciales inválidas'}, status=401)
+
+        token = secrets.token_urlsafe(24)
+        self.tokens[token] = time.monotonic() + self.config.token_ttl
+        self.stats['logins'] += 1
+        return web.json_response({
+            'access_token': token,
+            'token_type': 'bearer',
+            'expires_in': self.config.token_ttl,
+        })
+
+    def _check_token(self, request: web.Request) -> Optional[web.Response]:
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        expiry = self.tokens.get(token)
+        if expiry is None:
+            return web.json_response({'detail': 'Token inválido'}, status=401)
+        if time.monotonic() > expiry:
+            self.tokens.pop(token, None)
+            self.stats['expired_tokens'] += 1
+            return web.json_response({'detail': 'Token expirado'}, status=401)
+        return None
+
+    async def data(self, request: web.Request) -> web.Response:
+        await self._simulate_latency()
+        rejected = self._check_token(request)
+        if rejected is not None:
+            return rejected
+
+        if self.random.random() < self.config.unauthorized_rate:
+            self.stats['injected_unauthorized'] += 1
+            return web.json_response({'detail': 'Token rechazado'}, status=401)
+        if self.random.random() < self.config.error_rate:
+            self.stats['injected_errors'] += 1
+            headers = {'Retry-After': str(self.config.retry_after)} if self.config.retry_after is not None else None
+            return web.json_response({'detail': 'Error simulado'}, status=self.config.error_status, headers=headers)
+
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({'detail': 'JSON inválido'}, status=400)
+        filters = body.get('filters') or {}
+        empresa = filters.get('EMPRESA') or filters.get('PRODUCTOR') or 'EMPRESA DEMO'
+        start, limit = self._page_bounds(body)
+
+        records = self.records(empresa, start, limit)
+        logger.debug('Página simulada', extra={'empresa': empresa, 'offset': start, 'records': len(records)})
+        self.stats['data_requests'] += 1
+        self.stats['records_served'] += len(records)
+        return web.Response(body=orjson.dumps(records), content_type='application/json')
+
+    def _page_bounds(self, body: Dict[str, Any]):
+        """Primer registro y cantidad según la semántica de paginación configurada"""
+        config = self.config
+        if config.pagination == PAGINATION_PAGE:
+            size = body.get('page_size') or config.default_limit
+            page = max(int(body.get('page') or 1), 1)
+            size = min(int(size), config.max_limit)
+            return (page - 1) * size, size
+        limit = min(int(body.get('limit') or config.default_limit), config.max_limit)
+        return max(int(body.get('offset') or 0), 0), limit
+
+    def records(self, empresa: str, start: int, limit: int) -> List[Dict[str, Any]]:
+        end = min(start + limit, self.config.records)
+        return [self.record(empresa, index) for index in range(start, end)]
+
+    def record(self, empresa: str, index: int) -> Dict[str, Any]:
+        rng = random.Random(f'{self.config.seed}:{empresa}:{index}')
+        # Fechas distintas y decrecientes: la sincronización también identifica por fecha
+        fecha = self.config.end - timedelta(seconds=index * 613 + rng.randint(0, 600))
+        return raw_quality_record(rng, index, empresa, fecha)
+
+    @contextmanager
+    def serve_in_background(self, host: str = '127.0.0.1', port: int = 0) -> Iterator[str]:
+        """
+        Atiende peticiones desde un hilo con su propio event loop mientras dure el
+        bloque ``with``; retorna la URL base (con ``port=0`` se elige un puerto libre).
+        """
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(self.application(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, host, port)
+        loop.run_until_complete(site.start())
+        bound_port = runner.addresses[0][1]
+        thread = threading.Thread(target=loop.run_forever, name='fake-external-api', daemon=True)
+        thread.start()
+        try:
+            yield f'http://{host}:{bound_port}'
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
@@ -0,0 +1,91 @@
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.quality_data.archive import QualityDataArchiveService
+
+
+class Command(BaseCommand):
+    help = 'Archiva en disco (NDJSON comprimido) los datos de calidad anteriores a una fecha y los elimina de la tabla'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            type=str,
+            required=True,
+            help='Fecha de corte YYYY-MM-DD: se archivan los registros anteriores a ese día'
+        )
+        parser.add_argument(
+            '--empresa',
+            type=str,
+            help='Archivar sólo los registros de esta empresa'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Registros leídos y eliminados por lote (por defecto: 5000)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Segundos de pausa entre lotes de eliminación (por defecto: 0.05)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Escribir los archivos sin eliminar los registros de la tabla'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar cuántos registros se archivarían sin escribir ni eliminar nada'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            cutoff = date.fromisoformat(options['before'])
+        except ValueError:
+            raise CommandError('--before debe tener el formato YYYY-MM-DD')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size debe ser mayor que cero')
+
+        # El corte es la medianoche del día indicado en la zona horaria del proyecto
+        before = timezone.make_aware(datetime.combine(cutoff, time.min))
+        if before > timezone.now():
+            raise CommandError('--before no puede ser una fecha futura')
+
+        pending = QualityDataArchiveService.pending_counts(before, options['empresa'])
+        if not pending:
+            self.stdout.write(f'✅ No hay registros anteriores al {cutoff:%Y-%m-%d} para archivar')
+            return
+
+        for empresa, total in pending.items():
+            self.stdout.write(f'  {empresa}: {total} registros')
+        if options['dry_run']:
+            return
+
+        self.stdout.write(f'🧊 Archivando registros anteriores al {cutoff:%Y-%m-%d}...')
+        archives = QualityDataArchiveService.archive_before(
+            before,
+            empresa=options['empresa'],
+            batch_size=options['batch_size'],
+            delete=not options['keep'],
+            pause=options['pause'],
+            log=self.stdout.write,
+        )
+
+        archived = sum(archive.record_count for archive in archives)
+        deleted = sum(archive.deleted_count for archive in archives)
+        size = sum(archive.size_bytes for archive in archives)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {archived} registros archivados en {len(archives)} archivos '
+            f'({size / 1024 / 1024:.2f} MB), {deleted} eliminados de la tabla'
+        ))
+        if archived != deleted and not options['keep']:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ {archived - deleted} registros se modificaron durante el archivado y '
+                f'siguen en la tabla; se archivarán en la próxima ejecución'
+            ))
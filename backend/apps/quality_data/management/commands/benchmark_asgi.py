@@ -0,0 +1,186 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.models import User
+from apps.authentication.tokens import get_tokens_for_user
+
+# Aplicación y clase de worker de Gunicorn para cada interfaz
+SERVER_INTERFACES = {
+    'wsgi': ('agro_backend.wsgi:application', 'sync'),
+    'asgi': ('agro_backend.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+DEFAULT_BENCHMARK_PATHS = [
+    '/api/quality-data/stats/',
+    '/api/quality-data/dashboard/',
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Compara el throughput con peticiones concurrentes entre Gunicorn WSGI y ASGI (Uvicorn)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Ruta a medir (se puede repetir); por defecto stats y dashboard de calidad'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Peticiones por ruta e interfaz'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=20,
+            help='Peticiones simultáneas'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Workers de Gunicorn por servidor'
+        )
+        parser.add_argument(
+            '--interface',
+            choices=sorted(SERVER_INTERFACES),
+            action='append',
+            dest='interfaces',
+            help='Interfaz a medir (se puede repetir); por defecto ambas'
+        )
+        parser.add_argument(
+            '--email',
+            type=str,
+            help='Usuario con el que se firman las peticiones (por defecto el primero con empresa)'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['workers'] < 1:
+            raise CommandError('--requests, --concurrency y --workers deben ser mayores a 0')
+
+        user = self._get_user(options.get('email'))
+        token = get_tokens_for_user(user)['access']
+        paths = options['paths'] or DEFAULT_BENCHMARK_PATHS
+        interfaces = options['interfaces'] or ['wsgi', 'asgi']
+
+        self.stdout.write(
+            f"📊 {options['requests']} peticiones por ruta, concurrencia {options['concurrency']}, "
+            f"{options['workers']} workers, usuario {user.email}"
+        )
+
+        for interface in interfaces:
+            self.stdout.write(f"\n🌐 {interface.upper()}")
+            port = _free_port()
+            server = self._start_server(interface, port, options['workers'])
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                asyncio.run(self._wait_until_ready(base_url, server))
+                for path in paths:
+                    result = asyncio.run(self._run_load(
+                        base_url + path, token, options['requests'], options['concurrency']
+                    ))
+                    self.stdout.write(
+                        f"  {path}: {result['throughput']:.1f} req/s, "
+                        f"p50 {result['p50'] * 1000:.0f} ms, p95 {result['p95'] * 1000:.0f} ms, "
+                        f"errores {result['errors']}"
+                    )
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+    def _get_user(self, email=None):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(email=email).first() if email else users.exclude(company=None).first()
+        if user is None:
+            raise CommandError('No se encontró un usuario activo para firmar las peticiones')
+        return user
+
+    def _start_server(self, interface, port, workers):
+        application, worker_class = SERVER_INTERFACES[interface]
+        env = dict(os.environ)
+        env['QUALITY_DATA_ASYNC_VIEWS'] = str(interface == 'asgi')
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        return subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', application,
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers),
+                '--worker-class', worker_class,
+                '--log-level', 'critical',
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+
+    async def _wait_until_ready(self, base_url, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                if server.poll() is not None:
+                    raise CommandError('El servidor terminó antes de aceptar conexiones')
+                try:
+                    async with session.get(base_url + '/admin/login/'):
+                        return
+                except aiohttp.ClientError:
+                    await asyncio.sleep(0.2)
+        raise CommandError(f'El servidor no respondió en {timeout} segundos')
+
+    async def _run_load(self, url, token, total, concurrency):
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        headers = {'Authorization': f'Bearer {token}'}
+
+        async def request(session):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(request(session) for _ in range(total)))
+            elapsed = time.perf_counter() - started
+
+        return {
+            'throughput': total / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': _percentile(latencies, 95),
+            'errors': errors,
+        }
@@ -0,0 +1,360 @@
+import json
+import math
+import platform
+import statistics
+import time
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.authentication.tokens import get_tokens_for_user
+from apps.quality_data.synthetic import SyntheticDataGenerator
+
+# Endpoints medidos: nombre -> (método, ruta, fracción de las peticiones).
+# La exportación y el login son mucho más costosos y se miden con menos peticiones
+BENCHMARK_ENDPOINTS = {
+    'list': ('GET', '/api/quality-data/', 1.0),
+    'filter': ('GET', '/api/quality-data/filter/?calidad_general=buena&aprobado=true', 1.0),
+    'stats': ('GET', '/api/quality-data/stats/', 1.0),
+    'dashboard': ('GET', '/api/quality-data/dashboard/', 1.0),
+    'export': ('GET', '/api/quality-data/export/', 0.1),
+    'shipments': ('GET', '/api/shipments/', 1.0),
+    'dashboard_stats': ('GET', '/api/dashboard/stats/', 1.0),
+    'login': ('POST', '/api/auth/login/', 0.1),
+}
+
+# Métricas comparadas con la línea base y si un valor mayor es peor
+TRACKED_METRICS = {
+    'p95_ms': True,
+    'queries': True,
+    'throughput_rps': False,
+}
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def _percentile(values, percentile):
+    """Percentil por rango más cercano"""
+    ordered = sorted(values)
+    rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class _QueryCounter:
+    """Wrapper de ejecución que cuenta las consultas SQL de cada petición"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia (p50/p95/p99), consultas por petición y throughput de los endpoints de '
+        'calidad, producción y login, opcionalmente con varios tamaños de datos sintéticos, y '
+        'compara el resultado con una línea base en JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            help=(
+                'Tamaños de datos separados por coma (p. ej. 1000,10000,100000): para cada uno se '
+                'regeneran los datos sintéticos con generate_quality_data. Sin esta opción se mide '
+                'la base de datos tal como está'
+            )
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            choices=sorted(BENCHMARK_ENDPOINTS),
+            help='Endpoint a medir (se puede repetir); por defecto todos'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Peticiones medidas por endpoint (export y login usan la décima parte, mínimo 3)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Peticiones previas no medidas por endpoint (por defecto: 3)'
+        )
+        parser.add_argument(
+            '--cold-cache',
+            action='store_true',
+            help='Vaciar la cache antes de cada petición para medir sin estadísticas cacheadas'
+        )
+        parser.add_argument(
+            '--email',
+            type=str,
+            help='Usuario de las peticiones sin --sizes (por defecto el primero con empresa)'
+        )
+        parser.add_argument(
+            '--password',
+            type=str,
+            help='Contraseña de --email para medir el login sin --sizes (si falta, se omite el login)'
+        )
+        parser.add_argument(
+            '--companies',
+            type=int,
+            default=3,
+            help='Empresas de los datos sintéticos (por defecto: 3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla de los datos sintéticos (por defecto: 42)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Guardar los resultados en este archivo JSON (p. ej. como nueva línea base)'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Línea base JSON con la que comparar; falla si una métrica empeora más del umbral'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Empeoramiento relativo tolerado de p95 y throughput (por defecto: 0.2 = 20%%)'
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=2.0,
+            help='Diferencia mínima de p95 en ms para considerarla regresión (por defecto: 2)'
+        )
+        parser.add_argument(
+            '--min-samples',
+            type=int,
+            default=30,
+            help=(
+                'Peticiones medidas necesarias (en ambas ejecuciones) para comparar p95 y '
+                'throughput; con menos sólo se comparan las consultas (por defecto: 30)'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['min_samples'] < 1:
+            raise CommandError('--requests y --min-samples deben ser mayores a 0')
+        if options['warmup'] < 0 or options['threshold'] < 0:
+            raise CommandError('--warmup y --threshold no pueden ser negativos')
+        sizes = self._parse_sizes(options['sizes'])
+        endpoints = options['endpoints'] or list(BENCHMARK_ENDPOINTS)
+        baseline = self._load_baseline(options['baseline']) if options['baseline'] else None
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'requests': options['requests'],
+            'cold_cache': options['cold_cache'],
+            'seed': options['seed'] if sizes else None,
+            'results': {},
+        }
+
+        for size in sizes or [None]:
+            label = str(size) if size is not None else 'current'
+            if size is not None:
+                user, password = self._seed(size, options)
+            else:
+                user, password = self._get_user(options['email']), options['password']
+            self.stdout.write(f'\n📊 Datos: {label} (usuario {user.email})')
+            report['results'][label] = self._run(user, password, endpoints, options)
+
+        if options['output']:
+            path = Path(options['output'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+            self.stdout.write(f'\n💾 Resultados guardados en {path}')
+
+        if baseline is not None:
+            regressions = self._compare(
+                baseline, report, options['threshold'], options['min_delta_ms'], options['min_samples']
+            )
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f'  ❌ {regression}'))
+                raise CommandError(f'{len(regressions)} métricas empeoraron respecto de {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Sin regresiones respecto de {options["baseline"]}'))
+
+    # Datos
+
+    def _parse_sizes(self, value):
+        if not value:
+            return []
+        try:
+            sizes = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise CommandError('--sizes debe ser una lista de enteros separados por coma')
+        if any(size < 1 for size in sizes):
+            raise CommandError('--sizes debe contener valores mayores a 0')
+        return sizes
+
+    def _seed(self, size, options):
+        """Regenera los datos sintéticos con ``size`` registros de calidad"""
+        self.stdout.write(f'\n🌱 Generando {size} registros sintéticos...')
+        SyntheticDataGenerator.clear()
+        generator = SyntheticDataGenerator(
+            rows=size,
+            companies=options['companies'],
+            shipments=max(1, size // 50),
+            seed=options['seed'],
+            # Fecha fija: los mismos datos en cada ejecución
+            end_date=date(2025, 12, 31),
+            workers=SyntheticDataGenerator.default_workers(),
+            log=lambda message: None,
+        )
+        generator.run()
+        # La primera empresa concentra la mayor parte de los registros
+        user = User.objects.filter(
+            company__in=SyntheticDataGenerator.synthetic_companies()
+        ).order_by('company_id').first()
+        user.set_password(BENCHMARK_PASSWORD)
+        user.save(update_fields=['password'])
+        return user, BENCHMARK_PASSWORD
+
+    def _get_user(self, email=None):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(email=email).first() if email else users.exclude(company=None).first()
+        if user is None:
+            raise CommandError('No se encontró un usuario activo para firmar las peticiones')
+        return user
+
+    def _load_baseline(self, path):
+        try:
+            return json.loads(Path(path).read_text())
+        except (OSError, ValueError) as error:
+            raise CommandError(f'No se pudo leer la línea base {path}: {error}')
+
+    # Medición
+
+    def _run(self, user, password, endpoints, options):
+        token = get_tokens_for_user(user)['access']
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        results = {}
+
+        # El cliente de pruebas usa el host "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name in endpoints:
+                method, path, share = BENCHMARK_ENDPOINTS[name]
+                body = None
+                if name == 'login':
+                    if not password:
+                        self.stdout.write('  login: omitido (falta --password)')
+                        continue
+                    body = {'email': user.email, 'password': password}
+                total = max(3, round(options['requests'] * share)) if share < 1 else options['requests']
+
+                for _ in range(options['warmup']):
+                    self._request(client, method, path, body)
+                result = self._measure(client, method, path, body, total, options['cold_cache'])
+                results[name] = result
+                self.stdout.write(
+                    f"  {name:<16} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  {result['queries']:5.1f} consultas  "
+                    f"{result['throughput_rps']:8.1f} req/s  {result['bytes'] / 1024:8.1f} KB"
+                    + (f"  ⚠️ {result['errors']} errores" if result['errors'] else '')
+                )
+        return results
+
+    def _request(self, client, method, path, body):
+        if method == 'POST':
+            response = client.post(path, data=body, content_type='application/json')
+        else:
+            response = client.get(path)
+        # Las respuestas en streaming se consumen para medir su generación completa
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, len(content)
+
+    def _measure(self, client, method, path, body, total, cold_cache):
+        latencies = []
+        queries = []
+        errors = 0
+        size = 0
+        elapsed = 0.0
+
+        for _ in range(total):
+            if cold_cache:
+                cache.clear()
+            counter = _QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                status, size = self._request(client, method, path, body)
+                duration = time.perf_counter() - started
+            elapsed += duration
+            latencies.append(duration)
+            queries.append(counter.count)
+            if status >= 400:
+                errors += 1
+
+        return {
+            'requests': total,
+            'errors': errors,
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+            'queries': round(statistics.mean(queries), 2),
+            'throughput_rps': round(total / elapsed, 2),
+            'bytes': size,
+        }
+
+    # Comparación
+
+    def _compare(self, baseline, report, threshold, min_delta_ms, min_samples):
+        regressions = []
+        few_samples = []
+        for label, endpoints in report['results'].items():
+            previous_endpoints = baseline.get('results', {}).get(label)
+            if previous_endpoints is None:
+                self.stdout.write(self.style.WARNING(f'⚠️ La línea base no tiene resultados para {label}'))
+                continue
+            for name, result in endpoints.items():
+                previous = previous_endpoints.get(name)
+                if previous is None:
+                    continue
+                # Con pocas muestras el p95 es casi el máximo y varía más que el umbral
+                samples = min(previous.get('requests', 0), result['requests'])
+                if samples < min_samples:
+                    few_samples.append(f'{label} {name} ({samples})')
+                for metric, higher_is_worse in TRACKED_METRICS.items():
+                    before, after = previous.get(metric), result.get(metric)
+                    if before is None or after is None:
+                        continue
+                    if metric != 'queries' and samples < min_samples:
+                        continue
+                    if metric == 'queries':
+                        # El número de consultas es determinista: cualquier aumento cuenta
+                        worse = after > before
+                    elif higher_is_worse:
+                        worse = after > before * (1 + threshold) and after - before > min_delta_ms
+                    else:
+                        worse = after < before * (1 - threshold)
+                    if worse:
+                        regressions.append(f'{label} {name} {metric}: {before} → {after}')
+        if few_samples:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ Menos de {min_samples} peticiones medidas; sólo se comparan las consultas: '
+                f"{', '.join(few_samples)}"
+            ))
+        return regressions
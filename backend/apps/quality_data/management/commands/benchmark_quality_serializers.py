@@ -0,0 +1,154 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.authentication.models import Company
+from apps.core.optimization import optimize_queryset
+from apps.quality_data.models import QualityData
+from apps.quality_data.serializers import FastQualityDataListSerializer, QualityDataListSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compara QualityDataListSerializer con su versión compilada (filas/segundo y salida idéntica)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=2000,
+            help='Cantidad de registros temporales a generar'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Repeticiones por serializer (se reporta la mejor)'
+        )
+        parser.add_argument(
+            '--min-speedup',
+            type=float,
+            default=0,
+            help='Falla si la aceleración es menor al valor indicado'
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows y --repeat deben ser mayores a 0')
+
+        # Los registros se crean dentro de una transacción que se revierte al final
+        try:
+            with transaction.atomic():
+                self._create_rows(options['rows'])
+                results = self._benchmark(options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        rows = options['rows']
+        self.stdout.write(f"📊 {rows} registros")
+        for label, key in (('Consulta + serialización', 'total'), ('Sólo serialización', 'serialize')):
+            drf, fast = results['drf'][key], results['fast'][key]
+            self.stdout.write(
+                f"  {label}:\n"
+                f"    DRF:       {drf * 1000:8.1f} ms ({rows / drf:,.0f} filas/s)\n"
+                f"    Compilado: {fast * 1000:8.1f} ms ({rows / fast:,.0f} filas/s)\n"
+                f"    Aceleración: {drf / fast:.1f}x"
+            )
+        speedup = results['drf']['total'] / results['fast']['total']
+
+        if not results['identical']:
+            raise CommandError('La salida JSON de ambos serializers no es idéntica')
+        self.stdout.write(self.style.SUCCESS('✅ Salida JSON idéntica'))
+
+        if speedup < options['min_speedup']:
+            raise CommandError(
+                f"Aceleración {speedup:.1f}x menor a la mínima {options['min_speedup']:.1f}x"
+            )
+
+    def _create_rows(self, rows):
+        rng = random.Random(rows)
+        companies = [
+            Company.objects.create(name=f'Benchmark {index}', domain=f'benchmark-{index}.local')
+            for index in range(3)
+        ]
+        now = timezone.now()
+
+        def measure():
+            return Decimal(rng.randint(0, 99999)) / 100 if rng.random() > 0.1 else None
+
+        QualityData.objects.bulk_create([
+            QualityData(
+                empresa=rng.choice([companies[index % 3].name, '']),
+                fecha_registro=now - timedelta(minutes=index, microseconds=rng.randint(0, 999999)),
+                temperatura=measure(),
+                humedad=measure(),
+                ph=Decimal(rng.randint(0, 1400)) / 100,
+                firmeza=measure(),
+                solidos_solubles=measure(),
+                acidez_titulable=measure(),
+                defectos_porcentaje=measure(),
+                calidad_general=rng.choice(['excelente', 'buena', 'regular', 'mala']),
+                aprobado=rng.random() > 0.3,
+                company=rng.choice(companies + [None]),
+                processed_data=rng.choice([
+                    {},
+                    {'raw': True},
+                    {'additional_info': {
+                        'total_exportable': rng.randint(0, 1000),
+                        'variedad': rng.choice(['Biloxi', 'Ventura', 'Emerald']),
+                        'destino': rng.choice(['USA', 'EUROPA', 'ASIA']),
+                        'n_fcl': f'FCL-{index}',
+                        'evaluador': 'Evaluador',
+                        'fecha_mp': '2024-01-15',
+                        'productor': 'Productor',
+                        'fundo': 'Fundo',
+                        'hora': '08:30',
+                    }},
+                ]),
+            )
+            for index in range(rows)
+        ], batch_size=500)
+
+    def _benchmark(self, repeat):
+        queryset = QualityData.objects.order_by('-fecha_registro')
+        renderer = JSONRenderer()
+        timings = {name: {'total': [], 'serialize': []} for name in ('drf', 'fast')}
+        outputs = {}
+
+        def measure(name, fetch, serialize):
+            started = time.perf_counter()
+            rows = fetch()
+            fetched = time.perf_counter()
+            outputs[name] = serialize(rows)
+            finished = time.perf_counter()
+            timings[name]['total'].append(finished - started)
+            timings[name]['serialize'].append(finished - fetched)
+
+        for _ in range(repeat):
+            measure(
+                'drf',
+                lambda: list(optimize_queryset(queryset, QualityDataListSerializer)),
+                lambda rows: QualityDataListSerializer(rows, many=True).data,
+            )
+            measure(
+                'fast',
+                lambda: list(FastQualityDataListSerializer.values(queryset)),
+                lambda rows: FastQualityDataListSerializer(rows).data,
+            )
+
+        results = {
+            name: {key: min(values) for key, values in timing.items()}
+            for name, timing in timings.items()
+        }
+        results['identical'] = renderer.render(outputs['drf']) == renderer.render(outputs['fast'])
+        return results
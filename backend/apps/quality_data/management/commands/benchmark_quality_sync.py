@@ -0,0 +1,109 @@
+import asyncio
+import time
+import warnings
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.quality_data.fake_external_api import FakeExternalQualityAPI
+from apps.quality_data.management.commands.fake_external_quality_api import (
+    add_fake_api_arguments, fake_api_config,
+)
+from apps.quality_data.models import QualityData
+from apps.quality_data.services import ExternalQualityAPIService, QualityDataService
+from apps.quality_data.sync_metrics import SYNC_PHASES
+
+DEFAULT_EMPRESA = 'EMPRESA BENCHMARK SYNC'
+SYNC_MODES = ['sync', 'async']
+# get_all_quality_data_by_company pide páginas de 100 registros y como máximo 100 páginas
+MAX_SYNC_RECORDS = 100 * 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el throughput de punta a punta de la sincronización (versiones síncrona y async) '
+        'contra la API externa simulada, creando y luego actualizando los registros'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            action='append',
+            dest='modes',
+            choices=SYNC_MODES,
+            help='Versión a medir (se puede repetir); por defecto ambas'
+        )
+        parser.add_argument(
+            '--empresa',
+            type=str,
+            default=DEFAULT_EMPRESA,
+            help=f'Empresa sincronizada; sus registros se eliminan antes y después (por defecto: {DEFAULT_EMPRESA})'
+        )
+        add_fake_api_arguments(parser)
+
+    def handle(self, *args, **options):
+        config = fake_api_config(options)
+        if config.records > MAX_SYNC_RECORDS:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ La sincronización obtiene como máximo {MAX_SYNC_RECORDS} registros por empresa'
+            ))
+        empresa = options['empresa']
+        if QualityData.objects.filter(empresa=empresa).exclude(processed_data__additional_info__record_id__startswith='SYN-').exists():
+            raise CommandError(f'{empresa} tiene datos que no son de prueba; use otra --empresa')
+
+        # Los registros de la API llegan con fechas sin zona horaria: el aviso se repetiría por fila
+        warnings.filterwarnings('ignore', message=r'DateTimeField .* received a naive datetime')
+
+        server = FakeExternalQualityAPI(config)
+        self.stdout.write(
+            f'📊 {config.records} registros, paginación {config.pagination}, '
+            f'latencia {config.latency_ms:.0f}+{config.jitter_ms:.0f} ms, empresa {empresa}'
+        )
+        with server.serve_in_background() as base_url:
+            for mode in options['modes'] or SYNC_MODES:
+                self.stdout.write(f'\n🔄 {mode}')
+                self._delete_records(empresa)
+                try:
+                    # La primera pasada crea los registros y la segunda los actualiza
+                    for label in ('creación', 'actualización'):
+                        result = self._sync(mode, base_url, empresa)
+                        self._report(label, result)
+                finally:
+                    self._delete_records(empresa)
+
+        self.stdout.write('\n🧪 API simulada: ' + ', '.join(f'{key} {value}' for key, value in server.stats.items()))
+
+    def _sync(self, mode, base_url, empresa):
+        service = ExternalQualityAPIService(base_url=base_url)
+        started = time.perf_counter()
+        if mode == 'async':
+            result = asyncio.run(service.sync_quality_data_for_company_async(empresa))
+        else:
+            result = service.sync_quality_data_for_company(empresa)
+        result['elapsed'] = time.perf_counter() - started
+        return result
+
+    def _report(self, label, result):
+        metrics = result['metrics']
+        if not result['success']:
+            self.stdout.write(self.style.ERROR(f"  ❌ {label}: {result['message']}"))
+        written = result['records_created'] + result['records_updated']
+        phases = ', '.join(f"{name} {metrics['phases'].get(name, 0):.2f}s" for name in SYNC_PHASES)
+        self.stdout.write(
+            f"  {label}: {result['records_processed']} procesados ({result['records_created']} creados, "
+            f"{result['records_updated']} actualizados) en {result['elapsed']:.2f}s → "
+            f"{written / max(result['elapsed'], 1e-9):,.0f} registros/s\n"
+            f"    {phases}\n"
+            f"    {metrics['pages']} páginas, {metrics['bytes_received'] / 1024:.0f} KB, "
+            f"p95 HTTP {metrics['http_latency_ms']['p95']:.0f} ms, {metrics['retries']} reintentos "
+            f"({metrics['retry_wait_seconds']:.1f}s de espera)"
+        )
+
+    def _delete_records(self, empresa):
+        # Borrado directo: el del ORM emitiría una señal por registro
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(QualityData._meta.db_table)} WHERE empresa = %s',
+                [empresa]
+            )
+        QualityDataService.invalidate_company_quality_counts(empresa)
@@ -0,0 +1,151 @@
+from aiohttp import web
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quality_data.fake_external_api import (
+    DATA_PATH, LOGIN_PATH, PAGINATION_OFFSET, PAGINATION_PAGE,
+    FakeExternalAPIConfig, FakeExternalQualityAPI,
+)
+
+
+def add_fake_api_arguments(parser):
+    """Opciones del servidor simulado (compartidas con benchmark_quality_sync)"""
+    parser.add_argument(
+        '--records',
+        type=int,
+        default=1000,
+        help='Registros disponibles por empresa (por defecto: 1000)'
+    )
+    parser.add_argument(
+        '--pagination',
+        choices=[PAGINATION_OFFSET, PAGINATION_PAGE],
+        default=PAGINATION_OFFSET,
+        help='Paginación que respeta el servidor: limit/offset o page/page_size (por defecto: offset)'
+    )
+    parser.add_argument(
+        '--default-limit',
+        type=int,
+        default=100,
+        help='Registros por respuesta cuando la petición no indica límite (por defecto: 100)'
+    )
+    parser.add_argument(
+        '--max-limit',
+        type=int,
+        default=1000,
+        help='Máximo de registros por respuesta (por defecto: 1000)'
+    )
+    parser.add_argument(
+        '--latency-ms',
+        type=float,
+        default=0.0,
+        help='Latencia añadida a cada respuesta en ms (por defecto: 0)'
+    )
+    parser.add_argument(
+        '--jitter-ms',
+        type=float,
+        default=0.0,
+        help='Latencia aleatoria adicional de 0 a este valor en ms (por defecto: 0)'
+    )
+    parser.add_argument(
+        '--error-rate',
+        type=float,
+        default=0.0,
+        help='Probabilidad (0-1) de responder una petición de datos con --error-status'
+    )
+    parser.add_argument(
+        '--error-status',
+        type=int,
+        default=500,
+        help='Código HTTP de los errores simulados (por defecto: 500)'
+    )
+    parser.add_argument(
+        '--retry-after',
+        type=int,
+        default=None,
+        help='Segundos a indicar en la cabecera Retry-After de los errores simulados'
+    )
+    parser.add_argument(
+        '--unauthorized-rate',
+        type=float,
+        default=0.0,
+        help='Probabilidad (0-1) de rechazar con 401 una petición de datos con token válido'
+    )
+    parser.add_argument(
+        '--token-ttl',
+        type=int,
+        default=1800,
+        help='Segundos de validez de los tokens emitidos (por defecto: 1800)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Semilla de los registros generados (por defecto: 42)'
+    )
+
+
+def fake_api_config(options) -> FakeExternalAPIConfig:
+    if options['records'] < 0 or options['default_limit'] < 1 or options['max_limit'] < 1:
+        raise CommandError('--records no puede ser negativo y --default-limit y --max-limit deben ser mayores a 0')
+    for rate in ('error_rate', 'unauthorized_rate'):
+        if not 0 <= options[rate] <= 1:
+            raise CommandError(f"--{rate.replace('_', '-')} debe estar entre 0 y 1")
+    return FakeExternalAPIConfig(
+        records=options['records'],
+        pagination=options['pagination'],
+        default_limit=options['default_limit'],
+        max_limit=options['max_limit'],
+        latency_ms=options['latency_ms'],
+        jitter_ms=options['jitter_ms'],
+        error_rate=options['error_rate'],
+        error_status=options['error_status'],
+        retry_after=options['retry_after'],
+        unauthorized_rate=options['unauthorized_rate'],
+        token_ttl=options['token_ttl'],
+        seed=options['seed'],
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta un servidor local que imita la API externa de calidad (login y datos de '
+        'calidad de producto terminado) para probar la sincronización sin el servicio real'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='127.0.0.1',
+            help='Interfaz de escucha (por defecto: 127.0.0.1)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8001,
+            help='Puerto (por defecto: 8001, el de EXTERNAL_QUALITY_API_URL en desarrollo)'
+        )
+        add_fake_api_arguments(parser)
+
+    def handle(self, *args, **options):
+        config = fake_api_config(options)
+        server = FakeExternalQualityAPI(config)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🧪 API externa simulada en http://{options['host']}:{options['port']}\n"
+            f"  POST {LOGIN_PATH} (usuario {config.username})\n"
+            f"  POST {DATA_PATH}\n"
+            f"  {config.records} registros por empresa, paginación {config.pagination}, "
+            f"latencia {config.latency_ms:.0f}+{config.jitter_ms:.0f} ms, "
+            f"errores {config.error_rate:.0%}, 401 {config.unauthorized_rate:.0%}, "
+            f"tokens de {config.token_ttl}s"
+        ))
+        try:
+            web.run_app(
+                server.application(),
+                host=options['host'],
+                port=options['port'],
+                print=None,
+                access_log=None,
+            )
+        finally:
+            self.stdout.write('\n📊 ' + ', '.join(f'{key} {value}' for key, value in server.stats.items()))
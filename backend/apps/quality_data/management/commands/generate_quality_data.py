@@ -0,0 +1,113 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quality_data.synthetic import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos reproducibles (datos de calidad, embarques, inspecciones y '
+        'muestras) para pruebas de carga y benchmarks, sin acceder a la red'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Registros de calidad a generar (por defecto: 10000)'
+        )
+        parser.add_argument(
+            '--companies',
+            type=int,
+            default=5,
+            help='Empresas de prueba entre las que se reparten los registros (por defecto: 5)'
+        )
+        parser.add_argument(
+            '--shipments',
+            type=int,
+            default=None,
+            help='Embarques a generar, cada uno con 1-4 inspecciones y sus muestras (por defecto: rows / 50)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla: con la misma semilla, --end-date y --chunk-size se generan los mismos datos (por defecto: 42)'
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Fecha YYYY-MM-DD del registro más reciente (por defecto: hoy)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Días de historia hacia atrás desde --end-date (por defecto: 365)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Registros de calidad por bloque de inserción (por defecto: 10000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Procesos en paralelo (por defecto: hasta 4 en PostgreSQL, 1 en otras bases)'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Eliminar antes los datos sintéticos generados previamente'
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 0 or (options['shipments'] or 0) < 0:
+            raise CommandError('--rows y --shipments no pueden ser negativos')
+        if options['companies'] <= 0 or options['days'] <= 0 or options['chunk_size'] <= 0:
+            raise CommandError('--companies, --days y --chunk-size deben ser mayores que cero')
+        end_date = None
+        if options['end_date']:
+            try:
+                end_date = date.fromisoformat(options['end_date'])
+            except ValueError:
+                raise CommandError('--end-date debe tener el formato YYYY-MM-DD')
+
+        if options['clear']:
+            deleted = SyntheticDataGenerator.clear()
+            self.stdout.write('🗑️ Datos sintéticos eliminados: ' + ', '.join(
+                f'{name} {count}' for name, count in deleted.items()
+            ))
+
+        shipments = options['shipments'] if options['shipments'] is not None else options['rows'] // 50
+        workers = options['workers'] or SyntheticDataGenerator.default_workers()
+        self.stdout.write(
+            f"🌱 Generando {options['rows']} registros de calidad y {shipments} embarques "
+            f"para {options['companies']} empresas (semilla {options['seed']}, {workers} procesos)..."
+        )
+
+        generator = SyntheticDataGenerator(
+            rows=options['rows'],
+            companies=options['companies'],
+            shipments=shipments,
+            seed=options['seed'],
+            end_date=end_date,
+            days=options['days'],
+            chunk_size=options['chunk_size'],
+            workers=workers,
+            log=self.stdout.write,
+        )
+        summary = generator.run()
+
+        quality_seconds = summary['quality_data_seconds']
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {summary['quality_data']} registros de calidad en {quality_seconds:.1f}s "
+            f"({summary['quality_data'] / max(quality_seconds, 1e-9):,.0f}/s)\n"
+            f"✅ {summary.get('shipments', 0)} embarques, {summary.get('inspections', 0)} inspecciones, "
+            f"{summary.get('quality_reports', 0)} reportes y {summary.get('samples', 0)} muestras "
+            f"en {summary['production_seconds']:.1f}s"
+        ))
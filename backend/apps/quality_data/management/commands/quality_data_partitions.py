@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quality_data.partitions import QualityDataPartitionService
+
+
+class Command(BaseCommand):
+    help = 'Crea las particiones mensuales futuras de datos de calidad y lista las existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=None,
+            help='Meses futuros a crear además del actual (por defecto QUALITY_DATA_PARTITION_MONTHS_AHEAD)'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Listar las particiones con su número estimado de filas'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Alias de la base de datos'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if options['months_ahead'] is not None and options['months_ahead'] < 0:
+            raise CommandError('--months-ahead no puede ser negativo')
+
+        if not QualityDataPartitionService.is_partitioned(using):
+            self.stdout.write(self.style.WARNING(
+                '⚠️ La tabla de datos de calidad no está particionada (requiere PostgreSQL y la migración 0002)'
+            ))
+            return
+
+        created = QualityDataPartitionService.ensure_future_partitions(options['months_ahead'], using=using)
+        if created:
+            self.stdout.write(self.style.SUCCESS(f"✅ Particiones creadas: {', '.join(created)}"))
+        else:
+            self.stdout.write('✅ Las particiones de los próximos meses ya existen')
+
+        if options['list']:
+            for partition in QualityDataPartitionService.list_partitions(using):
+                indent = '  ' * partition['level']
+                self.stdout.write(
+                    f"{indent}{partition['name']}: {partition['bounds']} (~{partition['estimated_rows']} filas)"
+                )
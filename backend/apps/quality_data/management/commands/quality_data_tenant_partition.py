@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from apps.authentication.models import Company
+from apps.quality_data.partitions import QualityDataPartitionService
+
+
+class Command(BaseCommand):
+    help = 'Crea la partición propia de una empresa y traslada sus datos de calidad sin detener el servicio'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=str,
+            help='Id o nombre exacto de la empresa a trasladar'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Registros copiados por transacción (por defecto: 5000)'
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=int,
+            default=10,
+            help='Segundos máximos de espera del bloqueo en el cambio final (por defecto: 10)'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Listar las empresas que ya tienen partición propia'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Alias de la base de datos'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not QualityDataPartitionService.is_partitioned(using):
+            raise CommandError(
+                'La tabla de datos de calidad no está particionada (requiere PostgreSQL y la migración 0002)'
+            )
+
+        if options['list']:
+            company_ids = QualityDataPartitionService.tenant_partition_company_ids(using)
+            companies = Company.objects.using(using).filter(id__in=company_ids).order_by('name')
+            if not companies:
+                self.stdout.write('Ninguna empresa tiene partición propia')
+            for company in companies:
+                table = QualityDataPartitionService.tenant_table(company.id)
+                self.stdout.write(f'  {company.name} (id {company.id}): {table}')
+            return
+
+        if not options['company']:
+            raise CommandError('Indica la empresa con --company o usa --list')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size debe ser mayor que cero')
+
+        company = self._get_company(options['company'], using)
+        self.stdout.write(f'🚚 Trasladando los datos de calidad de {company.name} a su partición...')
+        try:
+            result = QualityDataPartitionService.move_tenant_to_partition(
+                company,
+                batch_size=options['batch_size'],
+                lock_timeout=options['lock_timeout'],
+                using=using,
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        except DatabaseError as e:
+            raise CommandError(
+                f'No se pudo completar el traslado ({str(e).strip()}). '
+                f'Volver a ejecutar el comando retoma la copia ya realizada.'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {company.name} trasladada a {QualityDataPartitionService.tenant_table(company.id)}: "
+            f"{result['copied']} copiados, {result['changes_applied']} cambios aplicados, "
+            f"{result['relinked']} registros asociados a la empresa"
+        ))
+
+    def _get_company(self, value: str, using: str) -> Company:
+        companies = Company.objects.using(using)
+        company = companies.filter(id=int(value)).first() if value.isdigit() else None
+        company = company or companies.filter(name=value).first()
+        if company is None:
+            raise CommandError(f'No existe la empresa "{value}"')
+        return company
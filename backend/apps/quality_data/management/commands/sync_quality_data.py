@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from apps.quality_data.services import ExternalQualityAPIService
+from apps.quality_data.sync_metrics import SYNC_PHASES
 from apps.authentication.models import Company
 
 User = get_user_model()
@@ -59,12 +60,21 @@ class Command(BaseCommand):
         total_processed = 0
         total_created = 0
         total_updated = 0
+        total_pages = 0
+        total_bytes = 0
+        total_retries = 0
+        total_seconds = 0.0
 
         for empresa in empresas:
             self.stdout.write(f"\n🔄 Sincronizando empresa: {empresa}")
             
             try:
                 result = external_service.sync_quality_data_for_company(empresa, admin_user)
+                metrics = result['metrics']
+                total_pages += metrics['pages']
+                total_bytes += metrics['bytes_received']
+                total_retries += metrics['retries']
+                total_seconds += metrics['duration_seconds']
                 
                 if result['success']:
                     self.stdout.write(
@@ -81,6 +91,7 @@ class Command(BaseCommand):
                     self.stdout.write(
                         self.style.ERROR(f"❌ {empresa}: {result['message']}")
                     )
+                self.stdout.write(self._format_metrics(metrics))
                     
             except Exception as e:
                 self.stdout.write(
@@ -95,10 +106,28 @@ class Command(BaseCommand):
                 f"  Empresas procesadas: {len(empresas)}\n"
                 f"  Total registros procesados: {total_processed}\n"
                 f"  Total registros creados: {total_created}\n"
-                f"  Total registros actualizados: {total_updated}"
+                f"  Total registros actualizados: {total_updated}\n"
+                f"  Páginas descargadas: {total_pages} ({total_bytes / 1024 / 1024:.2f} MB)\n"
+                f"  Reintentos: {total_retries}\n"
+                f"  Tiempo total: {total_seconds:.1f}s"
             )
         )
 
+    def _format_metrics(self, metrics):
+        """
+        Resume en dos líneas los tiempos por fase y el rendimiento de una sincronización
+        """
+        phases = ', '.join(f"{name} {metrics['phases'].get(name, 0):.2f}s" for name in SYNC_PHASES)
+        latency = metrics['http_latency_ms']
+        return (
+            f"   ⏱️ {metrics['duration_seconds']:.2f}s — {phases}\n"
+            f"   📶 {metrics['pages']} páginas, {metrics['bytes_received'] / 1024:.1f} KB, "
+            f"latencia p50/p95/p99 {latency['p50']:.0f}/{latency['p95']:.0f}/{latency['p99']:.0f} ms, "
+            f"{metrics['retries']} reintentos ({metrics['retry_wait_seconds']:.1f}s de espera), "
+            f"{metrics['transform_rows_per_second']:.0f} filas/s transformadas, "
+            f"{metrics['write_rows_per_second']:.0f} filas/s escritas"
+        )
+
     def _get_admin_user(self, admin_email=None):
         """
         Obtiene un usuario administrador para la sincronización
@@ -0,0 +1,160 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:00
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+# Copia de apps.quality_data.partitions al crear esta migración: los cambios posteriores
+# de ese módulo no deben alterar una migración ya aplicada
+TABLE = 'quality_data_qualitydata'
+PARTITION_KEY = 'fecha_registro'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _timestamp_literal(value):
+    # Los límites de una partición son DDL y no admiten parámetros
+    return f"'{value.isoformat(sep=' ')}'"
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def month_bounds(month):
+    """Inicio (incluido) y fin (excluido) del mes en la zona horaria del proyecto"""
+    tz = ZoneInfo(settings.TIME_ZONE)
+    following = _add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=tz),
+        datetime(following.year, following.month, 1, tzinfo=tz),
+    )
+
+
+def upcoming_months():
+    """Mes actual y los ``QUALITY_DATA_PARTITION_MONTHS_AHEAD`` siguientes"""
+    months_ahead = getattr(settings, 'QUALITY_DATA_PARTITION_MONTHS_AHEAD', 3)
+    current = timezone.localdate().replace(day=1)
+    return [_add_months(current, offset) for offset in range(months_ahead + 1)]
+
+
+def rebuild_table(connection, partitioned):
+    quote = connection.ops.quote_name
+    old_table = f'{TABLE}_old'
+    primary_key = f'{TABLE}_pkey'
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+
+        cursor.execute(
+            'SELECT indexdef FROM pg_indexes '
+            'WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s',
+            [TABLE, primary_key]
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+
+        # Liberar los nombres de la tabla, su llave primaria y su secuencia
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(old_table)}')
+        cursor.execute(
+            f'ALTER TABLE {quote(old_table)} RENAME CONSTRAINT {quote(primary_key)} '
+            f'TO {quote(old_table + "_pkey")}'
+        )
+        if sequence:
+            cursor.execute(f'ALTER SEQUENCE {sequence} RENAME TO {quote(old_table + "_id_seq")}')
+
+        partition_clause = f' PARTITION BY RANGE ({quote(PARTITION_KEY)})' if partitioned else ''
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} (LIKE {quote(old_table)} INCLUDING DEFAULTS '
+            f'INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)'
+            f'{partition_clause}'
+        )
+        # En una tabla particionada la llave primaria debe incluir la llave de partición
+        key_columns = ['id', PARTITION_KEY] if partitioned else ['id']
+        cursor.execute(
+            f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(primary_key)} '
+            f'PRIMARY KEY ({", ".join(quote(column) for column in key_columns)})'
+        )
+
+        if partitioned:
+            cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT')
+            cursor.execute(
+                f"SELECT DISTINCT date_trunc('month', {quote(PARTITION_KEY)} AT TIME ZONE %s)::date "
+                f"FROM {quote(old_table)}",
+                [settings.TIME_ZONE]
+            )
+            months = {row[0] for row in cursor.fetchall()}
+            months.update(upcoming_months())
+            for month in sorted(months):
+                start, end = month_bounds(month)
+                cursor.execute(
+                    f'CREATE TABLE {quote(partition_name(month))} PARTITION OF {quote(TABLE)} '
+                    f'FOR VALUES FROM ({_timestamp_literal(start)}) TO ({_timestamp_literal(end)})'
+                )
+
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(old_table)}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f"FROM {quote(TABLE)}",
+            [TABLE]
+        )
+        cursor.execute(f'DROP TABLE {quote(old_table)}')
+
+        # Los índices se crean después de copiar los datos; sobre la tabla padre
+        # PostgreSQL crea uno por partición
+        for definition in index_definitions:
+            cursor.execute(definition.replace(' ON ONLY ', ' ON '))
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+        cursor.execute(f'ANALYZE {quote(TABLE)}')
+
+
+def partition_quality_data(apps, schema_editor):
+    """Convierte la tabla en particionada por mes de fecha_registro (sólo PostgreSQL)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    rebuild_table(schema_editor.connection, partitioned=True)
+
+
+def unpartition_quality_data(apps, schema_editor):
+    """Vuelve a una tabla sin particionar conservando los datos"""
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE]
+        )
+        row = cursor.fetchone()
+    # Las particiones por tenant se crean fuera de las migraciones (quality_data_tenant_partition)
+    if row is not None and row[0] == 'l':
+        raise RuntimeError(
+            f'{TABLE} está particionada por company_id; esta migración sólo revierte el '
+            f'particionado mensual'
+        )
+    rebuild_table(connection, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_quality_data, unpartition_quality_data),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_generate_image_derivatives'),
+        ('quality_data', '0002_partition_qualitydata_by_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QualityDataArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('empresa', models.CharField(max_length=200, verbose_name='Empresa')),
+                ('before', models.DateTimeField(verbose_name='Archivado antes de')),
+                ('file_path', models.CharField(max_length=500, unique=True, verbose_name='Archivo')),
+                ('record_count', models.PositiveIntegerField(default=0, verbose_name='Registros')),
+                ('deleted_count', models.PositiveIntegerField(default=0, verbose_name='Registros eliminados')),
+                ('size_bytes', models.BigIntegerField(default=0, verbose_name='Tamaño (bytes)')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('fecha_desde', models.DateTimeField(blank=True, null=True, verbose_name='Primer registro')),
+                ('fecha_hasta', models.DateTimeField(blank=True, null=True, verbose_name='Último registro')),
+                ('min_id', models.BigIntegerField(blank=True, null=True, verbose_name='Id mínimo')),
+                ('max_id', models.BigIntegerField(blank=True, null=True, verbose_name='Id máximo')),
+                ('started_at', models.DateTimeField(verbose_name='Inicio de la Lectura')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('purged_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Eliminación')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quality_data_archives', to='authentication.company', verbose_name='Empresa del Sistema')),
+            ],
+            options={
+                'verbose_name': 'Archivo de Datos de Calidad',
+                'verbose_name_plural': 'Archivos de Datos de Calidad',
+                'ordering': ['-fecha_hasta'],
+                'indexes': [models.Index(fields=['empresa', 'fecha_desde', 'fecha_hasta'], name='quality_dat_empresa_3591e9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_generate_image_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quality_data', '0003_quality_data_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('empresa', models.CharField(max_length=200, verbose_name='Empresa')),
+                ('mode', models.CharField(choices=[('sync', 'Síncrona'), ('async', 'Async')], default='sync', max_length=10, verbose_name='Modo')),
+                ('success', models.BooleanField(default=False, verbose_name='Exitosa')),
+                ('message', models.TextField(blank=True, verbose_name='Mensaje')),
+                ('records_processed', models.PositiveIntegerField(default=0, verbose_name='Registros procesados')),
+                ('records_created', models.PositiveIntegerField(default=0, verbose_name='Registros creados')),
+                ('records_updated', models.PositiveIntegerField(default=0, verbose_name='Registros actualizados')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Páginas')),
+                ('bytes_received', models.BigIntegerField(default=0, verbose_name='Bytes recibidos')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='Reintentos')),
+                ('duration_seconds', models.FloatField(default=0, verbose_name='Duración (s)')),
+                ('metrics', models.JSONField(blank=True, default=dict, verbose_name='Métricas')),
+                ('started_at', models.DateTimeField(verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(auto_now_add=True, verbose_name='Fin')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quality_sync_runs', to='authentication.company', verbose_name='Empresa del Sistema')),
+                ('triggered_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Ejecutada por')),
+            ],
+            options={
+                'verbose_name': 'Sincronización de Datos de Calidad',
+                'verbose_name_plural': 'Sincronizaciones de Datos de Calidad',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['empresa', '-started_at'], name='quality_dat_empresa_259d27_idx')],
+            },
+        ),
+    ]
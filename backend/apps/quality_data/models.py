@@ -5,6 +5,21 @@ from apps.authentication.models import Company
 User = get_user_model()
 
 
+class QualityDataQuerySet(models.QuerySet):
+    def for_empresa(self, empresa):
+        """
+        Registros de una empresa. Si la empresa tiene partición propia se filtra también
+        por ``company_id`` para que PostgreSQL sólo recorra esa partición.
+        """
+        from .partitions import QualityDataPartitionService
+
+        queryset = self.filter(empresa=empresa)
+        company_id = QualityDataPartitionService.tenant_company_id(empresa)
+        if company_id is not None:
+            queryset = queryset.filter(company_id=company_id)
+        return queryset
+
+
 class QualityData(models.Model):
     """
     Modelo para almacenar datos de calidad de arándanos obtenidos de la API externa
@@ -132,6 +147,8 @@ class QualityData(models.Model):
         verbose_name="Datos Procesados de la API"
     )
 
+    objects = QualityDataQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Dato de Calidad"
         verbose_name_plural = "Datos de Calidad"
@@ -148,9 +165,13 @@ class QualityData(models.Model):
 
     def save(self, *args, **kwargs):
         # Intentar asociar con una empresa del sistema si no está asignada
-        if not self.company and self.empresa:
+        if not self.company_id and self.empresa:
             try:
-                company = Company.objects.filter(name__icontains=self.empresa).first()
+                # La coincidencia exacta tiene prioridad: ubica el registro en la partición de su empresa
+                company = (
+                    Company.objects.filter(name=self.empresa).first()
+                    or Company.objects.filter(name__icontains=self.empresa).first()
+                )
                 if company:
                     self.company = company
             except:
@@ -173,3 +194,100 @@ class QualityData(models.Model):
     def aprobado_display(self):
         """Retorna el estado de aprobación para mostrar"""
         return "Sí" if self.aprobado else "No"
+
+
+class QualityDataArchive(models.Model):
+    """
+    Manifiesto de un archivo de datos de calidad históricos (NDJSON comprimido con gzip).
+
+    Cada archivo contiene los registros de una empresa con ``fecha_registro`` anterior
+    a ``before``; los registros se eliminan de la tabla principal después de escribirlo.
+    """
+    empresa = models.CharField(max_length=200, verbose_name="Empresa")
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        related_name='quality_data_archives',
+        null=True,
+        blank=True,
+        verbose_name="Empresa del Sistema"
+    )
+    before = models.DateTimeField(verbose_name="Archivado antes de")
+    file_path = models.CharField(max_length=500, unique=True, verbose_name="Archivo")
+    record_count = models.PositiveIntegerField(default=0, verbose_name="Registros")
+    deleted_count = models.PositiveIntegerField(default=0, verbose_name="Registros eliminados")
+    size_bytes = models.BigIntegerField(default=0, verbose_name="Tamaño (bytes)")
+    sha256 = models.CharField(max_length=64, verbose_name="SHA-256")
+    fecha_desde = models.DateTimeField(null=True, blank=True, verbose_name="Primer registro")
+    fecha_hasta = models.DateTimeField(null=True, blank=True, verbose_name="Último registro")
+    min_id = models.BigIntegerField(null=True, blank=True, verbose_name="Id mínimo")
+    max_id = models.BigIntegerField(null=True, blank=True, verbose_name="Id máximo")
+    started_at = models.DateTimeField(verbose_name="Inicio de la Lectura")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    purged_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Eliminación")
+
+    class Meta:
+        verbose_name = "Archivo de Datos de Calidad"
+        verbose_name_plural = "Archivos de Datos de Calidad"
+        ordering = ['-fecha_hasta']
+        indexes = [
+            models.Index(fields=['empresa', 'fecha_desde', 'fecha_hasta']),
+        ]
+
+    def __str__(self):
+        return f"{self.empresa} - {self.record_count} registros antes de {self.before:%Y-%m-%d}"
+
+
+class SyncRun(models.Model):
+    """
+    Historial de sincronizaciones con la API externa de calidad: resultado, volúmenes
+    y tiempos por fase (login, descarga, particiones, transformación y escritura).
+    """
+    MODE_SYNC = 'sync'
+    MODE_ASYNC = 'async'
+    MODE_CHOICES = [
+        (MODE_SYNC, 'Síncrona'),
+        (MODE_ASYNC, 'Async'),
+    ]
+
+    empresa = models.CharField(max_length=200, verbose_name="Empresa")
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        related_name='quality_sync_runs',
+        null=True,
+        blank=True,
+        verbose_name="Empresa del Sistema"
+    )
+    triggered_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Ejecutada por"
+    )
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=MODE_SYNC, verbose_name="Modo")
+    success = models.BooleanField(default=False, verbose_name="Exitosa")
+    message = models.TextField(blank=True, verbose_name="Mensaje")
+    records_processed = models.PositiveIntegerField(default=0, verbose_name="Registros procesados")
+    records_created = models.PositiveIntegerField(default=0, verbose_name="Registros creados")
+    records_updated = models.PositiveIntegerField(default=0, verbose_name="Registros actualizados")
+    pages = models.PositiveIntegerField(default=0, verbose_name="Páginas")
+    bytes_received = models.BigIntegerField(default=0, verbose_name="Bytes recibidos")
+    retries = models.PositiveIntegerField(default=0, verbose_name="Reintentos")
+    duration_seconds = models.FloatField(default=0, verbose_name="Duración (s)")
+    metrics = models.JSONField(default=dict, blank=True, verbose_name="Métricas")
+    started_at = models.DateTimeField(verbose_name="Inicio")
+    finished_at = models.DateTimeField(auto_now_add=True, verbose_name="Fin")
+
+    class Meta:
+        verbose_name = "Sincronización de Datos de Calidad"
+        verbose_name_plural = "Sincronizaciones de Datos de Calidad"
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['empresa', '-started_at']),
+        ]
+
+    def __str__(self):
+        estado = 'OK' if self.success else 'ERROR'
+        return f"{self.empresa} - {self.started_at:%Y-%m-%d %H:%M} ({estado}, {self.duration_seconds:.1f}s)"
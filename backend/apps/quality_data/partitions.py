@@ -0,0 +1,719 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.utils import timezone
+
+from apps.authentication.models import Company
+
+from .models import QualityData
+
+logger = logging.getLogger(__name__)
+
+TABLE = QualityData._meta.db_table
+PARTITION_KEY = 'fecha_registro'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+# Particionado por tenant: la tabla padre se lista por company_id, la partición DEFAULT
+# (tabla compartida) conserva el particionado mensual y cada tenant grande tiene la suya
+TENANT_KEY = 'company_id'
+SHARED_TABLE = f'{TABLE}_shared'
+TENANT_TABLE_RE = re.compile(rf'^{TABLE}_c(\d+)$')
+TENANT_PARTITIONS_CACHE_KEY = 'quality_data_tenant_partitions'
+TENANT_PARTITIONS_CACHE_TIMEOUT = 600
+
+PARTITIONS_CHECKED_CACHE_KEY = 'quality_data_partitions_checked'
+# Segundos entre verificaciones automáticas de las particiones futuras
+PARTITIONS_CHECK_INTERVAL = 12 * 60 * 60
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _timestamp_literal(value: datetime) -> str:
+    # Los límites de una partición son DDL y no admiten parámetros
+    return f"'{value.isoformat(sep=' ')}'"
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# Registra en <tabla>_changes los ids de las filas del tenant modificadas en la tabla
+# compartida mientras se copian a su partición (TG_ARGV: company_id, tabla de cambios)
+CAPTURE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION quality_data_tenant_move_capture() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF OLD.company_id = TG_ARGV[0]::bigint OR NEW.company_id = TG_ARGV[0]::bigint THEN
+        EXECUTE format('INSERT INTO %I (id) VALUES ($1)', TG_ARGV[1]) USING COALESCE(NEW.id, OLD.id);
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+class QualityDataPartitionService:
+    """
+    Particionado nativo de PostgreSQL por rango mensual de ``fecha_registro``.
+
+    Los meses se cortan en la zona horaria del proyecto (``TIME_ZONE``). Los registros
+    de meses sin partición caen en la partición ``DEFAULT`` y se trasladan a la de su
+    mes cuando ésta se crea. Los índices del modelo se definen sobre la tabla padre,
+    por lo que cada partición tiene los suyos y las consultas acotadas por fecha sólo
+    recorren las particiones del rango.
+
+    Opcionalmente, los tenants con muchos registros pueden tener una partición propia:
+    la tabla padre pasa a particionarse por lista de ``company_id``, con la tabla
+    mensual existente como partición DEFAULT y una partición (también mensual) por
+    tenant. La tabla padre no tiene llave primaria porque ``company_id`` admite nulos;
+    cada partición mantiene la suya sobre ``(id, fecha_registro)``.
+    """
+
+    @staticmethod
+    def is_supported(using: str = DEFAULT_DB_ALIAS) -> bool:
+        return connections[using].vendor == 'postgresql'
+
+    @staticmethod
+    def is_partitioned(using: str = DEFAULT_DB_ALIAS) -> bool:
+        if not QualityDataPartitionService.is_supported(using):
+            return False
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                'SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE]
+            )
+            row = cursor.fetchone()
+        return row is not None and row[0] == 'p'
+
+    @staticmethod
+    def partition_name(month: date, parent: str = TABLE) -> str:
+        return f'{QualityDataPartitionService._partition_prefix(parent)}_p{month:%Y%m}'
+
+    @staticmethod
+    def _partition_prefix(parent: str) -> str:
+        # Las particiones mensuales de la tabla compartida conservan sus nombres originales
+        return TABLE if parent in (TABLE, SHARED_TABLE) else parent
+
+    @staticmethod
+    def _partition_strategy(cursor, table: str) -> Optional[str]:
+        """'r' (rango), 'l' (lista) o None si la tabla no está particionada"""
+        cursor.execute(
+            'SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table]
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _range_parents(cursor) -> List[str]:
+        """Tablas particionadas por mes: la principal, o la compartida y las de cada tenant"""
+        strategy = QualityDataPartitionService._partition_strategy(cursor, TABLE)
+        if strategy == 'r':
+            return [TABLE]
+        if strategy != 'l':
+            return []
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s) AND child.relkind = 'p'
+            ORDER BY child.relname
+            """,
+            [TABLE]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def month_bounds(month: date) -> Tuple[datetime, datetime]:
+        """Inicio (incluido) y fin (excluido) del mes en la zona horaria del proyecto"""
+        tz = ZoneInfo(settings.TIME_ZONE)
+        following = _add_months(month, 1)
+        return (
+            datetime(month.year, month.month, 1, tzinfo=tz),
+            datetime(following.year, following.month, 1, tzinfo=tz),
+        )
+
+    @staticmethod
+    def upcoming_months(months_ahead: int = None) -> List[date]:
+        """Mes actual y los ``QUALITY_DATA_PARTITION_MONTHS_AHEAD`` siguientes"""
+        if months_ahead is None:
+            months_ahead = getattr(settings, 'QUALITY_DATA_PARTITION_MONTHS_AHEAD', 3)
+        current = timezone.localdate().replace(day=1)
+        return [_add_months(current, offset) for offset in range(months_ahead + 1)]
+
+    @staticmethod
+    def list_partitions(using: str = DEFAULT_DB_ALIAS) -> List[Dict[str, Any]]:
+        """Particiones (en todos los niveles) con sus límites y el número estimado de filas"""
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, parent.relname, tree.level, pg_get_expr(child.relpartbound, child.oid),
+                       child.reltuples
+                FROM pg_partition_tree(to_regclass(%s)) tree
+                JOIN pg_class child ON child.oid = tree.relid
+                JOIN pg_class parent ON parent.oid = tree.parentrelid
+                WHERE tree.level > 0
+                ORDER BY parent.relname, child.relname
+                """,
+                [TABLE]
+            )
+            return [
+                {
+                    'name': name,
+                    'parent': parent,
+                    'level': level,
+                    'bounds': bounds,
+                    'estimated_rows': max(int(rows), 0),
+                }
+                for name, parent, level, bounds, rows in cursor.fetchall()
+            ]
+
+    @staticmethod
+    def ensure_partitions(months: Iterable[date], using: str = DEFAULT_DB_ALIAS) -> List[str]:
+        """
+        Crea las particiones mensuales que falten (en la tabla compartida y en las de
+        cada tenant) y mueve a ellas las filas de la partición DEFAULT correspondiente.
+        Retorna los nombres de las particiones creadas.
+        """
+        connection = connections[using]
+        created = []
+
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # Serializa la creación entre procesos que verifican a la vez
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [TABLE])
+            for parent in QualityDataPartitionService._range_parents(cursor):
+                created += QualityDataPartitionService._create_month_partitions(
+                    cursor, connection.ops.quote_name, parent, months
+                )
+
+        return created
+
+    @staticmethod
+    def _create_month_partitions(cursor, quote, parent: str, months: Iterable[date]) -> List[str]:
+        prefix = QualityDataPartitionService._partition_prefix(parent)
+        created = []
+        for month in sorted(set(months)):
+            name = QualityDataPartitionService.partition_name(month, parent)
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is not None:
+                continue
+
+            start, end = QualityDataPartitionService.month_bounds(month)
+            # Crear la tabla suelta y adjuntarla bloquea menos que CREATE ... PARTITION OF;
+            # ATTACH crea en ella los índices y llaves foráneas de la tabla padre
+            cursor.execute(
+                f'CREATE TABLE {quote(name)} (LIKE {quote(parent)} '
+                f'INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)'
+            )
+            cursor.execute(
+                f'WITH moved AS ('
+                f'DELETE FROM {quote(prefix + "_default")} '
+                f'WHERE {quote(PARTITION_KEY)} >= %s AND {quote(PARTITION_KEY)} < %s '
+                f'RETURNING *) '
+                f'INSERT INTO {quote(name)} SELECT * FROM moved',
+                [start, end]
+            )
+            cursor.execute(
+                f'ALTER TABLE {quote(parent)} ATTACH PARTITION {quote(name)} '
+                f'FOR VALUES FROM ({_timestamp_literal(start)}) TO ({_timestamp_literal(end)})'
+            )
+            created.append(name)
+        return created
+
+    @staticmethod
+    def ensure_future_partitions(months_ahead: int = None, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+        """Crea las particiones del mes actual y de los próximos meses (no-op sin particionado)"""
+        if not QualityDataPartitionService.is_partitioned(using):
+            return []
+        return QualityDataPartitionService.ensure_partitions(
+            QualityDataPartitionService.upcoming_months(months_ahead), using=using
+        )
+
+    @staticmethod
+    def ensure_future_partitions_periodically() -> List[str]:
+        """
+        Versión de ``ensure_future_partitions`` para los procesos de sincronización:
+        verifica como máximo una vez cada ``PARTITIONS_CHECK_INTERVAL`` segundos y no
+        interrumpe la sincronización si falla (los registros caen en la partición DEFAULT).
+        """
+        if not cache.add(PARTITIONS_CHECKED_CACHE_KEY, True, PARTITIONS_CHECK_INTERVAL):
+            return []
+        try:
+            return QualityDataPartitionService.ensure_future_partitions()
+        except DatabaseError as e:
+            cache.delete(PARTITIONS_CHECKED_CACHE_KEY)
+            logger.warning('No se pudieron crear las particiones futuras de datos de calidad', exc_info=e)
+            return []
+
+    @staticmethod
+    def drop_empty_partitions(before: datetime, lock_timeout: int = 5, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+        """
+        Elimina las particiones mensuales vacías que terminan antes de ``before`` (por
+        ejemplo, tras archivar sus registros) para que la tabla no acumule meses sin datos.
+        Cada partición se separa en su propia transacción; retorna las eliminadas.
+        """
+        if not QualityDataPartitionService.is_partitioned(using):
+            return []
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        dropped = []
+
+        with connection.cursor() as cursor:
+            for parent in QualityDataPartitionService._range_parents(cursor):
+                prefix = QualityDataPartitionService._partition_prefix(parent)
+                cursor.execute(
+                    """
+                    SELECT child.relname FROM pg_inherits
+                    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                    WHERE pg_inherits.inhparent = to_regclass(%s)
+                    """,
+                    [parent]
+                )
+                for (name,) in cursor.fetchall():
+                    match = re.fullmatch(rf'{re.escape(prefix)}_p(\d{{4}})(\d{{2}})', name)
+                    if not match:
+                        continue
+                    month = date(int(match.group(1)), int(match.group(2)), 1)
+                    if QualityDataPartitionService.month_bounds(month)[1] > before:
+                        continue
+                    with transaction.atomic(using=using):
+                        cursor.execute(f"SET LOCAL lock_timeout = '{int(lock_timeout)}s'")
+                        cursor.execute(f'LOCK TABLE {quote(name)} IN ACCESS EXCLUSIVE MODE')
+                        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {quote(name)})')
+                        if cursor.fetchone()[0]:
+                            continue
+                        cursor.execute(f'ALTER TABLE {quote(parent)} DETACH PARTITION {quote(name)}')
+                        cursor.execute(f'DROP TABLE {quote(name)}')
+                    dropped.append(name)
+        return dropped
+
+    @staticmethod
+    def tenant_table(company_id: int) -> str:
+        return f'{TABLE}_c{company_id}'
+
+    @staticmethod
+    def tenant_partition_company_ids(using: str = DEFAULT_DB_ALIAS) -> Set[int]:
+        """Ids de las empresas que tienen partición propia"""
+        if not QualityDataPartitionService.is_supported(using):
+            return set()
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = to_regclass(%s)
+                """,
+                [TABLE]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        return {int(match.group(1)) for match in map(TENANT_TABLE_RE.match, names) if match}
+
+    @staticmethod
+    def tenant_company_id(empresa: str) -> Optional[int]:
+        """
+        Retorna el company_id de la empresa si tiene partición propia, para acotar sus
+        consultas a esa partición. El registro se guarda en cache; si no está disponible
+        dentro del event loop se omite el acotamiento (el resultado es el mismo).
+        """
+        registry = cache.get(TENANT_PARTITIONS_CACHE_KEY)
+        if registry is None:
+            if _in_event_loop():
+                return None
+            registry = QualityDataPartitionService.refresh_tenant_registry()
+        return registry.get(empresa)
+
+    @staticmethod
+    def refresh_tenant_registry(using: str = DEFAULT_DB_ALIAS) -> Dict[str, int]:
+        """Recalcula el registro {nombre de empresa: company_id} de los tenants con partición"""
+        company_ids = QualityDataPartitionService.tenant_partition_company_ids(using)
+        registry = dict(
+            Company.objects.using(using).filter(id__in=company_ids).values_list('name', 'id')
+        ) if company_ids else {}
+        cache.set(TENANT_PARTITIONS_CACHE_KEY, registry, TENANT_PARTITIONS_CACHE_TIMEOUT)
+        return registry
+
+    @staticmethod
+    def enable_tenant_partitioning(using: str = DEFAULT_DB_ALIAS) -> bool:
+        """
+        Convierte la tabla particionada por mes en la partición DEFAULT de una nueva
+        tabla padre particionada por lista de ``company_id``. No copia datos: sólo
+        renombra y adjunta, por lo que el bloqueo es breve. Retorna False si ya estaba.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+            strategy = QualityDataPartitionService._partition_strategy(cursor, TABLE)
+            if strategy == 'l':
+                return False
+            if strategy != 'r':
+                raise ValueError('La tabla de datos de calidad debe estar particionada por mes (migración 0002)')
+
+            cursor.execute(
+                'SELECT indexname, indexdef FROM pg_indexes '
+                'WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s',
+                [TABLE, f'{TABLE}_pkey']
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [TABLE]
+            )
+            foreign_keys = cursor.fetchall()
+
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(SHARED_TABLE)}')
+            cursor.execute(
+                f'ALTER TABLE {quote(SHARED_TABLE)} RENAME CONSTRAINT {quote(TABLE + "_pkey")} '
+                f'TO {quote(SHARED_TABLE + "_pkey")}'
+            )
+            # Los nombres de los índices pasan a la tabla padre, que adopta los existentes
+            for name, _ in indexes:
+                cursor.execute(f'ALTER INDEX {quote(name)} RENAME TO {quote(name[:56] + "_shared")}')
+
+            # Una partición no puede tener identidad propia: la secuencia pasa a la tabla padre
+            cursor.execute(f'ALTER TABLE {quote(SHARED_TABLE)} ALTER COLUMN id DROP IDENTITY')
+            cursor.execute(
+                f'CREATE TABLE {quote(TABLE)} (LIKE {quote(SHARED_TABLE)} INCLUDING DEFAULTS '
+                f'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) '
+                f'PARTITION BY LIST ({quote(TENANT_KEY)})'
+            )
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+                f"FROM {quote(SHARED_TABLE)}",
+                [TABLE]
+            )
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(SHARED_TABLE)} DEFAULT')
+
+            for _, definition in indexes:
+                cursor.execute(definition.replace(' ON ONLY ', ' ON '))
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+
+        return True
+
+    @staticmethod
+    def move_tenant_to_partition(
+        company: Company,
+        batch_size: int = 5000,
+        lock_timeout: int = 10,
+        months_ahead: int = None,
+        using: str = DEFAULT_DB_ALIAS,
+        log: Callable[[str], None] = logger.info,
+    ) -> Dict[str, int]:
+        """
+        Crea la partición propia de una empresa y traslada sus registros sin detener el servicio.
+
+        1. Asigna ``company_id`` a los registros de la empresa que no lo tengan (por lotes).
+           Si alguno tiene el de otra empresa se detiene sin modificar nada: no se decide
+           aquí a qué empresa pertenece.
+        2. Crea la partición sin adjuntar, con sus particiones mensuales, y un trigger en
+           la tabla compartida que registra los cambios de la empresa.
+        3. Copia los registros por lotes y aplica los cambios registrados mientras tanto.
+        4. En una transacción breve (``lock_timeout`` segundos como máximo de espera) bloquea
+           las escrituras en la tabla padre, aplica los últimos cambios, borra los registros
+           de la tabla compartida y adjunta la partición.
+
+        Si el paso 4 no obtiene el bloqueo, volver a ejecutarlo retoma la copia ya hecha.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = QualityDataPartitionService.tenant_table(company.id)
+        changes_table = f'{table}_changes'
+        trigger = f'{table}_capture'
+        result = {'relinked': 0, 'copied': 0, 'changes_applied': 0, 'removed_from_shared': 0}
+
+        if QualityDataPartitionService.enable_tenant_partitioning(using):
+            log(f'🗂️ {TABLE} ahora se particiona por company_id; la tabla mensual es la partición DEFAULT')
+        if company.id in QualityDataPartitionService.tenant_partition_company_ids(using):
+            log(f'✅ {company.name} ya tiene partición propia ({table})')
+            return result
+
+        with connection.cursor() as cursor:
+            # 1. Los registros de la empresa se identifican por company_id en su partición
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {quote(TABLE)} WHERE empresa = %s '
+                f'AND {quote(TENANT_KEY)} IS NOT NULL AND {quote(TENANT_KEY)} <> %s',
+                [company.name, company.id]
+            )
+            conflicts = cursor.fetchone()[0]
+            if conflicts:
+                raise ValueError(
+                    f'{conflicts} registros de la empresa "{company.name}" tienen el company_id '
+                    f'de otra empresa; corríjalos antes de crear su partición'
+                )
+            while True:
+                with transaction.atomic(using=using):
+                    cursor.execute(
+                        f'UPDATE {quote(TABLE)} SET {quote(TENANT_KEY)} = %s WHERE id IN ('
+                        f'SELECT id FROM {quote(TABLE)} WHERE empresa = %s '
+                        f'AND {quote(TENANT_KEY)} IS NULL LIMIT %s)',
+                        [company.id, company.name, batch_size]
+                    )
+                    updated = cursor.rowcount
+                result['relinked'] += updated
+                if updated < batch_size:
+                    break
+
+            # 2. Partición sin adjuntar y captura de cambios
+            cursor.execute('SELECT obj_description(to_regclass(%s), %s)', [table, 'pg_class'])
+            row = cursor.fetchone()
+            resume = row is not None and row[0] == 'copied'
+            if resume:
+                log(f'↩️ Retomando el traslado: {table} ya contiene la copia inicial')
+            else:
+                with transaction.atomic(using=using):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {quote(trigger)} ON {quote(SHARED_TABLE)}')
+                    cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}, {quote(changes_table)}')
+                    QualityDataPartitionService._create_tenant_table(
+                        cursor, quote, company.id, table, months_ahead
+                    )
+                    cursor.execute(
+                        f'CREATE UNLOGGED TABLE {quote(changes_table)} (seq bigserial PRIMARY KEY, id bigint NOT NULL)'
+                    )
+                    cursor.execute(CAPTURE_FUNCTION_SQL)
+                    cursor.execute(
+                        f'CREATE TRIGGER {quote(trigger)} AFTER INSERT OR UPDATE OR DELETE ON {quote(SHARED_TABLE)} '
+                        f"FOR EACH ROW EXECUTE FUNCTION quality_data_tenant_move_capture('{company.id}', '{changes_table}')"
+                    )
+
+                # 3. Copia inicial por lotes, en orden de id. Las filas insertadas después de
+                # instalar el trigger llegan por la tabla de cambios
+                cursor.execute(
+                    f'SELECT COALESCE(MAX(id), 0) FROM {quote(SHARED_TABLE)} WHERE {quote(TENANT_KEY)} = %s',
+                    [company.id]
+                )
+                max_id = cursor.fetchone()[0]
+                last_id = 0
+                while True:
+                    with transaction.atomic(using=using):
+                        cursor.execute(
+                            f'INSERT INTO {quote(table)} SELECT * FROM {quote(SHARED_TABLE)} '
+                            f'WHERE {quote(TENANT_KEY)} = %s AND id > %s AND id <= %s '
+                            f'ORDER BY id LIMIT %s RETURNING id',
+                            [company.id, last_id, max_id, batch_size]
+                        )
+                        ids = [row[0] for row in cursor.fetchall()]
+                    if not ids:
+                        break
+                    last_id = max(ids)
+                    result['copied'] += len(ids)
+                    log(f'  📦 {result["copied"]} registros copiados')
+
+                QualityDataPartitionService._copy_parent_indexes(cursor, quote, table)
+                cursor.execute(f"COMMENT ON TABLE {quote(table)} IS 'copied'")
+
+            # Cambios ocurridos durante la copia; se repite mientras queden muchos
+            for _ in range(5):
+                with transaction.atomic(using=using):
+                    applied = QualityDataPartitionService._apply_tenant_changes(
+                        cursor, quote, company.id, table, changes_table
+                    )
+                result['changes_applied'] += applied
+                if applied <= batch_size:
+                    break
+
+            # 4. Cambio final
+            with transaction.atomic(using=using):
+                cursor.execute(f"SET LOCAL lock_timeout = '{int(lock_timeout)}s'")
+                # El bloqueo de la tabla padre (que alcanza a sus particiones) detiene también las
+                # escrituras a través de ella: al obtenerlo después del ATTACH ya ven la partición
+                # nueva, en lugar de insertar un duplicado o borrar en la compartida una fila copiada
+                cursor.execute(f'LOCK TABLE {quote(TABLE)} IN SHARE ROW EXCLUSIVE MODE')
+                result['changes_applied'] += QualityDataPartitionService._apply_tenant_changes(
+                    cursor, quote, company.id, table, changes_table
+                )
+                cursor.execute(f'DROP TRIGGER {quote(trigger)} ON {quote(SHARED_TABLE)}')
+                cursor.execute(
+                    f'DELETE FROM {quote(SHARED_TABLE)} WHERE {quote(TENANT_KEY)} = %s', [company.id]
+                )
+                result['removed_from_shared'] = cursor.rowcount
+                cursor.execute(f'COMMENT ON TABLE {quote(table)} IS NULL')
+                cursor.execute(
+                    f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(table)} FOR VALUES IN ({int(company.id)})'
+                )
+                cursor.execute(f'DROP TABLE {quote(changes_table)}')
+
+            cursor.execute(f'ANALYZE {quote(table)}')
+
+        QualityDataPartitionService.refresh_tenant_registry(using)
+        return result
+
+    @staticmethod
+    def _create_tenant_table(cursor, quote, company_id: int, table: str, months_ahead) -> None:
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE ({quote(PARTITION_KEY)})'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + "_pkey")} '
+            f'PRIMARY KEY (id, {quote(PARTITION_KEY)})'
+        )
+        # Con esta restricción ATTACH no necesita recorrer la partición para validarla
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + "_tenant_check")} '
+            f'CHECK ({quote(TENANT_KEY)} IS NOT NULL AND {quote(TENANT_KEY)} = {int(company_id)})'
+        )
+        cursor.execute(f'CREATE TABLE {quote(table + "_default")} PARTITION OF {quote(table)} DEFAULT')
+
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {quote(PARTITION_KEY)} AT TIME ZONE %s)::date "
+            f"FROM {quote(SHARED_TABLE)} WHERE {quote(TENANT_KEY)} = %s",
+            [settings.TIME_ZONE, company_id]
+        )
+        months = {row[0] for row in cursor.fetchall()}
+        months.update(QualityDataPartitionService.upcoming_months(months_ahead))
+        QualityDataPartitionService._create_month_partitions(cursor, quote, table, months)
+
+    @staticmethod
+    def _copy_parent_indexes(cursor, quote, table: str) -> None:
+        """
+        Crea en la partición los índices y llaves foráneas de la tabla padre antes de
+        adjuntarla, para que ATTACH los adopte en lugar de construirlos bajo bloqueo.
+        """
+        cursor.execute(
+            'SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s',
+            [TABLE]
+        )
+        for (definition,) in cursor.fetchall():
+            match = re.match(r'CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ (USING .+)$', definition)
+            cursor.execute(f'CREATE {match.group(1) or ""}INDEX ON {quote(table)} {match.group(2)}')
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE]
+        )
+        for name, definition in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}')
+
+    @staticmethod
+    def _apply_tenant_changes(cursor, quote, company_id: int, table: str, changes_table: str) -> int:
+        """Vuelve a copiar las filas modificadas desde la tabla compartida; retorna cuántas"""
+        # Sólo se consumen los cambios ya confirmados; los demás quedan para la siguiente pasada
+        cursor.execute(f'DELETE FROM {quote(changes_table)} RETURNING id')
+        ids = list({row[0] for row in cursor.fetchall()})
+        if ids:
+            cursor.execute(f'DELETE FROM {quote(table)} WHERE id = ANY(%s)', [ids])
+            cursor.execute(
+                f'INSERT INTO {quote(table)} SELECT * FROM {quote(SHARED_TABLE)} '
+                f'WHERE {quote(TENANT_KEY)} = %s AND id = ANY(%s)',
+                [company_id, ids]
+            )
+        return len(ids)
+
+    @staticmethod
+    def convert_to_partitioned(months_ahead: int = None, using: str = DEFAULT_DB_ALIAS) -> None:
+        """
+        Convierte la tabla existente en una tabla particionada por mes.
+
+        Crea una partición por cada mes con registros más las de los próximos meses,
+        copia los datos y recrea índices y llaves foráneas. La tabla queda bloqueada
+        durante la copia, por lo que en tablas grandes conviene una ventana de mantenimiento.
+        """
+        QualityDataPartitionService._rebuild_table(True, months_ahead, using)
+
+    @staticmethod
+    def convert_to_unpartitioned(using: str = DEFAULT_DB_ALIAS) -> None:
+        """Operación inversa de ``convert_to_partitioned``"""
+        QualityDataPartitionService._rebuild_table(False, None, using)
+
+    @staticmethod
+    def _rebuild_table(partitioned: bool, months_ahead, using: str) -> None:
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        old_table = f'{TABLE}_old'
+        primary_key = f'{TABLE}_pkey'
+
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+
+            cursor.execute(
+                'SELECT indexdef FROM pg_indexes '
+                'WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s',
+                [TABLE, primary_key]
+            )
+            index_definitions = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [TABLE]
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+            sequence = cursor.fetchone()[0]
+
+            # Liberar los nombres de la tabla, su llave primaria y su secuencia
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(old_table)}')
+            # Con particiones por tenant la tabla padre no tiene llave primaria
+            cursor.execute(
+                "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(%s) AND conname = %s",
+                [old_table, primary_key]
+            )
+            if cursor.fetchone():
+                cursor.execute(
+                    f'ALTER TABLE {quote(old_table)} RENAME CONSTRAINT {quote(primary_key)} '
+                    f'TO {quote(old_table + "_pkey")}'
+                )
+            if sequence:
+                cursor.execute(f'ALTER SEQUENCE {sequence} RENAME TO {quote(old_table + "_id_seq")}')
+
+            partition_clause = f' PARTITION BY RANGE ({quote(PARTITION_KEY)})' if partitioned else ''
+            cursor.execute(
+                f'CREATE TABLE {quote(TABLE)} (LIKE {quote(old_table)} INCLUDING DEFAULTS '
+                f'INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)'
+                f'{partition_clause}'
+            )
+            # En una tabla particionada la llave primaria debe incluir la llave de partición
+            key_columns = ['id', PARTITION_KEY] if partitioned else ['id']
+            cursor.execute(
+                f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(primary_key)} '
+                f'PRIMARY KEY ({", ".join(quote(column) for column in key_columns)})'
+            )
+
+            if partitioned:
+                cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT')
+                cursor.execute(
+                    f"SELECT DISTINCT date_trunc('month', {quote(PARTITION_KEY)} AT TIME ZONE %s)::date "
+                    f"FROM {quote(old_table)}",
+                    [settings.TIME_ZONE]
+                )
+                months = {row[0] for row in cursor.fetchall()}
+                months.update(QualityDataPartitionService.upcoming_months(months_ahead))
+                for month in sorted(months):
+                    start, end = QualityDataPartitionService.month_bounds(month)
+                    cursor.execute(
+                        f'CREATE TABLE {quote(QualityDataPartitionService.partition_name(month))} '
+                        f'PARTITION OF {quote(TABLE)} '
+                        f'FOR VALUES FROM ({_timestamp_literal(start)}) TO ({_timestamp_literal(end)})'
+                    )
+
+            cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(old_table)}')
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+                f"FROM {quote(TABLE)}",
+                [TABLE]
+            )
+            cursor.execute(f'DROP TABLE {quote(old_table)}')
+
+            # Los índices se crean después de copiar los datos; sobre la tabla padre
+            # PostgreSQL crea uno por partición
+            for definition in index_definitions:
+                cursor.execute(definition.replace(' ON ONLY ', ' ON '))
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+            cursor.execute(f'ANALYZE {quote(TABLE)}')
@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Respuestas de la API externa que indican un error transitorio y se reintentan
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+CIRCUIT_CACHE_KEY = 'external_api_circuit:{digest}:{field}'
+# Tiempo máximo que un proceso retiene el permiso de sondeo del circuito semiabierto
+# (si muere sin informar el resultado, otro proceso puede sondear después)
+CIRCUIT_PROBE_TIMEOUT = 60
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos indicados por una cabecera Retry-After (en segundos o como fecha HTTP)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None,
+                  base: float = None, maximum: float = None) -> Optional[float]:
+    """
+    Espera antes del reintento ``attempt`` (0 = primer reintento): backoff exponencial
+    con jitter (entre la mitad y el total de ``base * 2**attempt``, hasta ``maximum``),
+    para que los procesos que fallaron a la vez no reintenten juntos.
+
+    Un Retry-After del servidor se respeta como espera mínima; si supera ``maximum``
+    retorna None: no se reintenta en lugar de bloquear el proceso tanto tiempo.
+    """
+    base = base if base is not None else getattr(settings, 'EXTERNAL_QUALITY_API_BACKOFF_BASE', 0.5)
+    maximum = maximum if maximum is not None else getattr(settings, 'EXTERNAL_QUALITY_API_BACKOFF_MAX', 30)
+    backoff = base * 2 ** attempt
+    delay = min(backoff / 2 + random.uniform(0, backoff / 2), maximum)
+    if retry_after is not None:
+        if retry_after > maximum:
+            return None
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de la API externa con el estado en la cache de Django.
+
+    El estado sólo es común a workers y procesos si la cache es compartida (Redis,
+    ver check core.W004); con LocMem cada proceso tiene su propio circuito.
+
+    Tras ``failure_threshold`` fallos consecutivos el circuito se abre y las peticiones
+    fallan de inmediato durante ``reset_timeout`` segundos, en lugar de acumular
+    workers esperando timeouts. Pasado ese tiempo queda semiabierto: un único proceso
+    sondea la API; si responde el circuito se cierra y si falla vuelve a abrirse.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: int = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(settings, 'EXTERNAL_QUALITY_API_CIRCUIT_FAILURES', 5)
+        self.reset_timeout = reset_timeout or getattr(settings, 'EXTERNAL_QUALITY_API_CIRCUIT_RESET', 60)
+        digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+        self.failures_key = CIRCUIT_CACHE_KEY.format(digest=digest, field='failures')
+        self.open_key = CIRCUIT_CACHE_KEY.format(digest=digest, field='open')
+        # Presente desde que el circuito se abre hasta que una petición tiene éxito
+        self.tripped_key = CIRCUIT_CACHE_KEY.format(digest=digest, field='tripped')
+        self.probe_key = CIRCUIT_CACHE_KEY.format(digest=digest, field='probe')
+
+    def state(self) -> str:
+        values = cache.get_many([self.open_key, self.tripped_key])
+        if self.open_key in values:
+            return CIRCUIT_OPEN
+        if self.tripped_key in values:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_CLOSED
+
+    def allow_request(self) -> bool:
+        """False si la petición debe fallar de inmediato"""
+        state = self.state()
+        if state == CIRCUIT_OPEN:
+            return False
+        if state == CIRCUIT_HALF_OPEN:
+            # Sólo el proceso que obtiene el permiso sondea la API
+            return cache.add(self.probe_key, True, CIRCUIT_PROBE_TIMEOUT)
+        return True
+
+    def record_success(self) -> None:
+        if self.state() != CIRCUIT_CLOSED:
+            logger.info('Circuito de la API externa cerrado', extra={'circuit': self.name})
+        cache.delete_many([self.failures_key, self.open_key, self.tripped_key, self.probe_key])
+
+    def record_failure(self) -> None:
+        # Los fallos aislados caducan: sólo cuentan los ocurridos en reset_timeout segundos
+        cache.add(self.failures_key, 0, self.reset_timeout)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+            cache.set(self.failures_key, failures, self.reset_timeout)
+
+        if failures >= self.failure_threshold or cache.get(self.tripped_key) is not None:
+            cache.set(self.open_key, True, self.reset_timeout)
+            cache.set(self.tripped_key, True, None)
+            cache.delete_many([self.failures_key, self.probe_key])
+            logger.warning('Circuito de la API externa abierto', extra={
+                'circuit': self.name,
+                'failures': failures,
+                'reset_seconds': self.reset_timeout,
+            })
+
+    # Variantes para el event loop: la cache de Django es síncrona
+    async def aallow_request(self) -> bool:
+        return await sync_to_async(self.allow_request)()
+
+    async def arecord_success(self) -> None:
+        await sync_to_async(self.record_success)()
+
+    async def arecord_failure(self) -> None:
+        await sync_to_async(self.record_failure)()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import QualityData
+from apps.core.fast_serializers import FastValuesSerializer
+from .models import QualityData, QualityDataArchive
 
 
 class QualityDataSerializer(serializers.ModelSerializer):
@@ -29,6 +30,11 @@ class QualityDataSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = QualityData
+        # Columnas y relaciones que leen los campos calculados (optimizador de querysets)
+        source_fields = (
+            'empresa', 'company__name', 'calidad_general', 'aprobado', 'processed_data',
+            'created_by__first_name', 'created_by__last_name',
+        )
         fields = [
             'id', 'empresa', 'empresa_display', 'fecha_registro',
             'temperatura', 'humedad', 'ph',
@@ -158,6 +164,7 @@ class QualityDataListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = QualityData
+        source_fields = ('empresa', 'company__name', 'calidad_general', 'aprobado', 'processed_data')
         fields = [
             'id', 'empresa', 'empresa_display', 'fecha_registro',
             'temperatura', 'humedad', 'ph',
@@ -243,6 +250,66 @@ class QualityDataListSerializer(serializers.ModelSerializer):
         return None
 
 
+# Campos de QualityDataListSerializer que se leen de processed_data['additional_info']
+LIST_ADDITIONAL_INFO_FIELDS = {
+    'total_exportable': 'total_exportable',
+    'variedad': 'variedad',
+    'destino': 'destino',
+    'contenedor': 'n_fcl',
+    'evaluador': 'evaluador',
+    'fecha_mp': 'fecha_mp',
+    'fecha_proceso': 'fecha_proceso',
+    'productor': 'productor',
+    'tipo_producto': 'tipo_producto',
+    'fundo': 'fundo',
+    'hora': 'hora',
+    'presentacion': 'presentacion',
+}
+
+CALIDAD_CHOICES = dict(QualityData._meta.get_field('calidad_general').choices)
+
+
+def _additional_info_getter(key):
+    def get(row, additional_info):
+        return additional_info.get(key) if additional_info is not None else None
+    return get
+
+
+def _empresa_display(row, additional_info):
+    # Equivalente a QualityData.empresa_display
+    if row['empresa']:
+        return row['empresa']
+    return row['company__name'] if row['company_id'] is not None else "Sin empresa"
+
+
+class FastQualityDataListSerializer(FastValuesSerializer):
+    """
+    Versión compilada de ``QualityDataListSerializer`` para listados y exportaciones.
+
+    Produce la misma salida leyendo filas de ``values()`` y accediendo a
+    ``processed_data['additional_info']`` una sola vez por fila.
+    """
+    serializer_class = QualityDataListSerializer
+    computed_sources = (
+        'empresa', 'calidad_general', 'aprobado', 'company_id', 'company__name', 'processed_data',
+    )
+    computed_fields = {
+        'empresa_display': _empresa_display,
+        'calidad_display': lambda row, additional_info: CALIDAD_CHOICES.get(
+            row['calidad_general'], row['calidad_general']
+        ),
+        'aprobado_display': lambda row, additional_info: "Sí" if row['aprobado'] else "No",
+        **{name: _additional_info_getter(key) for name, key in LIST_ADDITIONAL_INFO_FIELDS.items()},
+    }
+
+    @staticmethod
+    def prepare(row):
+        processed_data = row['processed_data']
+        if processed_data and 'additional_info' in processed_data:
+            return processed_data['additional_info']
+        return None
+
+
 class QualityDataFilterSerializer(serializers.Serializer):
     """
     Serializer para filtros de datos de calidad
@@ -272,3 +339,30 @@ class QualityDataStatsSerializer(serializers.Serializer):
     promedio_ph = serializers.DecimalField(max_digits=4, decimal_places=2, allow_null=True)
     calidad_breakdown = serializers.DictField()
     empresas_count = serializers.IntegerField()
+
+
+class QualityDataArchiveSerializer(serializers.ModelSerializer):
+    """
+    Serializer para los manifiestos de archivos históricos (sólo lectura)
+    """
+
+    class Meta:
+        model = QualityDataArchive
+        fields = [
+            'id', 'empresa', 'before', 'record_count', 'deleted_count', 'size_bytes',
+            'sha256', 'fecha_desde', 'fecha_hasta', 'created_at', 'purged_at'
+        ]
+        read_only_fields = fields
+
+
+class QualityDataArchiveQuerySerializer(serializers.Serializer):
+    """
+    Serializer para los parámetros de consulta de registros archivados
+    """
+    archive = serializers.IntegerField(required=False, help_text="Id del archivo")
+    fecha_desde = serializers.DateTimeField(required=False, help_text="Fecha desde")
+    fecha_hasta = serializers.DateTimeField(required=False, help_text="Fecha hasta")
+    page = serializers.IntegerField(required=False, min_value=1, default=1, help_text="Página")
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=1000, default=100, help_text="Registros por página"
+    )
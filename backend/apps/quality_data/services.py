@@ -1,15 +1,26 @@
+import logging
 import requests
 import json
+import hashlib
 import aiohttp
 import asyncio
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from django.conf import settings
 from django.core.cache import cache
-from .models import QualityData
-from django.db.models import Avg, Count
+from django.db import transaction
+from django.utils import timezone
+from apps.authentication.models import Company
+from .models import QualityData, SyncRun
+from .partitions import QualityDataPartitionService
+from .resilience import RETRYABLE_STATUSES, CircuitBreaker, backoff_delay, parse_retry_after
+from .sync_metrics import SyncMetrics, timed_phase
+from django.db.models import Avg, Count, Max, Q
 from asgiref.sync import sync_to_async
 
+logger = logging.getLogger(__name__)
+
 
 class ExternalQualityAPIService:
     """
@@ -38,8 +49,20 @@ class ExternalQualityAPIService:
         self.login_url = f"{self.base_url}/api/v1/auth/login"
         self.data_url = f"{self.base_url}/api/v1/data/calidad-producto-terminado"
         
-        print(f"🔗 Servicio API externa inicializado para: {self.base_url}")
+        # Tiempos y volúmenes de la sincronización en curso (se reinician en cada una)
+        self.metrics = SyncMetrics()
+        
+        # Reintentos de las consultas de datos y circuit breaker compartido (a través de la
+        # cache) por todos los procesos que llaman a la misma API
+        self.max_retries = getattr(settings, 'EXTERNAL_QUALITY_API_MAX_RETRIES', 3)
+        self.circuit = CircuitBreaker(self.base_url)
+        # Causa del último error y si se debe a que la API no está disponible
+        self.last_error = None
+        self.upstream_unavailable = False
+        
+        logger.debug('Servicio API externa inicializado', extra={'base_url': self.base_url})
     
+    @timed_phase('login')
     def login(self) -> bool:
         """
         Inicia sesión y obtiene un token JWT
@@ -57,7 +80,7 @@ class ExternalQualityAPIService:
                 "Content-Type": "application/json"
             }
             
-            print(f"🔐 Intentando login con usuario: {self.username}")
+            logger.debug('Login en la API externa', extra={'username': self.username})
             
             response = requests.post(
                 self.login_url,
@@ -71,22 +94,30 @@ class ExternalQualityAPIService:
                 self.token = token_data["access_token"]
                 self.token_expiry = datetime.now().timestamp() + (30 * 60)  # 30 minutos
                 
-                print("✅ Login exitoso - Token generado")
+                logger.info('Login exitoso en la API externa')
                 return True
             else:
-                print(f"❌ Error en login: {response.status_code} - {response.text}")
+                logger.error('Error en login', extra={'status': response.status_code, 'body': response.text[:500]})
+                if response.status_code in RETRYABLE_STATUSES:
+                    self.upstream_unavailable = True
+                    self.circuit.record_failure()
                 return False
                 
         except requests.exceptions.ConnectionError:
-            print(f"❌ Error de conexión: No se puede conectar a {self.base_url}")
+            logger.error('Error de conexión en login', extra={'base_url': self.base_url})
+            self.upstream_unavailable = True
+            self.circuit.record_failure()
             return False
         except requests.exceptions.Timeout:
-            print("❌ Error de timeout: La API no respondió en tiempo")
+            logger.error('Timeout en login', extra={'base_url': self.base_url})
+            self.upstream_unavailable = True
+            self.circuit.record_failure()
             return False
         except Exception as e:
-            print(f"❌ Error inesperado en login: {str(e)}")
+            logger.exception('Error inesperado en login')
             return False
     
+    @timed_phase('login')
     async def login_async(self) -> bool:
         """
         Versión async del login
@@ -104,7 +135,7 @@ class ExternalQualityAPIService:
                 "Content-Type": "application/json"
             }
             
-            print(f"🔐 Intentando login async con usuario: {self.username}")
+            logger.debug('Login async en la API externa', extra={'username': self.username})
             
             async with aiohttp.ClientSession() as session:
                 async with session.post(
@@ -118,20 +149,27 @@ class ExternalQualityAPIService:
                         self.token = token_data["access_token"]
                         self.token_expiry = datetime.now().timestamp() + (30 * 60)  # 30 minutos
                         
-                        print("✅ Login async exitoso - Token generado")
+                        logger.info('Login async exitoso en la API externa')
                         return True
                     else:
-                        print(f"❌ Error en login async: {response.status} - {await response.text()}")
+                        logger.error('Error en login async', extra={'status': response.status, 'body': (await response.text())[:500]})
+                        if response.status in RETRYABLE_STATUSES:
+                            self.upstream_unavailable = True
+                            await self.circuit.arecord_failure()
                         return False
                 
         except aiohttp.ClientConnectionError:
-            print(f"❌ Error de conexión async: No se puede conectar a {self.base_url}")
+            logger.error('Error de conexión en login async', extra={'base_url': self.base_url})
+            self.upstream_unavailable = True
+            await self.circuit.arecord_failure()
             return False
         except asyncio.TimeoutError:
-            print("❌ Error de timeout async: La API no respondió en tiempo")
+            logger.error('Timeout en login async', extra={'base_url': self.base_url})
+            self.upstream_unavailable = True
+            await self.circuit.arecord_failure()
             return False
         except Exception as e:
-            print(f"❌ Error inesperado en login async: {str(e)}")
+            logger.exception('Error inesperado en login async')
             return False
     
     def _is_token_valid(self) -> bool:
@@ -146,7 +184,7 @@ class ExternalQualityAPIService:
         
         # Verificar si el token ha expirado (con margen de 1 minuto)
         if self.token_expiry and datetime.now().timestamp() > (self.token_expiry - 60):
-            print("🔄 Token expirado o próximo a expirar")
+            logger.debug('Token expirado o próximo a expirar')
             return False
         
         return True
@@ -159,7 +197,7 @@ class ExternalQualityAPIService:
             bool: True si hay un token válido, False en caso contrario
         """
         if not self._is_token_valid():
-            print("🔄 Renovando token...")
+            logger.debug('Renovando token')
             return self.login()
         return True
     
@@ -171,85 +209,142 @@ class ExternalQualityAPIService:
             bool: True si hay un token válido, False en caso contrario
         """
         if not self._is_token_valid():
-            print("🔄 Renovando token async...")
+            logger.debug('Renovando token (async)')
             return await self.login_async()
         return True
     
+    def _page_payload(self, empresa: str, limit: Optional[int], offset: int) -> Dict[str, Any]:
+        """Cuerpo de la petición de datos de calidad de una empresa"""
+        # Preparar filtros: algunos datasets usan PRODUCTOR en lugar de EMPRESA
+        data = {
+            "filters": {"EMPRESA": empresa, "PRODUCTOR": empresa}
+        }
+        
+        if limit is not None:
+            # Enviar ambos estilos de paginación por compatibilidad
+            data["limit"] = limit
+            data["page_size"] = limit
+            # Calcular número de página a partir del offset en caso de que el API externo use page/page_size
+            data["page"] = (offset // max(limit, 1)) + 1 if offset > 0 else 1
+        if offset > 0:
+            data["offset"] = offset
+        return data
+    
+    def _fail_fast(self, empresa: str) -> None:
+        """Registra que una petición no se hizo porque el circuito está abierto"""
+        self.last_error = 'API externa no disponible (circuito abierto)'
+        self.upstream_unavailable = True
+        logger.warning('Circuito abierto: no se llama a la API externa', extra={'empresa': empresa})
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Espera antes de repetir la petición fallida en el intento ``attempt`` (desde 0),
+        o None si no se debe reintentar (reintentos agotados o circuito abierto)
+        """
+        if attempt >= self.max_retries or not self.circuit.allow_request():
+            return None
+        return backoff_delay(attempt, retry_after)
+    
     def get_quality_data_by_company(self, empresa: str, limit: Optional[int] = None, offset: int = 0) -> Optional[List[Dict[str, Any]]]:
         """
         Obtiene datos de calidad filtrados por empresa
         
+        La consulta es idempotente: los errores transitorios (conexión, timeout, 429 y 5xx)
+        se reintentan hasta ``max_retries`` veces con backoff exponencial y un 401 renueva
+        el token antes de reintentar. Con el circuito abierto falla sin llamar a la API.
+        
         Args:
             empresa: Nombre de la empresa a filtrar
             limit: Número máximo de registros a obtener (None = sin límite)
             offset: Número de registros a saltar
             
         Returns:
-            Lista de registros filtrados por empresa o None si hay error
+            Lista de registros filtrados por empresa o None si hay error (ver ``last_error``)
         """
+        self.last_error = None
+        self.upstream_unavailable = False
+        if not self.circuit.allow_request():
+            self._fail_fast(empresa)
+            return None
         if not self._ensure_valid_token():
-            print("❌ No se pudo obtener un token válido")
+            logger.error('No se pudo obtener un token válido')
+            self.last_error = 'No se pudo obtener un token válido'
             return None
         
+        data = self._page_payload(empresa, limit, offset)
+        logger.debug('Solicitando datos de calidad', extra={'empresa': empresa, 'params': data})
+        
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.token}"
-            }
-            
-            # Preparar filtros: algunos datasets usan PRODUCTOR en lugar de EMPRESA
-            filters = {"EMPRESA": empresa, "PRODUCTOR": empresa}
-            
-            data = {
-                "filters": filters
-            }
-            
-            if limit is not None:
-                # Enviar ambos estilos de paginación por compatibilidad
-                data["limit"] = limit
-                data["page_size"] = limit
-                # Calcular número de página a partir del offset en caso de que el API externo use page/page_size
-                page_number = (offset // max(limit, 1)) + 1 if offset > 0 else 1
-                data["page"] = page_number
-            if offset > 0:
-                data["offset"] = offset
-            
-            print(f"🔍 Obteniendo datos de calidad para empresa: {empresa}")
-            print(f"📊 Parámetros: {data}")
-            
-            response = requests.post(
-                self.data_url,
-                json=data,
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Datos de calidad obtenidos exitosamente: {len(result)} registros para {empresa}")
-                return result
-            elif response.status_code == 401:
-                print("🔄 Token expirado, intentando renovar...")
-                if self.login():
-                    # Reintentar la petición con el nuevo token
-                    return self.get_quality_data_by_company(empresa, limit, offset)
+            for attempt in range(self.max_retries + 1):
+                headers = {
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.token}"
+                }
+                retry_after = None
+                token_renewed = False
+                request_started = time.perf_counter()
+                try:
+                    response = requests.post(
+                        self.data_url,
+                        json=data,
+                        headers=headers,
+                        timeout=30
+                    )
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    timed_out = isinstance(e, requests.exceptions.Timeout)
+                    self.last_error = 'Timeout de la API externa' if timed_out else 'Error de conexión con la API externa'
+                    self.upstream_unavailable = True
+                    logger.warning(self.last_error, extra={'empresa': empresa, 'attempt': attempt + 1})
+                    self.circuit.record_failure()
                 else:
-                    print("❌ No se pudo renovar el token")
-                    return None
-            else:
-                print(f"❌ Error obteniendo datos de calidad: {response.status_code} - {response.text}")
-                return None
+                    self.metrics.record_request(time.perf_counter() - request_started, len(response.content))
+                    
+                    if response.status_code == 200:
+                        self.circuit.record_success()
+                        result = response.json()
+                        logger.debug('Datos de calidad obtenidos', extra={'empresa': empresa, 'records': len(result)})
+                        return result
+                    elif response.status_code == 401:
+                        # La API responde: el rechazo del token no cuenta como fallo del circuito
+                        self.circuit.record_success()
+                        logger.info('Token rechazado (401), renovando', extra={'empresa': empresa})
+                        if not self.login():
+                            logger.error('No se pudo renovar el token', extra={'empresa': empresa})
+                            self.last_error = 'No se pudo renovar el token de la API externa'
+                            return None
+                        self.last_error = 'La API externa rechazó el token renovado (401)'
+                        token_renewed = True
+                    elif response.status_code in RETRYABLE_STATUSES:
+                        self.last_error = f'La API externa respondió {response.status_code}'
+                        self.upstream_unavailable = True
+                        logger.warning('Error transitorio de la API externa', extra={'empresa': empresa, 'status': response.status_code, 'attempt': attempt + 1})
+                        self.circuit.record_failure()
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    else:
+                        self.circuit.record_success()
+                        logger.error('Error obteniendo datos de calidad', extra={'empresa': empresa, 'status': response.status_code, 'body': response.text[:500]})
+                        self.last_error = f'La API externa respondió {response.status_code}'
+                        return None
                 
-        except requests.exceptions.ConnectionError:
-            print("❌ Error de conexión")
-            return None
-        except requests.exceptions.Timeout:
-            print("❌ Error de timeout")
-            return None
+                if token_renewed:
+                    # Con el token nuevo se reintenta sin esperar
+                    delay = 0.0 if attempt < self.max_retries else None
+                else:
+                    delay = self._retry_delay(attempt, retry_after)
+                if delay is None:
+                    break
+                self.metrics.record_retry(delay)
+                logger.info('Reintentando petición a la API externa', extra={'empresa': empresa, 'attempt': attempt + 2, 'delay_seconds': round(delay, 2)})
+                time.sleep(delay)
         except Exception as e:
-            print(f"❌ Error inesperado: {str(e)}")
+            logger.exception('Error inesperado obteniendo datos de calidad', extra={'empresa': empresa})
+            self.last_error = f'Error inesperado obteniendo datos de calidad: {e}'
             return None
+        
+        logger.error('Se agotaron los reintentos con la API externa', extra={'empresa': empresa, 'offset': offset, 'error': self.last_error})
+        return None
     
+    @timed_phase('fetch')
     def get_all_quality_data_by_company(self, empresa: str, page_size: int = 100, max_pages: int = 100) -> Optional[List[Dict[str, Any]]]:
         """
         Obtiene todos los datos de calidad para una empresa, manejando paginación mediante limit/offset.
@@ -260,7 +355,7 @@ class ExternalQualityAPIService:
             max_pages: Límite de seguridad de páginas para evitar loops infinitos
         
         Returns:
-            Lista completa de registros o None si hay error
+            Lista completa de registros o None si falla alguna página (ver ``last_error``)
         """
         all_results: List[Dict[str, Any]] = []
         seen_ids = set()
@@ -270,32 +365,27 @@ class ExternalQualityAPIService:
         while True:
             pages_fetched += 1
             if pages_fetched > max_pages:
-                print(f"⚠️ Se alcanzó el máximo de páginas ({max_pages}). Deteniendo la paginación para {empresa}.")
+                logger.warning('Se alcanzó el máximo de páginas', extra={'empresa': empresa, 'max_pages': max_pages})
                 break
             
             offset = (page_index - 1) * page_size
-            print(f"➡️ Solicitando página {page_index} (page_size={page_size}, offset={offset}) para {empresa}")
+            logger.debug('Solicitando página', extra={'empresa': empresa, 'page': page_index, 'page_size': page_size, 'offset': offset})
             batch = self.get_quality_data_by_company(empresa, limit=page_size, offset=offset)
             if batch is None:
-                print("⚠️ Error durante la obtención paginada; retornando resultados parciales")
-                return all_results if all_results else None
+                # Una sincronización parcial no se distingue de una completa: se descarta
+                logger.error('Error durante la obtención paginada; se descartan los registros obtenidos', extra={'empresa': empresa, 'page': page_index, 'records': len(all_results), 'error': self.last_error})
+                return None
             
+            self.metrics.pages += 1
             if not batch:
                 # No hay más registros
                 break
             
-            # De-duplicar por 'record_id' o 'id' si existen
-            new_items = []
-            for item in batch:
-                candidate_id = item.get('record_id') or item.get('id') or item.get('processed_data', {}).get('record_id')
-                key = candidate_id or json.dumps(item, sort_keys=True)
-                if key not in seen_ids:
-                    seen_ids.add(key)
-                    new_items.append(item)
+            new_items = self._collect_new_items(batch, seen_ids)
             
             if not new_items:
                 # La página no trajo elementos nuevos; evitar loop infinito
-                print("⚠️ Página sin elementos nuevos; posible repetición por parámetros no reconocidos. Deteniendo.")
+                logger.warning('Página sin elementos nuevos; se detiene la paginación', extra={'empresa': empresa, 'page': page_index})
                 break
             
             all_results.extend(new_items)
@@ -306,12 +396,31 @@ class ExternalQualityAPIService:
             
             page_index += 1
         
-        print(f"📦 Total registros obtenidos para {empresa}: {len(all_results)}")
+        logger.info('Registros obtenidos de la API externa', extra={'empresa': empresa, 'records': len(all_results), 'pages': pages_fetched})
         return all_results
     
+    @staticmethod
+    def _collect_new_items(batch: List[Dict[str, Any]], seen_ids: set) -> List[Dict[str, Any]]:
+        """De-duplica un lote por 'record_id' o 'id' (si existen) contra los ya vistos"""
+        new_items = []
+        for item in batch:
+            candidate_id = item.get('record_id') or item.get('id') or item.get('processed_data', {}).get('record_id')
+            key = candidate_id or json.dumps(item, sort_keys=True)
+            if key not in seen_ids:
+                seen_ids.add(key)
+                new_items.append(item)
+        return new_items
+    
+    async def _aretry_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Versión async de ``_retry_delay``"""
+        if attempt >= self.max_retries or not await self.circuit.aallow_request():
+            return None
+        return backoff_delay(attempt, retry_after)
+    
     async def get_quality_data_by_company_async(self, empresa: str, limit: Optional[int] = None, offset: int = 0) -> Optional[List[Dict[str, Any]]]:
         """
-        Versión async para obtener datos de calidad filtrados por empresa
+        Versión async para obtener datos de calidad filtrados por empresa, con los mismos
+        reintentos y circuit breaker que ``get_quality_data_by_company``
         
         Args:
             empresa: Nombre de la empresa a filtrar
@@ -319,65 +428,132 @@ class ExternalQualityAPIService:
             offset: Número de registros a saltar
             
         Returns:
-            Lista de registros filtrados por empresa o None si hay error
+            Lista de registros filtrados por empresa o None si hay error (ver ``last_error``)
         """
+        self.last_error = None
+        self.upstream_unavailable = False
+        if not await self.circuit.aallow_request():
+            self._fail_fast(empresa)
+            return None
         if not await self._ensure_valid_token_async():
-            print("❌ No se pudo obtener un token válido (async)")
+            logger.error('No se pudo obtener un token válido (async)')
+            self.last_error = 'No se pudo obtener un token válido'
             return None
         
+        data = self._page_payload(empresa, limit, offset)
+        logger.debug('Solicitando datos de calidad (async)', extra={'empresa': empresa, 'params': data})
+        
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.token}"
-            }
+            async with aiohttp.ClientSession() as session:
+                for attempt in range(self.max_retries + 1):
+                    headers = {
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {self.token}"
+                    }
+                    retry_after = None
+                    token_renewed = False
+                    request_started = time.perf_counter()
+                    try:
+                        async with session.post(
+                            self.data_url,
+                            json=data,
+                            headers=headers,
+                            timeout=aiohttp.ClientTimeout(total=30)
+                        ) as response:
+                            # El cuerpo queda en memoria y response.json() lo reutiliza
+                            body = await response.read()
+                            self.metrics.record_request(time.perf_counter() - request_started, len(body))
+                            if response.status == 200:
+                                await self.circuit.arecord_success()
+                                result = await response.json()
+                                logger.debug('Datos de calidad obtenidos (async)', extra={'empresa': empresa, 'records': len(result)})
+                                return result
+                            elif response.status == 401:
+                                await self.circuit.arecord_success()
+                                logger.info('Token rechazado (401), renovando (async)', extra={'empresa': empresa})
+                                if not await self.login_async():
+                                    logger.error('No se pudo renovar el token (async)', extra={'empresa': empresa})
+                                    self.last_error = 'No se pudo renovar el token de la API externa'
+                                    return None
+                                self.last_error = 'La API externa rechazó el token renovado (401)'
+                                token_renewed = True
+                            elif response.status in RETRYABLE_STATUSES:
+                                self.last_error = f'La API externa respondió {response.status}'
+                                self.upstream_unavailable = True
+                                logger.warning('Error transitorio de la API externa (async)', extra={'empresa': empresa, 'status': response.status, 'attempt': attempt + 1})
+                                await self.circuit.arecord_failure()
+                                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            else:
+                                await self.circuit.arecord_success()
+                                logger.error('Error obteniendo datos de calidad (async)', extra={'empresa': empresa, 'status': response.status, 'body': (await response.text())[:500]})
+                                self.last_error = f'La API externa respondió {response.status}'
+                                return None
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                        timed_out = isinstance(e, asyncio.TimeoutError)
+                        self.last_error = 'Timeout de la API externa' if timed_out else 'Error de conexión con la API externa'
+                        self.upstream_unavailable = True
+                        logger.warning(f'{self.last_error} (async)', extra={'empresa': empresa, 'attempt': attempt + 1})
+                        await self.circuit.arecord_failure()
+                    
+                    if token_renewed:
+                        delay = 0.0 if attempt < self.max_retries else None
+                    else:
+                        delay = await self._aretry_delay(attempt, retry_after)
+                    if delay is None:
+                        break
+                    self.metrics.record_retry(delay)
+                    logger.info('Reintentando petición a la API externa (async)', extra={'empresa': empresa, 'attempt': attempt + 2, 'delay_seconds': round(delay, 2)})
+                    await asyncio.sleep(delay)
+        except Exception as e:
+            logger.exception('Error inesperado obteniendo datos de calidad (async)', extra={'empresa': empresa})
+            self.last_error = f'Error inesperado obteniendo datos de calidad: {e}'
+            return None
+        
+        logger.error('Se agotaron los reintentos con la API externa (async)', extra={'empresa': empresa, 'offset': offset, 'error': self.last_error})
+        return None
+    
+    @timed_phase('fetch')
+    async def get_all_quality_data_by_company_async(self, empresa: str, page_size: int = 100, max_pages: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """
+        Versión async de ``get_all_quality_data_by_company``: pagina mediante limit/offset
+        sin bloquear el event loop.
+        """
+        all_results: List[Dict[str, Any]] = []
+        seen_ids = set()
+        page_index: int = 1
+        pages_fetched: int = 0
+        
+        while True:
+            pages_fetched += 1
+            if pages_fetched > max_pages:
+                logger.warning('Se alcanzó el máximo de páginas (async)', extra={'empresa': empresa, 'max_pages': max_pages})
+                break
             
-            # Preparar filtros: algunos datasets usan PRODUCTOR en lugar de EMPRESA
-            filters = {"EMPRESA": empresa, "PRODUCTOR": empresa}
+            offset = (page_index - 1) * page_size
+            logger.debug('Solicitando página (async)', extra={'empresa': empresa, 'page': page_index, 'page_size': page_size, 'offset': offset})
+            batch = await self.get_quality_data_by_company_async(empresa, limit=page_size, offset=offset)
+            if batch is None:
+                logger.error('Error durante la obtención paginada (async); se descartan los registros obtenidos', extra={'empresa': empresa, 'page': page_index, 'records': len(all_results), 'error': self.last_error})
+                return None
             
-            data = {
-                "filters": filters
-            }
+            self.metrics.pages += 1
+            if not batch:
+                break
             
-            if limit is not None:
-                data["limit"] = limit
-            if offset > 0:
-                data["offset"] = offset
+            new_items = self._collect_new_items(batch, seen_ids)
+            if not new_items:
+                logger.warning('Página sin elementos nuevos; se detiene la paginación', extra={'empresa': empresa, 'page': page_index})
+                break
             
-            print(f"🔍 Obteniendo datos de calidad async para empresa: {empresa}")
-            print(f"📊 Parámetros: {data}")
+            all_results.extend(new_items)
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.data_url,
-                    json=data,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"✅ Datos de calidad obtenidos exitosamente (async): {len(result)} registros para {empresa}")
-                        return result
-                    elif response.status == 401:
-                        print("🔄 Token expirado, intentando renovar (async)...")
-                        if await self.login_async():
-                            # Reintentar la petición con el nuevo token
-                            return await self.get_quality_data_by_company_async(empresa, limit, offset)
-                        else:
-                            print("❌ No se pudo renovar el token (async)")
-                            return None
-                    else:
-                        print(f"❌ Error obteniendo datos de calidad (async): {response.status} - {await response.text()}")
-                        return None
-                
-        except aiohttp.ClientConnectionError:
-            print("❌ Error de conexión (async)")
-            return None
-        except asyncio.TimeoutError:
-            print("❌ Error de timeout (async)")
-            return None
-        except Exception as e:
-            print(f"❌ Error inesperado (async): {str(e)}")
-            return None
+            if len(batch) < page_size:
+                break
+            
+            page_index += 1
+        
+        logger.info('Registros obtenidos de la API externa (async)', extra={'empresa': empresa, 'records': len(all_results), 'pages': pages_fetched})
+        return all_results
     
     def sync_quality_data_for_company(self, empresa: str, user=None) -> Dict[str, Any]:
         """
@@ -388,22 +564,25 @@ class ExternalQualityAPIService:
             user: Usuario que realiza la sincronización
             
         Returns:
-            Diccionario con el resultado de la sincronización
+            Diccionario con el resultado de la sincronización, sus métricas (``metrics``)
+            y el id del registro de historial (``sync_run_id``)
         """
-        print(f"🔄 Iniciando sincronización de datos para: {empresa}")
+        logger.info('Iniciando sincronización', extra={'empresa': empresa})
+        self.metrics = SyncMetrics()
+        started_at = timezone.now()
         
         # Obtener datos de la API externa
         # Obtener TODOS los datos usando paginación por si el API externo aplica un límite por defecto
         external_data = self.get_all_quality_data_by_company(empresa)
         
         if not external_data:
-            return {
-                'success': False,
-                'message': 'No se pudieron obtener datos de la API externa',
-                'records_processed': 0,
-                'records_created': 0,
-                'records_updated': 0
-            }
+            result = self._fetch_failure_result('No se pudieron obtener datos de la API externa')
+            self._record_sync_run(empresa, user, result, started_at, SyncRun.MODE_SYNC)
+            return result
+        
+        # Los registros nuevos suelen caer en el mes actual: asegurar su partición
+        with self.metrics.phase('partitions'):
+            QualityDataPartitionService.ensure_future_partitions_periodically()
         
         records_created = 0
         records_updated = 0
@@ -411,53 +590,56 @@ class ExternalQualityAPIService:
         for data_item in external_data:
             try:
                 # Procesar y mapear los datos
-                processed_data = self._process_external_data(data_item)
-                
-                # Intentar identificar de forma única por record_id del sistema externo
-                record_id = processed_data.get('processed_data', {}).get('additional_info', {}).get('record_id')
-                quality_data = None
-                created = False
-                if record_id:
-                    quality_data = QualityData.objects.filter(
-                        empresa=empresa,
-                        processed_data__additional_info__record_id=record_id
-                    ).first()
-                
-                if quality_data is None:
-                    # Fallback a combinación empresa + fecha_registro
-                    quality_data, created = QualityData.objects.get_or_create(
-                        empresa=empresa,
-                        fecha_registro=processed_data['fecha_registro'],
-                        defaults={
-                            **processed_data,
-                            'created_by': user,
-                            'processed_data': processed_data['processed_data']
-                        }
-                    )
-                else:
-                    # Ya existe por record_id
-                    for field, value in processed_data.items():
-                        if field != 'processed_data':
-                            setattr(quality_data, field, value)
-                    quality_data.processed_data = processed_data['processed_data']
-                    quality_data.save()
-                    records_updated += 1
-                    continue
+                with self.metrics.phase('transform'):
+                    processed_data = self._process_external_data(data_item)
+                self.metrics.rows_transformed += 1
                 
-                if created:
-                    records_created += 1
-                else:
-                    for field, value in processed_data.items():
-                        if field != 'processed_data':
-                            setattr(quality_data, field, value)
-                    quality_data.processed_data = processed_data['processed_data']
-                    quality_data.save()
-                    records_updated += 1
+                with self.metrics.phase('write'):
+                    # Intentar identificar de forma única por record_id del sistema externo
+                    record_id = processed_data.get('processed_data', {}).get('additional_info', {}).get('record_id')
+                    quality_data = None
+                    created = False
+                    if record_id:
+                        quality_data = QualityData.objects.for_empresa(empresa).filter(
+                            processed_data__additional_info__record_id=record_id
+                        ).first()
+                    
+                    if quality_data is None:
+                        # Fallback a combinación empresa + fecha_registro
+                        quality_data, created = QualityData.objects.get_or_create(
+                            empresa=empresa,
+                            fecha_registro=processed_data['fecha_registro'],
+                            defaults={
+                                **processed_data,
+                                'created_by': user,
+                                'processed_data': processed_data['processed_data']
+                            }
+                        )
+                    else:
+                        # Ya existe por record_id
+                        for field, value in processed_data.items():
+                            if field != 'processed_data':
+                                setattr(quality_data, field, value)
+                        quality_data.processed_data = processed_data['processed_data']
+                        quality_data.save()
+                        records_updated += 1
+                        continue
+                    
+                    if created:
+                        records_created += 1
+                    else:
+                        for field, value in processed_data.items():
+                            if field != 'processed_data':
+                                setattr(quality_data, field, value)
+                        quality_data.processed_data = processed_data['processed_data']
+                        quality_data.save()
+                        records_updated += 1
                     
             except Exception as e:
-                print(f"❌ Error procesando registro: {str(e)}")
+                logger.exception('Error procesando registro', extra={'empresa': empresa})
                 continue
         
+        self.metrics.rows_written = records_created + records_updated
         result = {
             'success': True,
             'message': f'Sincronización completada para {empresa}',
@@ -465,8 +647,16 @@ class ExternalQualityAPIService:
             'records_created': records_created,
             'records_updated': records_updated
         }
+        self._record_sync_run(empresa, user, result, started_at, SyncRun.MODE_SYNC)
         
-        print(f"✅ Sincronización completada: {result}")
+        logger.info('Sincronización completada', extra={
+            'empresa': empresa,
+            'records_processed': result['records_processed'],
+            'records_created': records_created,
+            'records_updated': records_updated,
+            'duration_seconds': result['metrics']['duration_seconds'],
+            'phases': result['metrics']['phases'],
+        })
         return result
     
     async def sync_quality_data_for_company_async(self, empresa: str, user=None) -> Dict[str, Any]:
@@ -478,58 +668,69 @@ class ExternalQualityAPIService:
             user: Usuario que realiza la sincronización
             
         Returns:
-            Diccionario con el resultado de la sincronización
+            Diccionario con el resultado de la sincronización, sus métricas (``metrics``)
+            y el id del registro de historial (``sync_run_id``)
         """
-        print(f"🔄 Iniciando sincronización async de datos para: {empresa}")
+        logger.info('Iniciando sincronización (async)', extra={'empresa': empresa})
+        self.metrics = SyncMetrics()
+        started_at = timezone.now()
         
-        # Obtener datos de la API externa de forma async
-        # Obtener TODOS los datos usando paginación (se reutiliza la versión síncrona paginada por compatibilidad)
-        external_data = self.get_all_quality_data_by_company(empresa)
+        # Obtener TODOS los datos usando la paginación async (aiohttp)
+        external_data = await self.get_all_quality_data_by_company_async(empresa)
         
         if not external_data:
-            return {
-                'success': False,
-                'message': 'No se pudieron obtener datos de la API externa (async)',
-                'records_processed': 0,
-                'records_created': 0,
-                'records_updated': 0
-            }
+            result = self._fetch_failure_result('No se pudieron obtener datos de la API externa (async)')
+            await sync_to_async(self._record_sync_run)(empresa, user, result, started_at, SyncRun.MODE_ASYNC)
+            return result
+        
+        with self.metrics.phase('partitions'):
+            await sync_to_async(QualityDataPartitionService.ensure_future_partitions_periodically)()
         
         records_created = 0
         records_updated = 0
         
-        # Procesar registros de forma async
+        # Procesar registros con el ORM async, identificándolos igual que la versión síncrona
         for data_item in external_data:
             try:
-                # Procesar y mapear los datos
-                processed_data = self._process_external_data(data_item)
+                with self.metrics.phase('transform'):
+                    processed_data = self._process_external_data(data_item)
+                self.metrics.rows_transformed += 1
                 
-                # Buscar registro existente o crear uno nuevo de forma async
-                quality_data, created = await sync_to_async(QualityData.objects.get_or_create)(
-                    empresa=empresa,
-                    fecha_registro=processed_data['fecha_registro'],
-                    defaults={
-                        **processed_data,
-                        'created_by': user,
-                        'processed_data': processed_data['processed_data']  # Usar la estructura correcta
-                    }
-                )
-                
-                if created:
-                    records_created += 1
-                else:
-                    # Actualizar registro existente de forma async
-                    for field, value in processed_data.items():
-                        if field != 'processed_data':  # No actualizar processed_data aquí
-                            setattr(quality_data, field, value)
-                    quality_data.processed_data = processed_data['processed_data']  # Usar la estructura correcta
-                    await sync_to_async(quality_data.save)()
-                    records_updated += 1
+                with self.metrics.phase('write'):
+                    record_id = processed_data.get('processed_data', {}).get('additional_info', {}).get('record_id')
+                    quality_data = None
+                    created = False
+                    if record_id:
+                        quality_data = await QualityData.objects.for_empresa(empresa).filter(
+                            processed_data__additional_info__record_id=record_id
+                        ).afirst()
+                    
+                    if quality_data is None:
+                        quality_data, created = await QualityData.objects.aget_or_create(
+                            empresa=empresa,
+                            fecha_registro=processed_data['fecha_registro'],
+                            defaults={
+                                **processed_data,
+                                'created_by': user,
+                                'processed_data': processed_data['processed_data']
+                            }
+                        )
+                    
+                    if created:
+                        records_created += 1
+                    else:
+                        for field, value in processed_data.items():
+                            if field != 'processed_data':
+                                setattr(quality_data, field, value)
+                        quality_data.processed_data = processed_data['processed_data']
+                        await quality_data.asave()
+                        records_updated += 1
                     
             except Exception as e:
-                print(f"❌ Error procesando registro (async): {str(e)}")
+                logger.exception('Error procesando registro (async)', extra={'empresa': empresa})
                 continue
         
+        self.metrics.rows_written = records_created + records_updated
         result = {
             'success': True,
             'message': f'Sincronización async completada para {empresa}',
@@ -537,10 +738,65 @@ class ExternalQualityAPIService:
             'records_created': records_created,
             'records_updated': records_updated
         }
+        await sync_to_async(self._record_sync_run)(empresa, user, result, started_at, SyncRun.MODE_ASYNC)
         
-        print(f"✅ Sincronización async completada: {result}")
+        logger.info('Sincronización completada (async)', extra={
+            'empresa': empresa,
+            'records_processed': result['records_processed'],
+            'records_created': records_created,
+            'records_updated': records_updated,
+            'duration_seconds': result['metrics']['duration_seconds'],
+            'phases': result['metrics']['phases'],
+        })
         return result
     
+    def _fetch_failure_result(self, message: str) -> Dict[str, Any]:
+        """
+        Resultado de una sincronización que no obtuvo datos; ``upstream_unavailable``
+        indica que la API externa no respondió (errores transitorios o circuito abierto)
+        """
+        if self.last_error:
+            message = f'{message}: {self.last_error}'
+        return {
+            'success': False,
+            'message': message,
+            'records_processed': 0,
+            'records_created': 0,
+            'records_updated': 0,
+            'upstream_unavailable': self.upstream_unavailable,
+        }
+    
+    def _record_sync_run(self, empresa: str, user, result: Dict[str, Any], started_at: datetime, mode: str) -> None:
+        """
+        Agrega las métricas de la sincronización a ``result`` y las guarda en el
+        historial (``SyncRun``). Un error al guardar el historial no invalida la
+        sincronización.
+        """
+        summary = self.metrics.summary()
+        result['metrics'] = summary
+        result['sync_run_id'] = None
+        try:
+            run = SyncRun.objects.create(
+                empresa=empresa,
+                company=Company.objects.filter(name=empresa).first(),
+                triggered_by=user if getattr(user, 'pk', None) else None,
+                mode=mode,
+                success=result['success'],
+                message=result['message'],
+                records_processed=result['records_processed'],
+                records_created=result['records_created'],
+                records_updated=result['records_updated'],
+                pages=summary['pages'],
+                bytes_received=summary['bytes_received'],
+                retries=summary['retries'],
+                duration_seconds=summary['duration_seconds'],
+                metrics=summary,
+                started_at=started_at,
+            )
+            result['sync_run_id'] = run.pk
+        except Exception:
+            logger.exception('No se pudo guardar el historial de sincronización', extra={'empresa': empresa})
+    
     def _process_external_data(self, data_item: Dict[str, Any]) -> Dict[str, Any]:
         """
         Procesa y mapea los datos de la API externa al modelo QualityData
@@ -699,11 +955,57 @@ class ExternalQualityAPIService:
             return None
 
 
+COMPANY_QUALITY_COUNTS_CACHE_KEY = 'quality_counts:{digest}'
+
+
 class QualityDataService:
     """
     Servicio para gestionar datos de calidad en el sistema
     """
     
+    @staticmethod
+    def _company_quality_counts_key(empresa: str) -> str:
+        digest = hashlib.md5(empresa.encode('utf-8')).hexdigest()
+        return COMPANY_QUALITY_COUNTS_CACHE_KEY.format(digest=digest)
+    
+    @staticmethod
+    def get_company_quality_counts(empresa: str) -> Dict[str, Any]:
+        """
+        Obtiene los conteos de datos de calidad de una empresa en una sola consulta agregada
+        
+        Args:
+            empresa: Nombre de la empresa
+            
+        Returns:
+            Diccionario con conteos (en cache hasta la próxima escritura de la empresa)
+        """
+        key = QualityDataService._company_quality_counts_key(empresa)
+        counts = cache.get(key)
+        if counts is not None:
+            return counts
+        
+        aggregates = QualityData.objects.for_empresa(empresa).aggregate(
+            total_registros=Count('id'),
+            registros_aprobados=Count('id', filter=Q(aprobado=True)),
+            ultimo_registro=Max('fecha_registro'),
+        )
+        counts = {
+            'total_registros': aggregates['total_registros'],
+            'registros_aprobados': aggregates['registros_aprobados'],
+            'registros_rechazados': aggregates['total_registros'] - aggregates['registros_aprobados'],
+            'ultimo_registro': aggregates['ultimo_registro'],
+        }
+        cache.set(key, counts, getattr(settings, 'COMPANY_STATS_CACHE_TIMEOUT', 300))
+        return counts
+    
+    @staticmethod
+    def invalidate_company_quality_counts(empresa: str) -> None:
+        """Invalida los conteos en cache de una empresa al confirmar la transacción"""
+        if not empresa:
+            return
+        key = QualityDataService._company_quality_counts_key(empresa)
+        transaction.on_commit(lambda: cache.delete(key))
+    
     @staticmethod
     def get_quality_data_for_user_company(user) -> List[QualityData]:
         """
@@ -718,7 +1020,7 @@ class QualityDataService:
         if not user or not user.company:
             return QualityData.objects.none()
         
-        return QualityData.objects.filter(empresa=user.company.name).order_by('-fecha_registro')
+        return QualityData.objects.for_empresa(user.company.name).order_by('-fecha_registro')
     
     @staticmethod
     def get_quality_stats(user=None, empresa=None) -> Dict[str, Any]:
@@ -732,40 +1034,82 @@ class QualityDataService:
         Returns:
             Diccionario con estadísticas
         """
-        queryset = QualityData.objects.all()
+        if not empresa and user and user.company:
+            empresa = user.company.name
+        queryset = QualityDataService._quality_stats_queryset(empresa)
         
-        # Filtrar por empresa del usuario si no se especifica otra
-        if empresa:
-            queryset = queryset.filter(empresa=empresa)
-        elif user and user.company:
-            queryset = queryset.filter(empresa=user.company.name)
+        aggregates = queryset.aggregate(**QualityDataService._quality_stats_aggregates())
         
-        total_registros = queryset.count()
-        registros_aprobados = queryset.filter(aprobado=True).count()
-        registros_rechazados = total_registros - registros_aprobados
+        # Breakdown por calidad
+        calidad_breakdown = dict(QualityDataService._calidad_breakdown(queryset))
         
-        # Calcular promedios
-        promedio_temperatura = queryset.aggregate(Avg('temperatura'))['temperatura__avg']
-        promedio_humedad = queryset.aggregate(Avg('humedad'))['humedad__avg']
-        promedio_ph = queryset.aggregate(Avg('ph'))['ph__avg']
+        # Contar empresas únicas
+        empresas_count = queryset.values('empresa').distinct().count()
         
-        # Breakdown por calidad
-        calidad_breakdown = dict(
+        return QualityDataService._build_quality_stats(aggregates, calidad_breakdown, empresas_count)
+    
+    @staticmethod
+    async def aget_quality_stats(user=None, empresa=None) -> Dict[str, Any]:
+        """
+        Versión async de ``get_quality_stats`` con el ORM async
+        
+        Args:
+            user: Usuario autenticado
+            empresa: Empresa específica (opcional)
+            
+        Returns:
+            Diccionario con estadísticas
+        """
+        if not empresa and user:
+            empresa = await sync_to_async(
+                lambda: user.company.name if user.company else None
+            )()
+        queryset = QualityDataService._quality_stats_queryset(empresa)
+        
+        aggregates = await queryset.aaggregate(**QualityDataService._quality_stats_aggregates())
+        calidad_breakdown = {
+            calidad: count
+            async for calidad, count in QualityDataService._calidad_breakdown(queryset)
+        }
+        empresas_count = await queryset.values('empresa').distinct().acount()
+        
+        return QualityDataService._build_quality_stats(aggregates, calidad_breakdown, empresas_count)
+    
+    @staticmethod
+    def _quality_stats_queryset(empresa=None):
+        queryset = QualityData.objects.all()
+        if empresa:
+            queryset = queryset.for_empresa(empresa)
+        return queryset
+    
+    @staticmethod
+    def _quality_stats_aggregates() -> Dict[str, Any]:
+        """Conteos y promedios de las estadísticas, calculados en una sola consulta"""
+        return {
+            'total_registros': Count('id'),
+            'registros_aprobados': Count('id', filter=Q(aprobado=True)),
+            'promedio_temperatura': Avg('temperatura'),
+            'promedio_humedad': Avg('humedad'),
+            'promedio_ph': Avg('ph'),
+        }
+    
+    @staticmethod
+    def _calidad_breakdown(queryset):
+        return (
             queryset.values('calidad_general')
             .annotate(count=Count('calidad_general'))
             .values_list('calidad_general', 'count')
         )
-        
-        # Contar empresas únicas
-        empresas_count = queryset.values('empresa').distinct().count()
-        
+    
+    @staticmethod
+    def _build_quality_stats(aggregates, calidad_breakdown, empresas_count) -> Dict[str, Any]:
         return {
-            'total_registros': total_registros,
-            'registros_aprobados': registros_aprobados,
-            'registros_rechazados': registros_rechazados,
-            'promedio_temperatura': promedio_temperatura,
-            'promedio_humedad': promedio_humedad,
-            'promedio_ph': promedio_ph,
+            'total_registros': aggregates['total_registros'],
+            'registros_aprobados': aggregates['registros_aprobados'],
+            'registros_rechazados': aggregates['total_registros'] - aggregates['registros_aprobados'],
+            'promedio_temperatura': aggregates['promedio_temperatura'],
+            'promedio_humedad': aggregates['promedio_humedad'],
+            'promedio_ph': aggregates['promedio_ph'],
             'calidad_breakdown': calidad_breakdown,
             'empresas_count': empresas_count
         }
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import QualityData
+from .services import QualityDataService
+
+
+@receiver(post_save, sender=QualityData)
+@receiver(post_delete, sender=QualityData)
+def invalidate_company_quality_counts(sender, instance, **kwargs):
+    """Invalida los conteos en cache de la empresa del registro modificado"""
+    QualityDataService.invalidate_company_quality_counts(instance.empresa)
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+# Fases de una sincronización, en el orden en que se reportan
+SYNC_PHASES = ('login', 'fetch', 'partitions', 'transform', 'write')
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class SyncMetrics:
+    """
+    Tiempos y volúmenes de una sincronización con la API externa.
+
+    Los tiempos por fase son exclusivos: al entrar en una fase anidada (por ejemplo
+    un login para renovar el token en medio de la paginación) el reloj de la fase
+    externa se detiene, de modo que la suma de las fases no cuenta nada dos veces.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = dict.fromkeys(SYNC_PHASES, 0.0)
+        self.pages = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.retry_wait = 0.0
+        self.request_latencies: List[float] = []
+        self.rows_transformed = 0
+        self.rows_written = 0
+        self._active: List[List[Any]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        now = time.perf_counter()
+        if self._active:
+            outer = self._active[-1]
+            self.phases[outer[0]] += now - outer[1]
+        entry = [name, now]
+        self._active.append(entry)
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases[name] = self.phases.get(name, 0.0) + now - entry[1]
+            self._active.pop()
+            if self._active:
+                self._active[-1][1] = now
+
+    def record_request(self, seconds: float, size: int) -> None:
+        """Registra una petición HTTP de datos (latencia y bytes del cuerpo)"""
+        self.request_latencies.append(seconds)
+        self.bytes_received += size
+
+    def record_retry(self, delay: float) -> None:
+        """Registra un reintento de petición y la espera previa (backoff o Retry-After)"""
+        self.retries += 1
+        self.retry_wait += delay
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.request_latencies)
+        transform = self.phases['transform']
+        write = self.phases['write']
+        return {
+            'duration_seconds': round(time.perf_counter() - self.started, 3),
+            'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            'pages': self.pages,
+            'http_requests': len(latencies),
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'retry_wait_seconds': round(self.retry_wait, 3),
+            'http_latency_ms': {
+                'p50': round(_percentile(latencies, 50) * 1000, 1),
+                'p95': round(_percentile(latencies, 95) * 1000, 1),
+                'p99': round(_percentile(latencies, 99) * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            },
+            'rows_transformed': self.rows_transformed,
+            'rows_written': self.rows_written,
+            'transform_rows_per_second': round(self.rows_transformed / transform, 1) if transform else 0.0,
+            'write_rows_per_second': round(self.rows_written / write, 1) if write else 0.0,
+        }
+
+
+def timed_phase(name: str):
+    """
+    Decorador para métodos de ``ExternalQualityAPIService`` (síncronos o async):
+    mide su ejecución como la fase ``name`` de ``self.metrics``.
+    """
+    def decorator(method):
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.metrics.phase(name):
+                    return await method(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,8 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'quality_data'
 
+# Bajo ASGI se sirven las variantes async de las vistas que esperan I/O
+if getattr(settings, 'QUALITY_DATA_ASYNC_VIEWS', False):
+    stats_view = views.quality_data_stats_async
+    dashboard_view = views.quality_data_dashboard_async
+    sync_view = views.sync_external_quality_data_async
+else:
+    stats_view = views.quality_data_stats
+    dashboard_view = views.quality_data_dashboard
+    sync_view = views.sync_external_quality_data
+
 urlpatterns = [
     # Vistas principales
     path('quality-data/', views.QualityDataListCreateView.as_view(), name='quality-data-list'),
@@ -12,12 +23,16 @@ urlpatterns = [
     path('quality-data/filter/', views.QualityDataFilterView.as_view(), name='quality-data-filter'),
     
     # Vistas de estadísticas y dashboard
-    path('quality-data/stats/', views.quality_data_stats, name='quality-data-stats'),
-    path('quality-data/dashboard/', views.quality_data_dashboard, name='quality-data-dashboard'),
+    path('quality-data/stats/', stats_view, name='quality-data-stats'),
+    path('quality-data/dashboard/', dashboard_view, name='quality-data-dashboard'),
     
     # Vistas de sincronización
-    path('quality-data/sync/', views.sync_external_quality_data, name='quality-data-sync'),
+    path('quality-data/sync/', sync_view, name='quality-data-sync'),
     
     # Vistas de exportación
     path('quality-data/export/', views.quality_data_export, name='quality-data-export'),
+
+    # Vistas de datos archivados (sólo lectura)
+    path('quality-data/archive/', views.quality_data_archives, name='quality-data-archive'),
+    path('quality-data/archive/records/', views.quality_data_archive_records, name='quality-data-archive-records'),
 ]
@@ -1,26 +1,37 @@
-from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import generics, serializers, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 import asyncio
+import logging
 from asgiref.sync import sync_to_async
 from django.db import transaction
 
-from .models import QualityData
+from apps.authentication.authentication import ClaimsJWTAuthentication
+from apps.core.async_views import async_api_view
+from apps.core.fast_serializers import FastListMixin
+from apps.core.optimization import OptimizedQuerysetMixin
+from .archive import ARCHIVE_DATETIME_FIELDS, QualityDataArchiveService
+from .models import QualityData, QualityDataArchive
 from .serializers import (
-    QualityDataSerializer, QualityDataListSerializer, 
-    QualityDataFilterSerializer, QualityDataStatsSerializer
+    QualityDataSerializer, QualityDataListSerializer, FastQualityDataListSerializer,
+    QualityDataFilterSerializer, QualityDataStatsSerializer,
+    QualityDataArchiveSerializer, QualityDataArchiveQuerySerializer
 )
 from .services import ExternalQualityAPIService, QualityDataService
 
+logger = logging.getLogger(__name__)
 
-class QualityDataListCreateView(generics.ListCreateAPIView):
+
+class QualityDataListCreateView(FastListMixin, OptimizedQuerysetMixin, generics.ListCreateAPIView):
     """
     Vista para listar y crear datos de calidad
     """
+    fast_serializer_class = FastQualityDataListSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]  # Cambiado de AllowAny a IsAuthenticated
     
     def get_serializer_class(self):
@@ -37,12 +48,12 @@ class QualityDataListCreateView(generics.ListCreateAPIView):
         # Filtrar por empresa del usuario logueado
         if self.request.user.is_authenticated and self.request.user.company:
             user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
-            print(f"🔍 Filtrando por empresa del usuario: {user_company}")
+            queryset = queryset.for_empresa(user_company)
+            logger.debug('Filtrando por empresa del usuario', extra={'empresa': user_company})
         else:
             # Si el usuario no tiene empresa asignada, no mostrar datos
             queryset = QualityData.objects.none()
-            print("⚠️ Usuario sin empresa asignada - no se muestran datos")
+            logger.info('Usuario sin empresa asignada; no se muestran datos', extra={'user_id': self.request.user.id})
         
         # Aplicar filtros adicionales
         empresa = self.request.query_params.get('empresa')
@@ -92,10 +103,11 @@ class QualityDataListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
-class QualityDataDetailView(generics.RetrieveUpdateDestroyAPIView):
+class QualityDataDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vista para ver, actualizar y eliminar datos de calidad específicos
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]  # Cambiado de AllowAny a IsAuthenticated
     serializer_class = QualityDataSerializer
     
@@ -108,7 +120,7 @@ class QualityDataDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Filtrar por empresa del usuario logueado
         if self.request.user.is_authenticated and self.request.user.company:
             user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
+            queryset = queryset.for_empresa(user_company)
         else:
             # Si el usuario no tiene empresa asignada, no mostrar datos
             queryset = QualityData.objects.none()
@@ -116,10 +128,12 @@ class QualityDataDetailView(generics.RetrieveUpdateDestroyAPIView):
         return queryset
 
 
-class QualityDataFilterView(generics.ListAPIView):
+class QualityDataFilterView(FastListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     """
     Vista para filtrar datos de calidad con parámetros avanzados
     """
+    fast_serializer_class = FastQualityDataListSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]  # Cambiado de AllowAny a IsAuthenticated
     serializer_class = QualityDataListSerializer
     
@@ -132,7 +146,7 @@ class QualityDataFilterView(generics.ListAPIView):
         # Filtrar por empresa del usuario logueado
         if self.request.user.is_authenticated and self.request.user.company:
             user_company = self.request.user.company.name
-            queryset = queryset.filter(empresa=user_company)
+            queryset = queryset.for_empresa(user_company)
         else:
             # Si el usuario no tiene empresa asignada, no mostrar datos
             queryset = QualityData.objects.none()
@@ -161,6 +175,7 @@ class QualityDataFilterView(generics.ListAPIView):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_stats(request):
     """
@@ -205,12 +220,15 @@ def sync_external_quality_data(request):
                 'message': result['message'],
                 'records_processed': result['records_processed'],
                 'records_created': result['records_created'],
-                'records_updated': result['records_updated']
+                'records_updated': result['records_updated'],
+                'sync_run_id': result['sync_run_id'],
+                'metrics': result['metrics']
             })
         else:
+            # 503 si la API externa no está disponible: el cliente puede reintentar más tarde
             return Response(
-                {'error': result['message']},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': result['message'], 'sync_run_id': result['sync_run_id'], 'metrics': result['metrics']},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE if result.get('upstream_unavailable') else status.HTTP_500_INTERNAL_SERVER_ERROR
             )
             
     except Exception as e:
@@ -221,6 +239,7 @@ def sync_external_quality_data(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_dashboard(request):
     """
@@ -237,9 +256,11 @@ def quality_data_dashboard(request):
     # Obtener datos recientes de forma síncrona filtrados por empresa
     recent_data = QualityData.objects.all()
     if user_company:
-        recent_data = recent_data.filter(empresa=user_company)
-    recent_data = recent_data.order_by('-fecha_registro')[:10]
-    recent_data_serializer = QualityDataListSerializer(recent_data, many=True)
+        recent_data = recent_data.for_empresa(user_company)
+    recent_data = recent_data.order_by('-fecha_registro')
+    recent_data_serializer = FastQualityDataListSerializer(
+        FastQualityDataListSerializer.values(recent_data)[:10]
+    )
     
     # Obtener datos por período (últimos 30 días) de forma síncrona
     thirty_days_ago = timezone.now() - timedelta(days=30)
@@ -247,7 +268,7 @@ def quality_data_dashboard(request):
         fecha_registro__gte=thirty_days_ago
     )
     if user_company:
-        monthly_data = monthly_data.filter(empresa=user_company)
+        monthly_data = monthly_data.for_empresa(user_company)
     monthly_data = monthly_data.order_by('-fecha_registro')
     
     monthly_stats = QualityDataService.get_quality_stats(user=request.user, empresa=user_company)
@@ -261,6 +282,7 @@ def quality_data_dashboard(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])  # Cambiado de AllowAny a IsAuthenticated
 def quality_data_export(request):
     """
@@ -274,7 +296,7 @@ def quality_data_export(request):
     # Obtener queryset filtrado por empresa del usuario
     queryset = QualityData.objects.all()
     if user_company:
-        queryset = queryset.filter(empresa=user_company)
+        queryset = queryset.for_empresa(user_company)
     else:
         # Si el usuario no tiene empresa asignada, no mostrar datos
         queryset = QualityData.objects.none()
@@ -301,10 +323,182 @@ def quality_data_export(request):
             pass
     
     # Serializar datos de forma síncrona
-    serializer = QualityDataListSerializer(queryset, many=True)
+    serializer = FastQualityDataListSerializer(queryset)
     
     return Response({
         'data': serializer.data,
         'total_records': queryset.count(),
         'export_date': timezone.now().isoformat()
     })
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def quality_data_archives(request):
+    """
+    Lista los archivos históricos de datos de calidad de la empresa del usuario
+    """
+    user_company = _user_company_name(request.user)
+    if not user_company:
+        return Response({'archives': [], 'total_records': 0})
+
+    archives = QualityDataArchive.objects.filter(empresa=user_company, purged_at__isnull=False)
+    serializer = QualityDataArchiveSerializer(archives, many=True)
+    return Response({
+        'archives': serializer.data,
+        'total_records': sum(archive['record_count'] for archive in serializer.data)
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def quality_data_archive_records(request):
+    """
+    Consulta paginada (sólo lectura) de los registros archivados de la empresa del usuario.
+    Los archivos se recorren en orden cronológico y sólo se abren los que se solapan
+    con el rango de fechas pedido.
+    """
+    params = QualityDataArchiveQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    filters = params.validated_data
+    page, page_size = filters['page'], filters['page_size']
+
+    user_company = _user_company_name(request.user)
+    archives = QualityDataArchive.objects.none()
+    if user_company:
+        # Los registros de archivos aún no depurados siguen en la tabla principal
+        archives = QualityDataArchive.objects.filter(
+            empresa=user_company, purged_at__isnull=False
+        ).order_by('fecha_desde', 'id')
+    if 'archive' in filters:
+        archives = archives.filter(id=filters['archive'])
+    if 'fecha_desde' in filters:
+        archives = archives.filter(fecha_hasta__gte=filters['fecha_desde'])
+    if 'fecha_hasta' in filters:
+        archives = archives.filter(fecha_desde__lte=filters['fecha_hasta'])
+
+    # Las fechas se presentan como en la API de registros vigentes (zona horaria del proyecto)
+    datetime_field = serializers.DateTimeField()
+
+    # Se lee un registro más de la página para saber si hay otra
+    skip = (page - 1) * page_size
+    results = []
+    for archive in archives:
+        for record in QualityDataArchiveService.read_records(
+            archive, filters.get('fecha_desde'), filters.get('fecha_hasta')
+        ):
+            if skip:
+                skip -= 1
+                continue
+            for name in ARCHIVE_DATETIME_FIELDS:
+                record[name] = datetime_field.to_representation(record[name])
+            results.append(record)
+            if len(results) > page_size:
+                break
+        if len(results) > page_size:
+            break
+
+    return Response({
+        'results': results[:page_size],
+        'page': page,
+        'page_size': page_size,
+        'has_next': len(results) > page_size
+    })
+
+
+# Variantes async para despliegues ASGI (se enrutan con QUALITY_DATA_ASYNC_VIEWS)
+
+def _user_company_name(user):
+    """Nombre de la empresa del usuario o None (puede consultar la base de datos)"""
+    if user.is_authenticated and user.company:
+        return user.company.name
+    return None
+
+
+@async_api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+async def quality_data_stats_async(request):
+    """
+    Versión async de ``quality_data_stats``
+    """
+    user_company = await sync_to_async(_user_company_name)(request.user)
+    stats = await QualityDataService.aget_quality_stats(user=request.user, empresa=user_company)
+    
+    serializer = QualityDataStatsSerializer(stats)
+    return Response(serializer.data)
+
+
+@async_api_view(['POST'])
+@permission_classes([IsAuthenticated])
+async def sync_external_quality_data_async(request):
+    """
+    Versión async de ``sync_external_quality_data``: las llamadas a la API externa usan
+    aiohttp y no ocupan un worker mientras esperan respuesta
+    """
+    user_company = await sync_to_async(_user_company_name)(request.user)
+    if not user_company:
+        return Response(
+            {'error': 'Usuario debe estar autenticado y tener empresa asignada'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        external_service = ExternalQualityAPIService()
+        result = await external_service.sync_quality_data_for_company_async(user_company, request.user)
+        
+        if result['success']:
+            return Response({
+                'message': result['message'],
+                'records_processed': result['records_processed'],
+                'records_created': result['records_created'],
+                'records_updated': result['records_updated'],
+                'sync_run_id': result['sync_run_id'],
+                'metrics': result['metrics']
+            })
+        else:
+            return Response(
+                {'error': result['message'], 'sync_run_id': result['sync_run_id'], 'metrics': result['metrics']},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE if result.get('upstream_unavailable') else status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            
+    except Exception as e:
+        return Response(
+            {'error': f'Error durante la sincronización: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
+@permission_classes([IsAuthenticated])
+async def quality_data_dashboard_async(request):
+    """
+    Versión async de ``quality_data_dashboard``
+    """
+    user_company = await sync_to_async(_user_company_name)(request.user)
+    
+    stats = await QualityDataService.aget_quality_stats(user=request.user, empresa=user_company)
+    
+    recent_data = QualityData.objects.all()
+    if user_company:
+        recent_data = recent_data.for_empresa(user_company)
+    recent_rows = [
+        row async for row in
+        FastQualityDataListSerializer.values(recent_data.order_by('-fecha_registro'))[:10]
+    ]
+    
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+    monthly_data = QualityData.objects.filter(fecha_registro__gte=thirty_days_ago)
+    if user_company:
+        monthly_data = monthly_data.for_empresa(user_company)
+    
+    return Response({
+        'stats': stats,
+        'recent_data': FastQualityDataListSerializer(recent_rows).data,
+        # Mismos filtros que stats: la versión síncrona las calcula dos veces
+        'monthly_stats': stats,
+        'monthly_data_count': await monthly_data.acount()
+    })
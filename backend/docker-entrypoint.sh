@@ -30,6 +30,9 @@ wait_for_db() {
 run_migrations() {
     echo "🔄 Ejecutando migraciones..."
     python manage.py migrate --noinput
+
+    echo "🗂️ Verificando particiones de datos de calidad..."
+    python manage.py quality_data_partitions
 }
 
 # Función para recolectar archivos estáticos
@@ -99,14 +102,45 @@ create_superuser
 health_check
 
 echo "✅ Inicialización completada"
-echo "🌐 Iniciando servidor Gunicorn..."
 
-# Iniciar Gunicorn
-exec gunicorn agro_backend.wsgi:application \
+# Interfaz del servidor: asgi (Gunicorn con workers Uvicorn) o wsgi (workers síncronos)
+SERVER_INTERFACE="${SERVER_INTERFACE:-asgi}"
+GUNICORN_WORKERS="${GUNICORN_WORKERS:-3}"
+
+# Las métricas de /metrics se suman entre workers a través de este directorio;
+# se vacía en cada arranque para no acumular las de ejecuciones anteriores
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+if [ "$SERVER_INTERFACE" = "wsgi" ]; then
+    echo "🌐 Iniciando servidor Gunicorn (WSGI)..."
+
+    exec gunicorn agro_backend.wsgi:application \
+        --config gunicorn.conf.py \
+        --bind 0.0.0.0:8000 \
+        --workers "$GUNICORN_WORKERS" \
+        --worker-class sync \
+        --worker-connections 1000 \
+        --max-requests 1000 \
+        --max-requests-jitter 100 \
+        --timeout 30 \
+        --keep-alive 2 \
+        --access-logfile - \
+        --error-logfile - \
+        --log-level info
+fi
+
+echo "🌐 Iniciando servidor Gunicorn con workers Uvicorn (ASGI)..."
+
+# Las vistas de sincronización, dashboard y estadísticas se sirven en su versión async
+export QUALITY_DATA_ASYNC_VIEWS="${QUALITY_DATA_ASYNC_VIEWS:-True}"
+
+exec gunicorn agro_backend.asgi:application \
+    --config gunicorn.conf.py \
     --bind 0.0.0.0:8000 \
-    --workers 3 \
-    --worker-class sync \
-    --worker-connections 1000 \
+    --workers "$GUNICORN_WORKERS" \
+    --worker-class uvicorn_worker.UvicornWorker \
     --max-requests 1000 \
     --max-requests-jitter 100 \
     --timeout 30 \
@@ -0,0 +1,9 @@
+# Configuración de gunicorn (docker-entrypoint.sh); las opciones de cada interfaz
+# se pasan en la línea de comandos
+from apps.core.metrics import merge_dead_process
+
+
+def child_exit(server, worker):
+    # Con --max-requests los workers se reemplazan continuamente: sus archivos de
+    # métricas se fusionan para que PROMETHEUS_MULTIPROC_DIR no crezca sin límite
+    merge_dead_process(worker.pid)
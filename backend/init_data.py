@@ -13,6 +13,7 @@ from datetime import date, datetime, timedelta
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agro_backend.settings')
 django.setup()
 
+from apps.authentication.images import COMPANY_LOGOS_FOLDER, store_image
 from apps.authentication.models import User, Company, Role
 from apps.production.models import Product, Shipment, Inspection, QualityReport, Sample
 
@@ -89,10 +90,13 @@ def create_test_roles():
 
 
 def create_test_companies():
-    """Crear empresas de prueba con logos en Base64"""
+    """Crear empresas de prueba con logos en el storage de archivos"""
     
-    # Logo simple en Base64 (un cuadrado azul simple)
-    simple_logo = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+    # Logo simple (un pixel PNG) guardado con nombre basado en su contenido
+    simple_logo = store_image(
+        base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="),
+        COMPANY_LOGOS_FOLDER
+    )
     
     companies_data = [
         {
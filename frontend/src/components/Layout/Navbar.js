@@ -65,13 +65,13 @@ const Navbar = ({ sidebarOpen, setSidebarOpen, sidebarCollapsed, setSidebarColla
                              {/* User Profile Image */}
                {user?.profile_image_url ? (
                  <img 
-                   src={user.profile_image_url} 
+                   src={user.profile_image_thumbnails?.['64']?.webp || user.profile_image_url} 
                    alt="Foto de perfil"
                    className="h-6 w-6 rounded-full object-cover border border-gray-200"
                  />
                ) : user?.company?.logo_url ? (
                  <img 
-                   src={user.company.logo_url} 
+                   src={user.company.logo_thumbnails?.['64']?.webp || user.company.logo_url} 
                    alt={`${user.company.name} Logo`}
                    className="h-6 w-6 rounded-full object-contain border border-gray-200"
                  />
@@ -18,6 +18,7 @@ export const sanitizeUserData = (userData) => {
          cargo: userData.cargo,
      departamento: userData.departamento,
      profile_image_url: userData.profile_image_url,
+     profile_image_thumbnails: userData.profile_image_thumbnails,
      is_client: userData.is_client,
     is_active: userData.is_active,
     is_staff: userData.is_staff,
@@ -30,6 +31,7 @@ export const sanitizeUserData = (userData) => {
       domain: userData.company.domain,
       logo: userData.company.logo,
       logo_url: userData.company.logo_url,
+      logo_thumbnails: userData.company.logo_thumbnails,
       rubro: userData.company.rubro,
       rubro_display: userData.company.rubro_display,
       pais: userData.company.pais,